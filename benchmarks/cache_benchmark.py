@@ -0,0 +1,113 @@
+"""Event-loop latency under cache load: sync vs async Redis client.
+
+Runs a 1ms heartbeat on the event loop while many concurrent "requests"
+read and write the cache, the way ``async def`` routes would. With the
+synchronous ``RedisCache`` every round-trip blocks the loop, so the
+heartbeat lags by roughly one round-trip per request in flight. With
+``AsyncRedisCache`` the loop keeps ticking while commands are in flight.
+A pipelined variant batches each request's commands into one round-trip.
+
+Needs a running Redis (settings.REDIS_HOST / REDIS_PORT):
+
+    python benchmarks/cache_benchmark.py --requests 20000 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi_template.core.cache import AsyncRedisCache, RedisCache
+
+PREFIX = "benchmark:cache"
+
+
+async def heartbeat(stop: asyncio.Event, lags: list, interval: float):
+    # 每次应在 interval 后醒来，实际延迟减去 interval 即事件循环被阻塞的时间
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(name, request, requests: int, concurrency: int):
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(heartbeat(stop, lags, 0.001))
+    queue = iter(range(requests))
+
+    async def worker():
+        for i in queue:
+            await request(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{name:<16}{requests / elapsed:>12,.0f}/s"
+        f"{statistics.median(lags) * 1000:>12.2f}ms"
+        f"{p99 * 1000:>12.2f}ms{max(lags) * 1000:>12.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--keys", type=int, default=1_000)
+    args = parser.parse_args()
+
+    sync_cache = RedisCache()
+    async_cache = AsyncRedisCache()
+    value = {"title": "cached", "tags": ["a", "b"], "body": "x" * 512}
+    encoded = json.dumps(value)
+    for i in range(args.keys):
+        sync_cache.set(f"{PREFIX}:{i}", value, expire=600)
+
+    # 每个请求：读一个键，每10个请求写一次
+    async def sync_request(i):
+        key = f"{PREFIX}:{i % args.keys}"
+        sync_cache.get(key)
+        if i % 10 == 0:
+            sync_cache.set(key, value, expire=600)
+
+    async def async_request(i):
+        key = f"{PREFIX}:{i % args.keys}"
+        await async_cache.get(key)
+        if i % 10 == 0:
+            await async_cache.set(key, value, expire=600)
+
+    async def pipelined_request(i):
+        key = async_cache.key(f"{PREFIX}:{i % args.keys}")
+        async with async_cache.pipeline() as pipe:
+            pipe.get(key)
+            if i % 10 == 0:
+                pipe.setex(key, 600, encoded)
+            await pipe.execute()
+
+    print(
+        f"requests: {args.requests:,}  concurrency: {args.concurrency}  "
+        f"keys: {args.keys:,}"
+    )
+    print(
+        f"{'client':<16}{'throughput':>14}{'lag p50':>14}"
+        f"{'lag p99':>14}{'lag max':>14}"
+    )
+    await run("sync", sync_request, args.requests, args.concurrency)
+    await run("async", async_request, args.requests, args.concurrency)
+    await run(
+        "async pipeline", pipelined_request, args.requests, args.concurrency
+    )
+
+    for i in range(args.keys):
+        sync_cache.delete(f"{PREFIX}:{i}")
+    await async_cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
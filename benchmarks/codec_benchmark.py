@@ -0,0 +1,148 @@
+"""Cache codec benchmark: encode/decode time and stored bytes.
+
+Serializes typical cached payloads -- a first page of ``PostResponse``
+items and a ``UserResponse`` with its contents expanded -- with every
+codec and compression that is installed, and reports the best encode and
+decode time per payload and the number of bytes that would be stored in
+Redis. No Redis is needed.
+
+    python benchmarks/codec_benchmark.py --posts 20 --repeat 200
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from fastapi_template.core.codecs import (
+    CODEC_MODULES, CODECS, COMPRESSIONS, Serializer
+)
+from fastapi_template.models.blog import PostResponse
+from fastapi_template.models.content import ContentListItem
+from fastapi_template.models.security import UserResponse
+
+WORDS = [
+    "fastapi", "redis", "cache", "python", "sqlite", "postgres", "index",
+    "query", "stream", "event", "search", "token", "worker", "pydantic",
+    "文章", "缓存", "数据库", "性能", "序列化", "压缩",
+]
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def post_page(rng: random.Random, size: int):
+    now = datetime.utcnow()
+    return [
+        PostResponse(
+            id=i,
+            title=text(rng, 8),
+            content=text(rng, 300),
+            published=True,
+            created_at=now - timedelta(hours=i),
+            updated_at=now,
+            user_id=rng.randint(1, 100),
+            comment_count=rng.randint(0, 50),
+            like_count=rng.randint(0, 500),
+            heat_score=rng.random() * 100,
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def user_with_contents(rng: random.Random, size: int):
+    now = datetime.utcnow()
+    return UserResponse(
+        id=1,
+        username="benchmark",
+        disabled=False,
+        superuser=False,
+        contents=[
+            ContentListItem(
+                id=i,
+                title=text(rng, 6),
+                slug=f"content-{i}",
+                text=text(rng, 120),
+                published=True,
+                created_time=now - timedelta(days=i),
+                tags=rng.sample(WORDS, 3),
+                user_id=1,
+            )
+            for i in range(1, size + 1)
+        ],
+    )
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def serializers(threshold: int):
+    for codec in CODECS:
+        if codec in CODEC_MODULES and CODEC_MODULES[codec] is None:
+            continue
+        yield codec, Serializer(codec)
+        for name, compression in COMPRESSIONS.items():
+            if compression.module is not None:
+                yield (
+                    f"{codec}+{name}",
+                    Serializer(codec, name, threshold=threshold),
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--contents", type=int, default=20)
+    parser.add_argument("--threshold", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # 与缓存中保存的值相同：jsonable_encoder 转换后的结构
+    payloads = {
+        f"{args.posts} PostResponse": jsonable_encoder(
+            post_page(rng, args.posts)
+        ),
+        "UserResponse +contents": jsonable_encoder(
+            user_with_contents(rng, args.contents)
+        ),
+    }
+
+    missing = [
+        name for name, module in CODEC_MODULES.items() if module is None
+    ] + [
+        name for name, item in COMPRESSIONS.items() if item.module is None
+    ]
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+
+    for title, value in payloads.items():
+        print()
+        print(title)
+        print(
+            f"{'codec':<18}{'bytes':>10}{'ratio':>8}"
+            f"{'encode':>12}{'decode':>12}"
+        )
+        baseline = None
+        for name, serializer in serializers(args.threshold):
+            data = serializer.dumps(value)
+            assert serializer.loads(data) == value
+            baseline = baseline or len(data)
+            encode = best_of(lambda: serializer.dumps(value), args.repeat)
+            decode = best_of(lambda: serializer.loads(data), args.repeat)
+            print(
+                f"{name:<18}{len(data):>10,}{len(data) / baseline:>8.2f}"
+                f"{encode * 1e6:>10.1f}us{decode * 1e6:>10.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 # fastapi_template/api/v1/api.py
 from fastapi import APIRouter
 
-from fastapi_template.api.v1.endpoints import users, auth, content, profile
+from fastapi_template.api.v1.endpoints import (
+    users, auth, content, profile, metrics
+)
 
 # MARK: 创建API路由
 api_router = APIRouter()
@@ -10,4 +12,5 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(content.router, prefix="/content", tags=["content"])
-api_router.include_router(profile.router, prefix="/profile", tags=["profile"])
\ No newline at end of file
+api_router.include_router(profile.router, prefix="/profile", tags=["profile"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
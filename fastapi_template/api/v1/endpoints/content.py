@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from fastapi_template.models.search import SearchHit
+from fastapi_template.services.search_service import search_service
+from fastapi_template.utils.pagination import PaginatedResponse
 
 # NOTE: 在这里可以配置显示在v1版本API文档中Content部分的路由
 router = APIRouter()
@@ -27,14 +33,23 @@ async def delete_content(content_id: int):
     return {"message": "Delete content endpoint"}
 
 
+# MARK: 搜索内容
+# NOTE: 必须声明在 /{content_id} 之前，否则 /search 会被当作内容ID匹配
+@router.get("/search", response_model=PaginatedResponse[SearchHit])
+def search_content(
+    query: str = Query(..., min_length=1, description="搜索关键词"),
+    kind: Optional[str] = Query(
+        None, regex="^(post|content)$", description="文档类型过滤"
+    ),
+    page: int = Query(1, ge=1, description="页码"),
+    size: int = Query(10, ge=1, le=100, description="每页大小"),
+):
+    return search_service.search(query, kind=kind, page=page, size=size)
+
+
 # MARK: 获取内容详情
 @router.get("/{content_id}")
 async def get_content(content_id: int):
     return {"message": "Get content endpoint"}
 
-# MARK: 搜索内容
-@router.get("/search")
-async def search_content(query: str):
-    return {"message": "Search content endpoint"}
-
 
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fastapi_template.core.cache import redis_breaker
+from fastapi_template.core.circuit_breaker import OPEN
+from fastapi_template.core.metrics import cache_metrics
+from fastapi_template.core.response_cache import response_cache
+
+# NOTE: 指标只反映处理本次请求的进程，多进程部署时分别抓取
+router = APIRouter()
+
+
+# MARK: Prometheus 指标
+@router.get("/", response_class=PlainTextResponse)
+def metrics():
+    breaker_open = int(redis_breaker.state == OPEN)
+    return cache_metrics.to_prometheus() + (
+        "# HELP cache_breaker_open Whether the Redis circuit breaker is open\n"
+        "# TYPE cache_breaker_open gauge\n"
+        f"cache_breaker_open {breaker_open}\n"
+    )
+
+
+# MARK: 缓存统计
+# NOTE: fastapi cache-report 读取这个接口
+@router.get("/cache")
+def cache_stats():
+    return {
+        **cache_metrics.snapshot(),
+        "breaker": redis_breaker.state,
+        "response_cache": response_cache.stats(),
+    }
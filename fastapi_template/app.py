@@ -6,8 +6,15 @@ from fastapi import FastAPI
 from .db import create_db_and_tables, engine
 from .routes import main_router
 from fastapi_template.api.v1.api import api_router
+from fastapi_template.core.cache import TieredCache, async_cache, cache
 from fastapi_template.core.config import settings
+from fastapi_template.core.events import event_bus
 from fastapi_template.core.middleware import setup_middlewares
+from fastapi_template.core.outbox import outbox_relay
+from fastapi_template.core.response_cache import response_cache
+from fastapi_template.services.search_service import search_service
+from fastapi_template.services.content_service import content_service
+from fastapi_template.services.user_search_service import user_search_service
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
@@ -58,3 +65,34 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables(engine)
+    # NOTE: 创建全文索引并订阅内容事件，保持索引增量更新
+    search_service.create_index()
+    search_service.register_event_handlers()
+    # NOTE: 订阅内容事件，失效 slug→id 映射
+    content_service.register_event_handlers()
+    # NOTE: 创建用户名三元组索引，订阅用户事件维护进程内 n-gram 索引
+    user_search_service.create_index()
+    user_search_service.register_event_handlers()
+    # NOTE: 订阅文章、评论和点赞事件，失效博客响应缓存
+    response_cache.register_event_handlers()
+    # NOTE: 订阅其他进程发布的失效消息，删除本进程L1中的键
+    if isinstance(cache, TieredCache):
+        cache.start()
+    # NOTE: 后台投递发件箱中的事件
+    if settings.OUTBOX_RELAY:
+        outbox_relay.start()
+
+
+@app.on_event("startup")
+async def start_event_bus():
+    # NOTE: 在事件循环中启动排队订阅的 worker
+    await event_bus.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await event_bus.stop(timeout=settings.EVENT_SHUTDOWN_TIMEOUT)
+    outbox_relay.stop(timeout=settings.EVENT_SHUTDOWN_TIMEOUT)
+    if isinstance(cache, TieredCache):
+        cache.stop()
+    await async_cache.close()
@@ -1,12 +1,24 @@
+import json
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
 import typer
 import uvicorn
 from sqlmodel import Session, select
 
 from .app import app
 from .config import settings
+from .core.config import settings as core_settings
 from .db import create_db_and_tables, engine
 from .models.content import Content
 from .security import User
+from .services.export_service import ExportService, export_watermark
+from .services.import_service import ImportService, guess_format
+from .services.search_service import search_service
+from .services.user_import_service import CONFLICT_SKIP, UserImportService
 
 cli = typer.Typer(name="fastapi_template API")
 
@@ -41,6 +53,198 @@ def create_user(username: str, password: str, superuser: bool = False):
         return user
 
 
+@cli.command()
+def reindex_search(batch_size: int = 1000):
+    """Rebuild the full-text search index"""
+    create_db_and_tables(engine)
+    search_service.create_index()
+    total = search_service.rebuild(batch_size=batch_size)
+    typer.echo(f"indexed {total} documents")
+
+
+@cli.command()
+def import_data(
+    kind: str = typer.Argument(..., help="posts, comments or contents"),
+    path: str = typer.Argument(..., help="NDJSON/CSV file, '-' for stdin"),
+    format: str = typer.Option(None, help="ndjson or csv"),
+    chunk_size: int = 1000,
+    user_id: int = typer.Option(1, help="Owner for rows without user_id"),
+):
+    """Bulk import posts, comments or contents from NDJSON/CSV"""
+    create_db_and_tables(engine)
+    service = ImportService(engine, chunk_size=chunk_size)
+    fmt = format or guess_format(path)
+    start = time.perf_counter()
+    if path == "-":
+        report = service.import_stream(kind, sys.stdin, fmt, user_id)
+    else:
+        with Path(path).open(encoding="utf-8", newline="") as stream:
+            report = service.import_stream(kind, stream, fmt, user_id)
+    elapsed = time.perf_counter() - start
+
+    for chunk in report.chunks:
+        for error in chunk.errors:
+            typer.echo(
+                f"chunk {chunk.chunk} line {error.line}: {error.error}",
+                err=True,
+            )
+    typer.echo(
+        f"imported {report.inserted}/{report.total} {kind} "
+        f"({report.failed} failed) in {elapsed:.1f}s"
+    )
+
+
+@cli.command()
+def import_users(
+    path: str = typer.Argument(..., help="NDJSON/CSV file, '-' for stdin"),
+    format: str = typer.Option(None, help="ndjson or csv"),
+    chunk_size: int = 1000,
+    workers: int = typer.Option(
+        None, help="Hashing processes (default: CPU count, 0: inline)"
+    ),
+    on_conflict: str = typer.Option(
+        CONFLICT_SKIP, help="skip or update existing usernames"
+    ),
+):
+    """Bulk create users from NDJSON/CSV, hashing passwords in parallel"""
+    create_db_and_tables(engine)
+    service = UserImportService(engine, chunk_size=chunk_size, workers=workers)
+    fmt = format or guess_format(path)
+    start = time.perf_counter()
+
+    def progress(report):
+        elapsed = time.perf_counter() - start
+        typer.echo(
+            f"{report.total} rows: {report.inserted} created, "
+            f"{report.updated} updated, {report.skipped} skipped, "
+            f"{report.failed} failed ({report.total / elapsed:.0f} rows/s)",
+            err=True,
+        )
+
+    if path == "-":
+        report = service.import_stream(sys.stdin, fmt, on_conflict, progress)
+    else:
+        with Path(path).open(encoding="utf-8", newline="") as stream:
+            report = service.import_stream(
+                stream, fmt, on_conflict, progress
+            )
+    elapsed = time.perf_counter() - start
+
+    for chunk in report.chunks:
+        for error in chunk.errors:
+            typer.echo(
+                f"chunk {chunk.chunk} line {error.line}: {error.error}",
+                err=True,
+            )
+    typer.echo(
+        f"imported {report.inserted + report.updated}/{report.total} users "
+        f"({report.updated} updated, {report.skipped} skipped, "
+        f"{report.failed} failed) in {elapsed:.1f}s "
+        f"({report.total / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+
+
+@cli.command()
+def export_data(
+    kind: str = typer.Argument(..., help="posts, comments or contents"),
+    output: str = typer.Option("-", help="Output file, '-' for stdout"),
+    format: str = typer.Option("ndjson", help="ndjson or csv"),
+    since: datetime = typer.Option(None, help="Only rows changed since"),
+    batch_size: int = 1000,
+):
+    """Stream posts, comment trees or contents as NDJSON/CSV"""
+    watermark = export_watermark()
+    service = ExportService(engine, batch_size=batch_size)
+    chunks = service.export(kind, format, since=since, until=watermark)
+    if output == "-":
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+    else:
+        with Path(output).open("w", encoding="utf-8", newline="") as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+    typer.echo(f"watermark: {watermark.isoformat()}", err=True)
+
+
+@cli.command()
+def cache_report(
+    url: str = typer.Option(
+        f"http://127.0.0.1:8000{core_settings.API_V1_STR}/metrics/cache",
+        help="Cache stats endpoint of a running app",
+    ),
+    cold_ratio: float = typer.Option(
+        0.5, help="Flag namespaces with a lower hit ratio"
+    ),
+    raw: bool = typer.Option(False, "--json", help="Print the raw JSON"),
+):
+    """Report cache hit ratio, value size and latency per namespace"""
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            stats = json.load(response)
+    except (OSError, ValueError) as e:
+        typer.echo(f"cannot read {url}: {e}", err=True)
+        raise typer.Exit(1)
+    if raw:
+        typer.echo(json.dumps(stats, indent=2))
+        return
+
+    since = datetime.fromtimestamp(stats["since"]).isoformat(" ", "seconds")
+    typer.echo(f"since {since}, redis circuit breaker: {stats['breaker']}")
+    typer.echo(
+        f"{'tier':<6}{'namespace':<32}{'hits':>9}{'misses':>9}{'hit %':>7}"
+        f"{'avg size':>10}{'p50 ms':>8}{'p99 ms':>8}{'errors':>8}"
+    )
+    for row in stats["namespaces"]:
+        lookups = row["hits"] + row["misses"]
+        cold = lookups and row["hit_ratio"] < cold_ratio
+        typer.echo(
+            f"{row['tier']:<6}{row['namespace'][:31]:<32}"
+            f"{row['hits']:>9}{row['misses']:>9}"
+            f"{row['hit_ratio'] * 100:>6.1f}%"
+            f"{row['avg_value_bytes']:>10.0f}"
+            f"{row['latency_ms_p50'] or 0:>8.2f}"
+            f"{row['latency_ms_p99'] or 0:>8.2f}"
+            f"{row['errors']:>8}" + ("  cold" if cold else "")
+        )
+
+
+@cli.command()
+def cache_purge_legacy():
+    """Delete cache keys written before CACHE_KEY_PREFIX was introduced"""
+    from .core.cache import LEGACY_KEY_PATTERNS, RedisCache
+
+    if not core_settings.CACHE_KEY_PREFIX:
+        typer.echo("CACHE_KEY_PREFIX is empty, nothing to purge", err=True)
+        raise typer.Exit(1)
+    backend = RedisCache()
+    for pattern in LEGACY_KEY_PATTERNS:
+        deleted = backend.unlink_matching(pattern)
+        typer.echo(f"{pattern}: deleted {deleted} keys")
+
+
+@cli.command()
+def outbox_relay(
+    once: bool = typer.Option(False, help="Drain the outbox and exit"),
+    batch_size: int = typer.Option(
+        core_settings.OUTBOX_BATCH_SIZE, help="Events per delivery"
+    ),
+):
+    """Deliver outbox events to OUTBOX_SINK"""
+    from .core.outbox import OutboxRelay
+
+    relay = OutboxRelay(batch_size=batch_size)
+    if once:
+        typer.echo(f"delivered {relay.drain()} events")
+        return
+    typer.echo(f"relaying outbox events to {core_settings.OUTBOX_SINK}")
+    relay.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        relay.stop()
+
+
 @cli.command()
 def shell():  # pragma: no cover
     """Opens an interactive shell with objects auto imported"""
@@ -1,55 +1,998 @@
 # fastapi_template/core/cache.py
+import functools
+import inspect
 import json
-from typing import Any, Optional, Union
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import (
+    Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+)
 
 import redis
+import redis.asyncio
+from fastapi import Depends
 
+from fastapi_template.core.circuit_breaker import CircuitBreaker
+from fastapi_template.core.codecs import Serializer, serializer
 from fastapi_template.core.config import settings
+from fastapi_template.core.metrics import CacheMetrics, cache_metrics
+
+logger = logging.getLogger(__name__)
+
+# 序列化后的缓存值；Redis 返回 bytes，载荷可能是压缩后的二进制
+Payload = Union[bytes, str]
+# 批量写入的过期时间：所有键相同，或按键指定（未指定的键不过期）
+Expire = Union[None, int, Mapping[str, Optional[int]]]
+
+# 单条 MGET / DEL 命令的最大键数，更多的键拆成多条命令在同一个管道中发送
+BULK_CHUNK_SIZE = 1000
+
+# 加 CACHE_KEY_PREFIX 之前写入的键：响应缓存（代际键没有过期时间）和 @cached
+LEGACY_KEY_PATTERNS = ("response:*", "cached:*")
+
+# 值等于 ARGV[1] 时才删除，GET 和 DEL 原子执行，不会删掉别人持有的锁
+DELETE_IF_EQUAL = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+# MARK: 批量操作工具
+"""
+批量操作工具
+- 各缓存类的 get_many / set_many / delete_many 共用
+- get_many 返回命中的 键 → 值，未命中和无法解码的键不在结果中
+"""
+def expire_for(expire: Expire, key: str) -> Optional[int]:
+    if isinstance(expire, Mapping):
+        return expire.get(key)
+    return expire
+
+
+def chunks(keys: Sequence[str]) -> Iterable[Sequence[str]]:
+    for start in range(0, len(keys), BULK_CHUNK_SIZE):
+        yield keys[start:start + BULK_CHUNK_SIZE]
+
+
+def decode_many(
+    serializer: Serializer,
+    keys: Sequence[str],
+    values: Sequence[Optional[Payload]],
+) -> Dict[str, Any]:
+    result = {}
+    for key, data in zip(keys, values):
+        value = serializer.loads(data)
+        if value is not None:
+            result[key] = value
+    return result
+
+
+def encode_many(
+    serializer: Serializer, values: Mapping[str, Any]
+) -> Dict[str, bytes]:
+    return {key: serializer.dumps(value) for key, value in values.items()}
+
+
+# MARK: Redis连接池
+"""
+Redis连接池
+- 首次执行命令时才创建，导入模块和启动应用不依赖Redis，也会使用
+  导入之后修改的配置
+- 不解码响应，缓存值可能是 msgpack 或压缩后的二进制
+- 连接和每条命令都有超时（REDIS_CONNECT_TIMEOUT / REDIS_SOCKET_TIMEOUT），
+  Redis变慢时调用快速失败，不会拖慢请求
+"""
+_pool_lock = threading.Lock()
+_redis_pool: Optional[redis.ConnectionPool] = None
+_async_redis_pool: Optional[redis.asyncio.BlockingConnectionPool] = None
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "db": settings.REDIS_DB,
+        "password": settings.REDIS_PASSWORD,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+    }
+
+
+def get_redis_pool() -> redis.ConnectionPool:
+    global _redis_pool
+    with _pool_lock:
+        if _redis_pool is None:
+            _redis_pool = redis.ConnectionPool(**_pool_options())
+        return _redis_pool
+
+
+def get_async_redis_pool() -> redis.asyncio.BlockingConnectionPool:
+    global _async_redis_pool
+    with _pool_lock:
+        if _async_redis_pool is None:
+            # 连接都在使用中时最多等待一个命令超时，而不是默认的20秒
+            _async_redis_pool = redis.asyncio.BlockingConnectionPool(
+                max_connections=settings.REDIS_ASYNC_MAX_CONNECTIONS,
+                timeout=settings.REDIS_SOCKET_TIMEOUT,
+                **_pool_options(),
+            )
+        return _async_redis_pool
 
-# MARK: 创建Redis连接池
-redis_pool = redis.ConnectionPool(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    password=settings.REDIS_PASSWORD,
-    decode_responses=True
+
+# MARK: 熔断
+"""
+Redis熔断
+- 同步和异步客户端共用一个熔断器，连接的是同一个Redis
+- 连续 CACHE_BREAKER_FAILURES 次Redis错误（含超时）后打开，
+  之后的调用立即抛出 CircuitOpenError（RedisError 的子类），
+  ResponseCache、cached 等调用方按已有的降级逻辑直接查询数据库
+- CACHE_BREAKER_RESET_TIMEOUT 秒后放行一个探测调用，成功则恢复
+"""
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.CACHE_BREAKER_FAILURES,
+    reset_timeout=settings.CACHE_BREAKER_RESET_TIMEOUT,
 )
 
+
+def guarded(method):
+    """Redis命令经过熔断器，同时支持普通方法和协程"""
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            with self.breaker:
+                return await method(self, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.breaker:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 # MARK: Redis缓存类
+"""
+Redis缓存
+- 所有键都加上 CACHE_KEY_PREFIX 前缀，与同一个Redis库中其他应用的键隔离
+- flush() 只删除本应用前缀下的键，不使用 FLUSHDB
+- 客户端在首次使用时创建，命令经过熔断器
+- 每次往返按键的命名空间记录命中、字节数和延迟（core.metrics）
+"""
 class RedisCache:
-    def __init__(self):
-        self.client = redis.Redis(connection_pool=redis_pool)
-        
+    def __init__(
+        self,
+        serializer: Serializer = serializer,
+        prefix: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: CacheMetrics = cache_metrics,
+    ):
+        self._client: Optional[redis.Redis] = None
+        self.serializer = serializer
+        self.prefix = settings.CACHE_KEY_PREFIX if prefix is None else prefix
+        self.breaker = breaker or redis_breaker
+        self.metrics = metrics
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis(connection_pool=get_redis_pool())
+        return self._client
+
+    @client.setter
+    def client(self, client: redis.Redis) -> None:
+        self._client = client
+
+    def key(self, key: str) -> str:
+        """加上应用前缀后Redis中的键"""
+        return f"{self.prefix}:{key}" if self.prefix else key
+
+    @guarded
+    def get_raw(self, key: str) -> Optional[Payload]:
+        """获取序列化后的缓存值"""
+        with self.metrics.measure("redis", [key]) as measurement:
+            data = self.client.get(self.key(key))
+            measurement.read([data])
+        return data
+
+    @guarded
+    def set_raw(
+        self, key: str, data: Payload, expire: Optional[int] = None
+    ) -> bool:
+        """设置序列化后的缓存值"""
+        with self.metrics.measure("redis", [key]) as measurement:
+            measurement.write([data])
+            if expire:
+                return self.client.setex(self.key(key), expire, data)
+            return self.client.set(self.key(key), data)
+
+    @guarded
+    def add_raw(self, key: str, data: Payload, expire: int) -> bool:
+        """键不存在时才设置，用于分布式锁"""
+        return bool(
+            self.client.set(self.key(key), data, nx=True, ex=expire)
+        )
+
+    @guarded
+    def delete_if_equal(self, key: str, data: Payload) -> bool:
+        """值等于 data 时才删除，用于释放自己持有的锁"""
+        return bool(
+            self.client.eval(DELETE_IF_EQUAL, 1, self.key(key), data)
+        )
+
     def get(self, key: str) -> Optional[Any]:
         """获取缓存值"""
-        data = self.client.get(key)
-        if data:
-            return json.loads(data)
-        return None
-        
+        return self.serializer.loads(self.get_raw(key))
+
     def set(
-        self, 
-        key: str, 
-        value: Any, 
+        self,
+        key: str,
+        value: Any,
         expire: Optional[int] = None
     ) -> bool:
         """设置缓存值"""
-        data = json.dumps(value)
-        if expire:
-            return self.client.setex(key, expire, data)
-        return self.client.set(key, data)
-        
+        return self.set_raw(key, self.serializer.dumps(value), expire)
+
+    @guarded
     def delete(self, key: str) -> bool:
         """删除缓存值"""
-        return self.client.delete(key) > 0
-        
+        with self.metrics.measure("redis", [key]) as measurement:
+            measurement.delete()
+            return self.client.delete(self.key(key)) > 0
+
+    # MARK: 批量操作
+    @guarded
+    def get_raw_many(self, keys: Sequence[str]) -> List[Optional[Payload]]:
+        """用 MGET 获取多个序列化后的缓存值，按输入顺序返回，一次往返"""
+        if not keys:
+            return []
+        with self.metrics.measure("redis", keys) as measurement, \
+                self.client.pipeline(transaction=False) as pipe:
+            for chunk in chunks(keys):
+                pipe.mget([self.key(key) for key in chunk])
+            result = [data for values in pipe.execute() for data in values]
+            measurement.read(result)
+        return result
+
+    @guarded
+    def set_raw_many(
+        self, items: Mapping[str, Payload], expire: Expire = None
+    ) -> bool:
+        """用管道设置多个序列化后的缓存值，一次往返"""
+        if not items:
+            return True
+        with self.metrics.measure("redis", list(items)) as measurement, \
+                self.client.pipeline(transaction=False) as pipe:
+            measurement.write(list(items.values()))
+            for key, data in items.items():
+                ttl = expire_for(expire, key)
+                if ttl:
+                    pipe.setex(self.key(key), ttl, data)
+                else:
+                    pipe.set(self.key(key), data)
+            return all(pipe.execute())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        获取多个缓存值
+
+        参数:
+            keys: 缓存键
+
+        返回:
+            Dict[str, Any]: 命中的 键 → 值
+        """
+        keys = list(dict.fromkeys(keys))
+        return decode_many(self.serializer, keys, self.get_raw_many(keys))
+
+    def set_many(
+        self, values: Mapping[str, Any], expire: Expire = None
+    ) -> bool:
+        """
+        设置多个缓存值
+
+        参数:
+            values: 键 → 值
+            expire: 过期时间（秒），或 键 → 过期时间
+
+        返回:
+            bool: 是否全部设置成功
+        """
+        return self.set_raw_many(
+            encode_many(self.serializer, values), expire
+        )
+
+    @guarded
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """删除多个缓存值，返回删除的数量"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        with self.metrics.measure("redis", keys) as measurement, \
+                self.client.pipeline(transaction=False) as pipe:
+            measurement.delete()
+            for chunk in chunks(keys):
+                pipe.delete(*(self.key(key) for key in chunk))
+            return sum(pipe.execute())
+
+    @guarded
     def exists(self, key: str) -> bool:
         """检查键是否存在"""
-        return self.client.exists(key) > 0
-        
+        return self.client.exists(self.key(key)) > 0
+
+    def flush(self) -> bool:
+        """
+        删除本应用前缀下的所有缓存
+
+        用 SCAN 分批查找、UNLINK 在后台释放内存，不阻塞Redis。
+        键很多时仍然较慢，按业务失效应使用 core.cache_namespace
+
+        返回:
+            bool: 是否成功
+
+        异常:
+            RuntimeError: 没有配置键前缀，无法区分本应用的键
+        """
+        if not self.prefix:
+            raise RuntimeError("CACHE_KEY_PREFIX is required to flush")
+        self.unlink_matching(f"{self.prefix}:*")
+        return True
+
+    @guarded
+    def unlink_matching(self, pattern: str) -> int:
+        """
+        删除匹配模式的键，模式不加应用前缀
+
+        用于清理加前缀之前写入的旧键，其中没有过期时间的键不会自行消失
+
+        参数:
+            pattern: Redis SCAN 的 MATCH 模式，例如 response:*
+
+        返回:
+            int: 删除的键数
+        """
+        deleted = 0
+        batch: List[bytes] = []
+        for key in self.client.scan_iter(match=pattern, count=BULK_CHUNK_SIZE):
+            batch.append(key)
+            if len(batch) >= BULK_CHUNK_SIZE:
+                self.client.unlink(*batch)
+                deleted += len(batch)
+                batch = []
+        if batch:
+            self.client.unlink(*batch)
+            deleted += len(batch)
+        return deleted
+
+
+# MARK: 异步Redis缓存类
+"""
+异步Redis缓存
+- 与RedisCache相同的接口，方法均为协程，基于 redis.asyncio
+- 连接池与同步客户端相互独立，连接绑定到当前事件循环；
+  最大连接数限制并发命令数，超出时短暂等待空闲连接而不是无限创建
+- async def 路由中使用，等待Redis时不阻塞事件循环
+- pipeline() 在一次往返中发送多条命令，管道中的键需要用 key() 加上前缀
+- 通过 AsyncCache 依赖注入获取
+"""
+class AsyncRedisCache:
+    def __init__(
+        self,
+        client: Optional[redis.asyncio.Redis] = None,
+        serializer: Serializer = serializer,
+        prefix: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: CacheMetrics = cache_metrics,
+    ):
+        self._client = client
+        self.serializer = serializer
+        self.prefix = settings.CACHE_KEY_PREFIX if prefix is None else prefix
+        self.breaker = breaker or redis_breaker
+        self.metrics = metrics
+
+    @property
+    def client(self) -> redis.asyncio.Redis:
+        if self._client is None:
+            self._client = redis.asyncio.Redis(
+                connection_pool=get_async_redis_pool()
+            )
+        return self._client
+
+    def key(self, key: str) -> str:
+        """加上应用前缀后Redis中的键，直接使用 pipeline() 时需要"""
+        return f"{self.prefix}:{key}" if self.prefix else key
+
+    @guarded
+    async def get_raw(self, key: str) -> Optional[Payload]:
+        """获取序列化后的缓存值"""
+        with self.metrics.measure("redis", [key]) as measurement:
+            data = await self.client.get(self.key(key))
+            measurement.read([data])
+        return data
+
+    @guarded
+    async def set_raw(
+        self, key: str, data: Payload, expire: Optional[int] = None
+    ) -> bool:
+        """设置序列化后的缓存值"""
+        with self.metrics.measure("redis", [key]) as measurement:
+            measurement.write([data])
+            if expire:
+                return await self.client.setex(self.key(key), expire, data)
+            return await self.client.set(self.key(key), data)
+
+    @guarded
+    async def add_raw(self, key: str, data: Payload, expire: int) -> bool:
+        """键不存在时才设置，用于分布式锁"""
+        return bool(
+            await self.client.set(self.key(key), data, nx=True, ex=expire)
+        )
+
+    @guarded
+    async def delete_if_equal(self, key: str, data: Payload) -> bool:
+        """值等于 data 时才删除，用于释放自己持有的锁"""
+        return bool(
+            await self.client.eval(DELETE_IF_EQUAL, 1, self.key(key), data)
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        """获取缓存值"""
+        return self.serializer.loads(await self.get_raw(key))
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None
+    ) -> bool:
+        """设置缓存值"""
+        return await self.set_raw(
+            key, self.serializer.dumps(value), expire
+        )
+
+    @guarded
+    async def delete(self, key: str) -> bool:
+        """删除缓存值"""
+        with self.metrics.measure("redis", [key]) as measurement:
+            measurement.delete()
+            return await self.client.delete(self.key(key)) > 0
+
+    # MARK: 批量操作
+    @guarded
+    async def get_raw_many(
+        self, keys: Sequence[str]
+    ) -> List[Optional[Payload]]:
+        """用 MGET 获取多个序列化后的缓存值，按输入顺序返回，一次往返"""
+        if not keys:
+            return []
+        with self.metrics.measure("redis", keys) as measurement:
+            async with self.pipeline() as pipe:
+                for chunk in chunks(keys):
+                    pipe.mget([self.key(key) for key in chunk])
+                result = [
+                    data for values in await pipe.execute()
+                    for data in values
+                ]
+            measurement.read(result)
+        return result
+
+    @guarded
+    async def set_raw_many(
+        self, items: Mapping[str, Payload], expire: Expire = None
+    ) -> bool:
+        """用管道设置多个序列化后的缓存值，一次往返"""
+        if not items:
+            return True
+        with self.metrics.measure("redis", list(items)) as measurement:
+            measurement.write(list(items.values()))
+            async with self.pipeline() as pipe:
+                for key, data in items.items():
+                    ttl = expire_for(expire, key)
+                    if ttl:
+                        pipe.setex(self.key(key), ttl, data)
+                    else:
+                        pipe.set(self.key(key), data)
+                return all(await pipe.execute())
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """获取多个缓存值，返回命中的 键 → 值"""
+        keys = list(dict.fromkeys(keys))
+        return decode_many(
+            self.serializer, keys, await self.get_raw_many(keys)
+        )
+
+    async def set_many(
+        self, values: Mapping[str, Any], expire: Expire = None
+    ) -> bool:
+        """设置多个缓存值，expire 可以按键指定"""
+        return await self.set_raw_many(
+            encode_many(self.serializer, values), expire
+        )
+
+    @guarded
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """删除多个缓存值，返回删除的数量"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        with self.metrics.measure("redis", keys) as measurement:
+            measurement.delete()
+            async with self.pipeline() as pipe:
+                for chunk in chunks(keys):
+                    pipe.delete(*(self.key(key) for key in chunk))
+                return sum(await pipe.execute())
+
+    @guarded
+    async def exists(self, key: str) -> bool:
+        """检查键是否存在"""
+        return await self.client.exists(self.key(key)) > 0
+
+    @guarded
+    async def flush(self) -> bool:
+        """删除本应用前缀下的所有缓存，与 RedisCache.flush 相同"""
+        if not self.prefix:
+            raise RuntimeError("CACHE_KEY_PREFIX is required to flush")
+        batch: List[bytes] = []
+        async for key in self.client.scan_iter(
+            match=f"{self.prefix}:*", count=BULK_CHUNK_SIZE
+        ):
+            batch.append(key)
+            if len(batch) >= BULK_CHUNK_SIZE:
+                await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            await self.client.unlink(*batch)
+        return True
+
+    def pipeline(self, transaction: bool = False):
+        """
+        创建管道，命令在 execute() 时一次发送
+
+        参数:
+            transaction: 是否用 MULTI/EXEC 包裹
+
+        返回:
+            redis.asyncio.client.Pipeline: 可用作 async with 的管道
+        """
+        return self.client.pipeline(transaction=transaction)
+
+    async def close(self) -> None:
+        """断开连接池中的连接，之后再使用会重新连接"""
+        if self._client is not None:
+            await self._client.connection_pool.disconnect()
+
+
+# MARK: 内存缓存类
+"""
+内存缓存
+- 与RedisCache相同的接口，数据保存在当前进程内
+- 值以序列化后的载荷保存，读写语义与Redis一致（取出的是副本）
+- LRU淘汰，可按条目数和总大小（载荷字节数）限制容量，超过上限的单个值不缓存
+- 用于没有Redis的部署、测试、Redis不可用时的降级，以及 TieredCache 的L1
+"""
+class MemoryCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        serializer: Serializer = serializer,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # 键 → (过期时间, 载荷)，按最近使用排序
+        self._data: "OrderedDict[str, Tuple[Optional[float], Payload]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.serializer = serializer
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size(self) -> int:
+        """当前缓存的总大小（载荷字节数）"""
+        return self._bytes
+
+    def _load(self, key: str) -> Optional[Payload]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, data = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return data
+
+    def _remove(self, key: str) -> bool:
+        item = self._data.pop(key, None)
+        if item is None:
+            return False
+        self._bytes -= len(item[1])
+        return True
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            key, (_, data) = self._data.popitem(last=False)
+            self._bytes -= len(data)
+
+    def get_raw(self, key: str) -> Optional[Payload]:
+        """获取序列化后的缓存值"""
+        with self._lock:
+            return self._load(key)
+
+    def set_raw(
+        self, key: str, data: Payload, expire: Optional[float] = None
+    ) -> bool:
+        """设置序列化后的缓存值"""
+        expires_at = time.monotonic() + expire if expire else None
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes and len(data) > self.max_bytes:
+                return False
+            self._data[key] = (expires_at, data)
+            self._bytes += len(data)
+            self._evict()
+        return True
+
+    def add_raw(self, key: str, data: Payload, expire: float) -> bool:
+        """键不存在时才设置，用于进程内锁"""
+        with self._lock:
+            if self._load(key) is not None:
+                return False
+            self._data[key] = (time.monotonic() + expire, data)
+            self._bytes += len(data)
+            self._evict()
+        return True
+
+    def delete_if_equal(self, key: str, data: Payload) -> bool:
+        """值等于 data 时才删除，用于释放自己持有的锁"""
+        with self._lock:
+            if self._load(key) != data:
+                return False
+            return self._remove(key)
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值"""
+        return self.serializer.loads(self.get_raw(key))
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None
+    ) -> bool:
+        """设置缓存值"""
+        return self.set_raw(key, self.serializer.dumps(value), expire)
+
+    def delete(self, key: str) -> bool:
+        """删除缓存值"""
+        with self._lock:
+            return self._remove(key)
+
+    # MARK: 批量操作
+    def get_raw_many(self, keys: Sequence[str]) -> List[Optional[Payload]]:
+        """获取多个序列化后的缓存值，按输入顺序返回"""
+        with self._lock:
+            return [self._load(key) for key in keys]
+
+    def set_raw_many(
+        self, items: Mapping[str, Payload], expire: Expire = None
+    ) -> bool:
+        """设置多个序列化后的缓存值"""
+        results = [
+            self.set_raw(key, data, expire_for(expire, key))
+            for key, data in items.items()
+        ]
+        return all(results)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """获取多个缓存值，返回命中的 键 → 值"""
+        keys = list(dict.fromkeys(keys))
+        return decode_many(self.serializer, keys, self.get_raw_many(keys))
+
+    def set_many(
+        self, values: Mapping[str, Any], expire: Expire = None
+    ) -> bool:
+        """设置多个缓存值，expire 可以按键指定"""
+        return self.set_raw_many(
+            encode_many(self.serializer, values), expire
+        )
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """删除多个缓存值，返回删除的数量"""
+        with self._lock:
+            return sum(1 for key in keys if self._remove(key))
+
+    def exists(self, key: str) -> bool:
+        """检查键是否存在"""
+        with self._lock:
+            return self._load(key) is not None
+
     def flush(self) -> bool:
         """清空所有缓存"""
-        return self.client.flushdb()
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+        return True
+
+
+# MARK: 两级缓存类
+"""
+两级缓存
+- L1 为进程内有界 MemoryCache，L2 为共享的 RedisCache
+- 读取先查L1，未命中再查L2并回填L1；热点键不再有网络往返
+- L1 条目的过期时间不超过 l1_ttl，限制其他进程写入后的最长不一致时间
+- 写入和删除同时更新两级，并通过 Redis pub/sub 通知其他进程删除L1中的键
+- 订阅连接断开期间可能错过失效消息，重连时清空L1
+- L1 的读取计入 l1 层的指标，L2 的读取由 RedisCache 计入 redis 层
+"""
+class TieredCache:
+    def __init__(
+        self,
+        l2: Any,
+        l1: Optional[MemoryCache] = None,
+        l1_ttl: Optional[float] = None,
+        channel: Optional[str] = None,
+        serializer: Serializer = serializer,
+        metrics: CacheMetrics = cache_metrics,
+    ):
+        self.l2 = l2
+        self.serializer = serializer
+        self.metrics = metrics
+        self.l1 = l1 if l1 is not None else MemoryCache(
+            max_entries=settings.CACHE_L1_MAX_ENTRIES,
+            max_bytes=settings.CACHE_L1_MAX_BYTES,
+        )
+        self.l1_ttl = l1_ttl or settings.CACHE_L1_TTL
+        self.channel = channel or settings.CACHE_INVALIDATION_CHANNEL
+        # 用于忽略本进程自己发布的失效消息
+        self.origin = uuid.uuid4().hex
+        self._stopped = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def get_raw(self, key: str) -> Optional[Payload]:
+        """获取序列化后的缓存值"""
+        with self.metrics.measure("l1", [key]) as measurement:
+            data = self.l1.get_raw(key)
+            measurement.read([data])
+        if data is not None:
+            return data
+        data = self.l2.get_raw(key)
+        if data is not None:
+            self.l1.set_raw(key, data, self.l1_ttl)
+        return data
+
+    def set_raw(
+        self, key: str, data: Payload, expire: Optional[int] = None
+    ) -> bool:
+        """设置序列化后的缓存值"""
+        result = self.l2.set_raw(key, data, expire)
+        self.l1.set_raw(key, data, min(expire or self.l1_ttl, self.l1_ttl))
+        self._publish([key])
+        return result
+
+    def add_raw(self, key: str, data: Payload, expire: int) -> bool:
+        """键不存在时才设置，只写L2，锁不能缓存在进程内"""
+        return self.l2.add_raw(key, data, expire)
+
+    def delete_if_equal(self, key: str, data: Payload) -> bool:
+        """值等于 data 时才删除，只操作L2"""
+        return self.l2.delete_if_equal(key, data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值"""
+        return self.serializer.loads(self.get_raw(key))
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None
+    ) -> bool:
+        """设置缓存值"""
+        return self.set_raw(key, self.serializer.dumps(value), expire)
+
+    def delete(self, key: str) -> bool:
+        """删除缓存值"""
+        # 先删L2再删L1，避免本进程在两步之间把旧值回填到L1
+        result = self.l2.delete(key)
+        self.l1.delete(key)
+        self._publish([key])
+        return result
+
+    # MARK: 批量操作
+    def get_raw_many(self, keys: Sequence[str]) -> List[Optional[Payload]]:
+        """
+        获取多个序列化后的缓存值
+
+        L1 未命中的键一次从L2批量读取并回填L1，整页数据最多一次网络往返
+
+        参数:
+            keys: 缓存键
+
+        返回:
+            List[Optional[Payload]]: 按输入顺序的值，未命中为None
+        """
+        with self.metrics.measure("l1", keys) as measurement:
+            values = self.l1.get_raw_many(keys)
+            measurement.read(values)
+        missing = [key for key, data in zip(keys, values) if data is None]
+        if not missing:
+            return values
+        found = dict(zip(missing, self.l2.get_raw_many(missing)))
+        self.l1.set_raw_many(
+            {key: data for key, data in found.items() if data is not None},
+            self.l1_ttl,
+        )
+        return [
+            found.get(key) if data is None else data
+            for key, data in zip(keys, values)
+        ]
+
+    def set_raw_many(
+        self, items: Mapping[str, Payload], expire: Expire = None
+    ) -> bool:
+        """设置多个序列化后的缓存值，只发布一条失效消息"""
+        if not items:
+            return True
+        result = self.l2.set_raw_many(items, expire)
+        self.l1.set_raw_many(items, {
+            key: min(expire_for(expire, key) or self.l1_ttl, self.l1_ttl)
+            for key in items
+        })
+        self._publish(items)
+        return result
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """获取多个缓存值，返回命中的 键 → 值"""
+        keys = list(dict.fromkeys(keys))
+        return decode_many(self.serializer, keys, self.get_raw_many(keys))
+
+    def set_many(
+        self, values: Mapping[str, Any], expire: Expire = None
+    ) -> bool:
+        """设置多个缓存值，expire 可以按键指定"""
+        return self.set_raw_many(
+            encode_many(self.serializer, values), expire
+        )
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """删除多个缓存值，返回L2中删除的数量"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        result = self.l2.delete_many(keys)
+        self.l1.delete_many(keys)
+        self._publish(keys)
+        return result
+
+    def exists(self, key: str) -> bool:
+        """检查键是否存在"""
+        return self.l1.exists(key) or self.l2.exists(key)
+
+    def flush(self) -> bool:
+        """清空所有缓存"""
+        result = self.l2.flush()
+        self.l1.flush()
+        self._publish(None)
+        return result
+
+    # MARK: 失效通知
+    def _publish(self, keys: Optional[Iterable[str]]) -> None:
+        client = getattr(self.l2, "client", None)
+        if client is None:
+            return
+        message = {"origin": self.origin, "keys": keys and list(keys)}
+        try:
+            client.publish(self.channel, json.dumps(message))
+        except redis.RedisError as e:
+            # 其他进程的L1会在 l1_ttl 内过期，不影响本次写入
+            logger.warning(f"发布缓存失效消息失败: {str(e)}")
+
+    def handle_message(self, data: str) -> None:
+        """
+        处理失效消息
+
+        参数:
+            data: 消息内容，keys 为 None 时清空L1
+        """
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") == self.origin:
+            return
+        keys = message.get("keys")
+        if keys is None:
+            self.l1.flush()
+            return
+        for key in keys:
+            self.l1.delete(key)
+
+    def start(self) -> None:
+        """启动后台线程订阅失效消息"""
+        if self._listener is not None or not hasattr(self.l2, "client"):
+            return
+        self._stopped.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="cache-invalidation", daemon=True
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        """停止订阅线程"""
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2)
+            self._listener = None
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.l2.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # 订阅之前的失效消息可能已错过
+                self.l1.flush()
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.handle_message(message["data"])
+            except redis.RedisError as e:
+                logger.warning(f"缓存失效订阅断开，稍后重连: {str(e)}")
+                self.l1.flush()
+                self._stopped.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except redis.RedisError:
+                        pass
+
 
 # MARK: 创建单例实例
-cache = RedisCache()
\ No newline at end of file
+"""
+根据 CACHE_BACKEND 创建缓存实例
+- tiered：进程内L1 + Redis L2（默认）
+- redis：只使用Redis
+- memory：只使用进程内缓存，用于没有Redis的部署和测试
+"""
+def create_cache(backend: Optional[str] = None) -> Any:
+    backend = backend or settings.CACHE_BACKEND
+    if backend == "memory":
+        return MemoryCache(
+            max_entries=settings.CACHE_L1_MAX_ENTRIES,
+            max_bytes=settings.CACHE_L1_MAX_BYTES,
+        )
+    if backend == "redis":
+        return RedisCache()
+    if backend == "tiered":
+        return TieredCache(RedisCache())
+    raise ValueError(f"Unsupported cache backend: {backend}")
+
+
+cache = create_cache()
+async_cache = AsyncRedisCache()
+
+
+# MARK: 依赖注入
+"""
+依赖注入
+- async def 路由通过 AsyncCache 获取异步缓存
+"""
+async def get_async_cache() -> AsyncRedisCache:
+    return async_cache
+
+
+AsyncCache = Depends(get_async_cache)
@@ -0,0 +1,218 @@
+# fastapi_template/core/cache_namespace.py
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from fastapi_template.core.cache import cache as default_cache
+from fastapi_template.core.config import settings
+
+
+def new_version() -> str:
+    # 版本取唯一值而非自增，并发失效时无需读-改-写
+    return str(time.time_ns())
+
+
+def namespace_key(name: str) -> str:
+    return f"ns:{name}:version"
+
+
+def tag_key(tag: str) -> str:
+    return f"tag:{tag}:version"
+
+
+def _text(data: Any) -> Optional[str]:
+    return data.decode() if isinstance(data, bytes) else data
+
+
+# MARK: 标签失效
+"""
+标签失效
+- 标签在所有命名空间之间共享，例如 post:42 表示与文章42有关的所有条目
+- 失效只写入标签的新版本，O(1)，不扫描键，也不删除条目
+"""
+def invalidate_tags(*tags: str, backend: Any = None) -> None:
+    """
+    使带有这些标签的所有缓存条目失效
+
+    参数:
+        tags: 标签
+        backend: 缓存后端，默认 core.cache.cache
+    """
+    if not tags:
+        return
+    backend = backend if backend is not None else default_cache
+    version = new_version()
+    backend.set_raw_many(
+        {tag_key(tag): version for tag in tags}, settings.CACHE_VERSION_TTL
+    )
+
+
+# MARK: 缓存命名空间
+"""
+缓存命名空间
+- 键为 {命名空间}:{版本}:{键}，版本保存在 ns:{命名空间}:version 中
+- invalidate() 写入新版本，整个命名空间在 O(1) 内失效；
+  旧版本的条目不再被读到，过期后由Redis回收，不需要 FLUSHDB 或扫描
+- 条目可以带标签，写入时记录各标签的当前版本，读取时与最新版本比较，
+  任一标签失效（或版本键已过期）则视为未命中
+- 读取使用批量操作：版本、条目和标签版本各一次 MGET；
+  配合 TieredCache 时版本键通常在L1中，失效时通过 pub/sub 通知其他进程
+- 计算值之前用 snapshot() 读取版本并传给 set/set_many；计算期间发生的
+  失效会让写入的条目记录旧版本、写入后立即失效，不会返回旧值
+"""
+class CacheNamespace:
+    def __init__(
+        self, name: str, backend: Any = None, ttl: Optional[int] = None
+    ):
+        self.name = name
+        self._backend = backend
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+
+    @property
+    def backend(self) -> Any:
+        return self._backend if self._backend is not None else default_cache
+
+    def _versions(self, keys: List[str], create: bool) -> Dict[str, str]:
+        # 版本键不存在时：读取视为没有有效条目，写入时创建
+        versions = dict(zip(keys, map(_text, self.backend.get_raw_many(keys))))
+        missing = [key for key, version in versions.items() if version is None]
+        if missing and create:
+            for key in missing:
+                self.backend.add_raw(
+                    key, new_version(), settings.CACHE_VERSION_TTL
+                )
+            # 并发创建时以先写入的版本为准
+            versions.update(
+                zip(missing, map(_text, self.backend.get_raw_many(missing)))
+            )
+        return versions
+
+    def version(self, create: bool = False) -> Optional[str]:
+        """命名空间当前版本，还没有写入过且 create 为False时为None"""
+        key = namespace_key(self.name)
+        return self._versions([key], create=create)[key]
+
+    def snapshot(self, tags: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        读取命名空间和标签的当前版本，不存在时创建
+
+        参数:
+            tags: 条目将要带的标签
+
+        返回:
+            Dict[str, str]: 版本键 → 版本，传给 set/set_many 的 versions
+        """
+        tags = list(dict.fromkeys(tags))
+        return self._versions(
+            [namespace_key(self.name)] + [tag_key(tag) for tag in tags],
+            create=True,
+        )
+
+    def key(self, key: str, version: str) -> str:
+        """某个版本下条目的完整缓存键"""
+        return f"{self.name}:{version}:{key}"
+
+    # MARK: 读取
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，未命中或已失效时返回None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        获取多个缓存值
+
+        参数:
+            keys: 命名空间内的键
+
+        返回:
+            Dict[str, Any]: 命中且未失效的 键 → 值
+        """
+        keys = list(dict.fromkeys(keys))
+        version = self.version()
+        if version is None or not keys:
+            return {}
+        entries = self.backend.get_many(
+            [self.key(key, version) for key in keys]
+        )
+        tags = sorted({
+            tag for entry in entries.values() for tag in entry["tags"]
+        })
+        current = self._versions(
+            [tag_key(tag) for tag in tags], create=False
+        ) if tags else {}
+
+        result = {}
+        for key in keys:
+            entry = entries.get(self.key(key, version))
+            if entry is None:
+                continue
+            if all(
+                current.get(tag_key(tag)) == tag_version
+                for tag, tag_version in entry["tags"].items()
+            ):
+                result[key] = entry["value"]
+        return result
+
+    # MARK: 写入
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None,
+        tags: Iterable[str] = (),
+        versions: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """
+        设置缓存值
+
+        参数:
+            key: 命名空间内的键
+            value: 值
+            expire: 过期时间（秒），默认为命名空间的 ttl
+            tags: 标签，任一标签失效时条目失效
+            versions: 计算值之前 snapshot() 读取的版本，默认写入时读取
+
+        返回:
+            bool: 是否设置成功
+        """
+        return self.set_many({key: value}, expire, tags, versions)
+
+    def set_many(
+        self,
+        values: Mapping[str, Any],
+        expire: Optional[int] = None,
+        tags: Iterable[str] = (),
+        versions: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """设置多个缓存值，所有值带相同的标签和版本"""
+        if not values:
+            return True
+        tags = list(dict.fromkeys(tags))
+        if versions is None:
+            versions = self.snapshot(tags)
+        version = versions[namespace_key(self.name)]
+        entry_tags = {tag: versions[tag_key(tag)] for tag in tags}
+        return self.backend.set_many(
+            {
+                self.key(key, version): {"value": value, "tags": entry_tags}
+                for key, value in values.items()
+            },
+            expire or self.ttl,
+        )
+
+    # MARK: 失效
+    def delete(self, key: str) -> bool:
+        """删除当前版本下的一个条目"""
+        version = self.version()
+        if version is None:
+            return False
+        return self.backend.delete(self.key(key, version))
+
+    def invalidate(self) -> None:
+        """写入新版本，使整个命名空间失效"""
+        self.backend.set_raw(
+            namespace_key(self.name), new_version(), settings.CACHE_VERSION_TTL
+        )
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """使带有这些标签的条目失效，包括其他命名空间中的条目"""
+        invalidate_tags(*tags, backend=self.backend)
@@ -0,0 +1,427 @@
+# fastapi_template/core/cached.py
+import asyncio
+import functools
+import inspect
+import logging
+import math
+import threading
+import time
+import uuid
+from typing import (
+    Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+)
+
+import redis
+from fastapi.encoders import jsonable_encoder
+
+from fastapi_template.core.cache import cache as default_cache
+from fastapi_template.core.codecs import serializer
+from fastapi_template.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 键可以是格式化字符串（用函数参数格式化）或接收函数参数的函数
+Key = Union[str, Callable[..., str]]
+
+# 等待其他进程计算结果时的轮询间隔（秒）
+POLL_INTERVAL = 0.05
+
+
+# MARK: 进程内单飞
+"""
+进程内单飞（single-flight）
+- 同一个键同时只有一个调用者执行计算，其他调用者等待并共享结果
+- 计算出错时所有等待者收到同一个异常
+- SingleFlight 用于同步函数（线程），AsyncSingleFlight 用于协程
+"""
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """执行或等待同一个键上正在进行的计算"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """执行或等待同一个键上正在进行的计算"""
+        future = self._flights.get(key)
+        if future is not None:
+            # shield：等待者被取消时不影响计算本身
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            del self._flights[key]
+
+
+# MARK: 缓存装饰器
+"""
+缓存装饰器（cache-aside）
+- 支持同步函数和协程，也可以直接装饰路由函数（需要显式指定 key，
+  否则会话等依赖对象会进入默认键）
+- 缓存值带新鲜期：ttl 内直接返回；过期后 stale_ttl 内先返回旧值，
+  同时在后台刷新，请求不等待计算
+- 未命中时进程内单飞，跨进程用 Redis 锁（SET NX EX）保证只有一个进程
+  计算，其他进程轮询等待结果，超过 lock_timeout 后自行计算
+- 锁的值为随机令牌，释放时比较令牌后删除（delete_if_equal）；
+  计算超过 lock_timeout 时锁可能已被其他进程拿到，不会被误删
+- 返回值经 jsonable_encoder 转换后按 CACHE_CODEC 序列化缓存，
+  命中和未命中都返回转换后的值
+- 缓存后端出错时直接计算，缓存问题不能让请求失败
+- 后台刷新在请求结束后运行，被装饰的函数不能依赖请求级会话
+"""
+def cached(
+    key: Optional[Key] = None,
+    ttl: Optional[int] = None,
+    stale_ttl: int = 0,
+    backend: Any = None,
+    lock_timeout: Optional[int] = None,
+    prefix: str = "cached",
+):
+    """
+    缓存装饰器
+
+    参数:
+        key: 缓存键，格式化字符串或函数，参数为被装饰函数的参数；
+            默认由函数名和参数生成
+        ttl: 新鲜期（秒），默认 RESPONSE_CACHE_TTL
+        stale_ttl: 过期后仍可返回旧值的时间（秒），0 表示不返回旧值
+        backend: 缓存后端，默认 core.cache.cache
+        lock_timeout: 分布式锁的过期时间，也是等待其他进程的最长时间
+        prefix: 缓存键前缀
+
+    返回:
+        Callable: 装饰器
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            loader = _AsyncLoader(
+                func, key, ttl, stale_ttl, backend, lock_timeout, prefix
+            )
+        else:
+            loader = _SyncLoader(
+                func, key, ttl, stale_ttl, backend, lock_timeout, prefix
+            )
+        wrapper = loader.wrapper()
+        wrapper.cache_key = loader.make_key
+        wrapper.invalidate = loader.invalidate
+        return wrapper
+
+    return decorator
+
+
+class _Loader:
+    def __init__(
+        self,
+        func: Callable,
+        key: Optional[Key],
+        ttl: Optional[int],
+        stale_ttl: int,
+        backend: Any,
+        lock_timeout: Optional[int],
+        prefix: str,
+    ):
+        self.func = func
+        self.key = key
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+        self.stale_ttl = stale_ttl
+        self._backend = backend
+        self.lock_timeout = lock_timeout or settings.CACHE_LOCK_TIMEOUT
+        self.prefix = prefix
+        self.signature = inspect.signature(func)
+        # 正在后台刷新的键，同一个键同时只刷新一次
+        self.refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> Any:
+        return self._backend if self._backend is not None else default_cache
+
+    # MARK: 缓存键
+    def make_key(self, *args, **kwargs) -> str:
+        """根据调用参数生成完整的缓存键"""
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        if callable(self.key):
+            name = self.key(**arguments)
+        elif self.key is not None:
+            name = self.key.format(**arguments)
+        else:
+            name = f"{self.func.__module__}.{self.func.__qualname__}:" + (
+                ",".join(
+                    f"{arg}={value!r}"
+                    for arg, value in sorted(arguments.items())
+                )
+            )
+        return f"{self.prefix}:{name}"
+
+    # MARK: 缓存条目
+    def _decode(self, data: Any) -> Optional[Dict[str, Any]]:
+        entry = serializer.loads(data)
+        return entry if isinstance(entry, dict) else None
+
+    def _encode(self, value: Any) -> bytes:
+        return serializer.dumps({
+            "value": value,
+            "fresh_until": time.time() + self.ttl,
+        })
+
+    @property
+    def expire(self) -> int:
+        return math.ceil(self.ttl + self.stale_ttl)
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        return time.time() < entry["fresh_until"]
+
+    def _lock_key(self, key: str) -> str:
+        return f"{key}:lock"
+
+    @staticmethod
+    def _token() -> str:
+        return uuid.uuid4().hex
+
+
+# MARK: 同步函数
+class _SyncLoader(_Loader):
+    flights = SingleFlight()
+
+    def wrapper(self) -> Callable:
+        @functools.wraps(self.func)
+        def wrapper(*args, **kwargs):
+            key = self.make_key(*args, **kwargs)
+            entry = self._read(key)
+            if entry is not None:
+                if not self.is_fresh(entry):
+                    self._refresh_later(key, args, kwargs)
+                return entry["value"]
+            return self.flights.do(
+                key, lambda: self._load(key, args, kwargs)
+            )
+
+        return wrapper
+
+    def invalidate(self, *args, **kwargs) -> None:
+        """删除某组参数对应的缓存"""
+        self._call("delete", self.make_key(*args, **kwargs))
+
+    def _call(self, method: str, *args) -> Any:
+        try:
+            return getattr(self.backend, method)(*args)
+        except redis.RedisError as e:
+            logger.warning(f"缓存后端不可用，直接计算: {str(e)}")
+            return None
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._decode(self._call("get_raw", key))
+
+    def _compute(self, key: str, args, kwargs) -> Any:
+        value = jsonable_encoder(self.func(*args, **kwargs))
+        self._call("set_raw", key, self._encode(value), self.expire)
+        return value
+
+    def _acquire(self, key: str) -> Tuple[bool, Optional[str]]:
+        """返回 (是否由本调用计算, 锁的令牌)，令牌为None表示没有加锁"""
+        if not hasattr(self.backend, "add_raw"):
+            return True, None
+        token = self._token()
+        try:
+            if self.backend.add_raw(
+                self._lock_key(key), token, self.lock_timeout
+            ):
+                return True, token
+            return False, None
+        except redis.RedisError:
+            # 拿不到锁也拿不到缓存，只能自己计算
+            return True, None
+
+    def _release(self, key: str, token: Optional[str]) -> None:
+        if token is not None and hasattr(self.backend, "delete_if_equal"):
+            self._call("delete_if_equal", self._lock_key(key), token)
+
+    def _load(self, key: str, args, kwargs) -> Any:
+        acquired, token = self._acquire(key)
+        if acquired:
+            try:
+                return self._compute(key, args, kwargs)
+            finally:
+                self._release(key, token)
+
+        # 其他进程正在计算，等待它写入结果
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = self._read(key)
+            if entry is not None:
+                return entry["value"]
+        return self._compute(key, args, kwargs)
+
+    def _refresh_later(self, key: str, args, kwargs) -> None:
+        # 多个线程可能同时读到过期条目，检查和登记必须是原子的
+        with self._lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def refresh():
+            try:
+                acquired, token = self._acquire(key)
+                if acquired:
+                    try:
+                        self._compute(key, args, kwargs)
+                    finally:
+                        self._release(key, token)
+            except Exception as e:
+                logger.error(f"后台刷新缓存 {key} 失败: {str(e)}")
+            finally:
+                with self._lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+# MARK: 协程
+class _AsyncLoader(_Loader):
+    flights = AsyncSingleFlight()
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # 保存后台任务的引用，避免被垃圾回收
+        self.tasks: Set[asyncio.Task] = set()
+
+    def wrapper(self) -> Callable:
+        @functools.wraps(self.func)
+        async def wrapper(*args, **kwargs):
+            key = self.make_key(*args, **kwargs)
+            entry = await self._read(key)
+            if entry is not None:
+                if not self.is_fresh(entry):
+                    self._refresh_later(key, args, kwargs)
+                return entry["value"]
+            return await self.flights.do(
+                key, lambda: self._load(key, args, kwargs)
+            )
+
+        return wrapper
+
+    async def invalidate(self, *args, **kwargs) -> None:
+        """删除某组参数对应的缓存"""
+        await self._call("delete", self.make_key(*args, **kwargs))
+
+    async def _call(self, method: str, *args) -> Any:
+        # 同时支持同步后端和 AsyncRedisCache
+        try:
+            result = getattr(self.backend, method)(*args)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except redis.RedisError as e:
+            logger.warning(f"缓存后端不可用，直接计算: {str(e)}")
+            return None
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._decode(await self._call("get_raw", key))
+
+    async def _compute(self, key: str, args, kwargs) -> Any:
+        value = jsonable_encoder(await self.func(*args, **kwargs))
+        await self._call("set_raw", key, self._encode(value), self.expire)
+        return value
+
+    async def _acquire(self, key: str) -> Tuple[bool, Optional[str]]:
+        """返回 (是否由本调用计算, 锁的令牌)，令牌为None表示没有加锁"""
+        if not hasattr(self.backend, "add_raw"):
+            return True, None
+        token = self._token()
+        acquired = await self._call(
+            "add_raw", self._lock_key(key), token, self.lock_timeout
+        )
+        # None 表示后端出错，只能自己计算
+        if acquired is None:
+            return True, None
+        return (True, token) if acquired else (False, None)
+
+    async def _release(self, key: str, token: Optional[str]) -> None:
+        if token is not None and hasattr(self.backend, "delete_if_equal"):
+            await self._call("delete_if_equal", self._lock_key(key), token)
+
+    async def _load(self, key: str, args, kwargs) -> Any:
+        acquired, token = await self._acquire(key)
+        if acquired:
+            try:
+                return await self._compute(key, args, kwargs)
+            finally:
+                await self._release(key, token)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            entry = await self._read(key)
+            if entry is not None:
+                return entry["value"]
+        return await self._compute(key, args, kwargs)
+
+    def _refresh_later(self, key: str, args, kwargs) -> None:
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+
+        async def refresh():
+            try:
+                acquired, token = await self._acquire(key)
+                if acquired:
+                    try:
+                        await self._compute(key, args, kwargs)
+                    finally:
+                        await self._release(key, token)
+            except Exception as e:
+                logger.error(f"后台刷新缓存 {key} 失败: {str(e)}")
+            finally:
+                self.refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
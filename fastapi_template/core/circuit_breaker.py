@@ -0,0 +1,129 @@
+# fastapi_template/core/circuit_breaker.py
+import threading
+import time
+from typing import Optional, Tuple, Type
+
+import redis
+
+from fastapi_template.core.logger import get_logger
+
+logger = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """熔断器打开，调用未执行
+
+    继承 redis.ConnectionError，捕获 RedisError 降级的调用方无需修改
+    """
+
+
+# MARK: 熔断器
+"""
+熔断器
+- closed：正常调用，连续失败达到 failure_threshold 次后打开
+- open：直接抛出 CircuitOpenError，不再等待超时，调用方立即走降级路径
+- 打开 reset_timeout 秒后进入 half_open，只放行一个探测调用；
+  探测成功则关闭，失败则重新打开并重新计时
+- 作为上下文管理器使用，同步和异步代码都可以：
+  with breaker: await client.get(key)
+- 只有 failures 中的异常计为失败，其他异常（例如编码错误）不影响状态
+"""
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        failures: Tuple[Type[BaseException], ...] = (redis.RedisError,),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = failures
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failure_count = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """当前状态，open 超过 reset_timeout 后显示为 half_open"""
+        with self._lock:
+            if self._state == OPEN and self._retry_due():
+                return HALF_OPEN
+            return self._state
+
+    def _retry_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """
+        是否允许本次调用
+
+        返回:
+            bool: closed 时允许；half_open 时只允许一个探测调用
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._retry_due():
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"{self.name} 已恢复，熔断器关闭")
+            self._state = CLOSED
+            self._failure_count = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failure_count += 1
+            if self._state == HALF_OPEN or (
+                self._failure_count >= self.failure_threshold
+            ):
+                if self._state != OPEN:
+                    logger.warning(
+                        f"{self.name} 连续失败 {self._failure_count} 次，"
+                        f"熔断 {self.reset_timeout} 秒"
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def reset(self) -> None:
+        """恢复到关闭状态"""
+        self.record_success()
+
+    # MARK: 上下文管理器
+    def __enter__(self) -> "CircuitBreaker":
+        if not self.allow():
+            raise CircuitOpenError(f"circuit breaker {self.name} is open")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback,
+    ) -> bool:
+        if exc_type is None:
+            self.record_success()
+        elif issubclass(exc_type, self.failures):
+            self.record_failure()
+        else:
+            # 与Redis无关的异常，放行的探测调用不算成功也不算失败
+            with self._lock:
+                self._probing = False
+        return False
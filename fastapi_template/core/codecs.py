@@ -0,0 +1,327 @@
+# fastapi_template/core/codecs.py
+import base64
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Union
+from uuid import UUID
+
+from fastapi_template.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# 载荷头：魔数 + 编码标记 + 压缩标记。魔数不是合法的JSON首字节，
+# 没有载荷头的值按旧格式（JSON）解码
+MAGIC = b"\xca"
+HEADER_SIZE = 3
+
+
+class CodecError(ValueError):
+    """载荷无法编码或解码"""
+
+
+# MARK: 类型转换
+"""
+JSON 不支持的类型
+- datetime/date/time、Decimal、set/frozenset、bytes 编码为带类型标记的
+  {"__t": 类型, "v": 值}，解码时还原为原类型；Decimal 保存为字符串，不丢精度
+- bytes 在 JSON 中为 base64 字符串；msgpack 原生支持，不经过这里
+- UUID 编码为字符串，读取时是 str：orjson 原生编码 UUID，无法加标记
+- pydantic 模型转为字典
+- 只有载荷中出现 "__t" 时才逐个检查字典，普通值的解码没有额外开销
+"""
+TYPE_KEY = "__t"
+TYPE_MARKER = b'"__t"'
+MSGPACK_TYPE_MARKER = b"__t"
+
+
+def _tagged(name: str, value: Any) -> Dict[str, Any]:
+    return {TYPE_KEY: name, "v": value}
+
+
+def _default(value: Any) -> Any:
+    # datetime 是 date 的子类，先判断
+    if isinstance(value, datetime):
+        return _tagged("datetime", value.isoformat())
+    if isinstance(value, date):
+        return _tagged("date", value.isoformat())
+    if isinstance(value, time):
+        return _tagged("time", value.isoformat())
+    if isinstance(value, Decimal):
+        return _tagged("decimal", str(value))
+    if isinstance(value, (set, frozenset)):
+        return _tagged("set", list(value))
+    if isinstance(value, bytes):
+        return _tagged("bytes", base64.b64encode(value).decode())
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "dict"):
+        return value.dict()
+    raise TypeError(
+        f"Object of type {type(value).__name__} is not serializable"
+    )
+
+
+DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "decimal": Decimal,
+    "set": set,
+    "bytes": base64.b64decode,
+}
+
+
+def _restore(obj: Dict[str, Any]) -> Any:
+    """object_hook：带类型标记的字典还原为原类型"""
+    if len(obj) == 2 and "v" in obj:
+        decoder = DECODERS.get(obj.get(TYPE_KEY))
+        if decoder is not None:
+            return decoder(obj["v"])
+    return obj
+
+
+def _restore_all(value: Any) -> Any:
+    # orjson.loads 没有 object_hook，解码后自底向上还原
+    if isinstance(value, dict):
+        return _restore({k: _restore_all(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_restore_all(item) for item in value]
+    return value
+
+
+# MARK: 编码
+"""
+编码
+- json：标准库，不需要额外依赖，也是旧版本写入的格式
+- orjson：输出同样是JSON，速度快数倍；未安装 orjson 时用标准库解码
+- msgpack：二进制格式，体积更小，原生支持 bytes
+"""
+class JsonCodec:
+    name = "json"
+    tag = b"j"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(
+            value, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    def loads(self, data: bytes) -> Any:
+        if TYPE_MARKER not in data:
+            return json.loads(data)
+        return json.loads(data, object_hook=_restore)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+    tag = b"o"
+
+    def dumps(self, value: Any) -> bytes:
+        # datetime 交给 _default 加类型标记，不使用 orjson 的原生编码
+        return orjson.dumps(
+            value,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+    def loads(self, data: bytes) -> Any:
+        if orjson is None:
+            return super().loads(data)
+        value = orjson.loads(data)
+        return _restore_all(value) if TYPE_MARKER in data else value
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    tag = b"m"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        if msgpack is None:
+            raise CodecError("msgpack is not installed")
+        return msgpack.unpackb(
+            data,
+            raw=False,
+            strict_map_key=False,
+            object_hook=_restore if MSGPACK_TYPE_MARKER in data else None,
+        )
+
+
+CODECS: Dict[str, Any] = {
+    codec.name: codec for codec in (JsonCodec(), OrjsonCodec(), MsgpackCodec())
+}
+CODEC_MODULES = {"orjson": orjson, "msgpack": msgpack}
+
+
+# MARK: 压缩
+"""
+压缩
+- zstd：压缩率高，适合较大的列表和正文
+- lz4：速度最快，压缩率略低
+- 都是可选依赖，读取时缺少对应的包视为无法解码
+"""
+class Compression:
+    def __init__(
+        self,
+        name: str,
+        tag: bytes,
+        module: Any,
+        compress: Callable[[bytes], bytes],
+        decompress: Callable[[bytes], bytes],
+    ):
+        self.name = name
+        self.tag = tag
+        self.module = module
+        self.compress = compress
+        self.decompress = decompress
+
+
+NO_COMPRESSION = b"n"
+
+COMPRESSIONS: Dict[str, Compression] = {
+    "zstd": Compression(
+        "zstd",
+        b"z",
+        zstandard,
+        lambda data: zstandard.ZstdCompressor().compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    ),
+    "lz4": Compression(
+        "lz4",
+        b"l",
+        lz4_frame,
+        lambda data: lz4_frame.compress(data),
+        lambda data: lz4_frame.decompress(data),
+    ),
+}
+
+
+# MARK: 序列化器
+"""
+缓存序列化器
+- 编码后的值超过 threshold 字节时压缩，压缩后没有变小则保留原值
+- 写入的值带3字节载荷头，记录编码和压缩方式；读取按载荷头解码，
+  与当前配置无关，滚动升级或切换配置期间新旧格式可以共存
+- json 编码且未压缩时不写载荷头，与旧版本写入的格式相同，
+  旧版本进程也能读取；升级时先保持 json，全部进程升级后再切换
+- 无法解码的值（未知标记、缺少依赖）记录警告并视为未命中
+"""
+class Serializer:
+    def __init__(
+        self,
+        codec: str = "json",
+        compression: Optional[str] = None,
+        threshold: int = 1024,
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported cache codec: {codec}")
+        if codec in CODEC_MODULES and CODEC_MODULES[codec] is None:
+            raise RuntimeError(f"Cache codec {codec} is not installed")
+        if compression in (None, "", "none"):
+            compression = None
+        elif compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported cache compression: {compression}")
+        elif COMPRESSIONS[compression].module is None:
+            raise RuntimeError(
+                f"Cache compression {compression} is not installed"
+            )
+        self.codec = CODECS[codec]
+        self.compression = compression and COMPRESSIONS[compression]
+        self.threshold = threshold
+
+    def dumps(self, value: Any) -> bytes:
+        """
+        编码缓存值
+
+        参数:
+            value: 值
+
+        返回:
+            bytes: 载荷
+        """
+        body = self.codec.dumps(value)
+        flag = NO_COMPRESSION
+        if self.compression is not None and len(body) >= self.threshold:
+            compressed = self.compression.compress(body)
+            if len(compressed) < len(body):
+                body, flag = compressed, self.compression.tag
+        if self.codec.tag == JsonCodec.tag and flag == NO_COMPRESSION:
+            return body
+        return MAGIC + self.codec.tag + flag + body
+
+    def loads(self, data: Optional[Union[bytes, str]]) -> Any:
+        """
+        解码缓存值
+
+        参数:
+            data: 载荷，None 或无法解码时返回None
+
+        返回:
+            Any: 值
+        """
+        if not data:
+            return None
+        try:
+            return decode(data)
+        except Exception as e:
+            # 解压和解码的异常类型各不相同，缓存问题不能让请求失败
+            logger.warning(f"无法解码缓存值，视为未命中: {str(e)}")
+            return None
+
+
+def decode(data: Union[bytes, str]) -> Any:
+    """按载荷头解码，出错时抛出 CodecError"""
+    if isinstance(data, str):
+        data = data.encode()
+    if not data.startswith(MAGIC):
+        return CODECS[JsonCodec.name].loads(data)
+    if len(data) < HEADER_SIZE:
+        raise CodecError("truncated cache payload")
+    codec_tag, flag = data[1:2], data[2:3]
+    body = data[HEADER_SIZE:]
+
+    if flag != NO_COMPRESSION:
+        compression = next(
+            (c for c in COMPRESSIONS.values() if c.tag == flag), None
+        )
+        if compression is None:
+            raise CodecError(f"unknown compression tag: {flag!r}")
+        if compression.module is None:
+            raise CodecError(f"{compression.name} is not installed")
+        body = compression.decompress(body)
+
+    codec = next((c for c in CODECS.values() if c.tag == codec_tag), None)
+    if codec is None:
+        raise CodecError(f"unknown codec tag: {codec_tag!r}")
+    return codec.loads(body)
+
+
+# 默认序列化器，由配置决定写入格式
+serializer = Serializer(
+    codec=settings.CACHE_CODEC,
+    compression=settings.CACHE_COMPRESSION,
+    threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+)
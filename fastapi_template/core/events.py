@@ -1,27 +1,368 @@
 # fastapi_template/core/events.py
-from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import concurrent.futures
+import importlib
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi_template.core.config import settings
+from fastapi_template.core.logger import get_logger
+
+logger = get_logger("events")
+
+# 排队订阅的队列满时的处理方式
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL)
+
+
+# MARK: 溢出到Celery
+"""
+溢出到Celery
+- 队列满时把事件交给 Celery 任务处理，由 worker 进程调用同一个处理函数
+- 数据经 jsonable_encoder 转换，处理函数收到的是字典而不是模型对象
+- 处理函数必须是模块级函数，worker 按 模块:名称 导入
+"""
+def spill_to_celery(subscription: "Subscription", data: Any) -> None:
+    from fastapi.encoders import jsonable_encoder
+
+    from fastapi_template.tasks import dispatch_event_task
+
+    callback = subscription.callback
+    dispatch_event_task.delay(
+        f"{callback.__module__}:{callback.__qualname__}",
+        jsonable_encoder(data),
+    )
+
+
+def resolve_handler(path: str) -> Callable:
+    """按 模块:名称 导入处理函数"""
+    module_name, _, name = path.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for attribute in name.split("."):
+        target = getattr(target, attribute)
+    return target
+
+
+# MARK: 排队订阅
+"""
+排队订阅
+- 每个订阅一个有界 asyncio.Queue，由 concurrency 个 worker 任务消费
+- 协程处理函数在事件循环中执行，普通函数在线程池中执行，不阻塞事件循环
+- 处理函数出错只记录日志和计数，不影响发布者和其他事件
+- 统计计数可能在多个线程中更新，通过 count() 加锁修改
+"""
+class Subscription:
+    def __init__(
+        self,
+        event_type: str,
+        callback: Callable,
+        queue_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        overflow: Optional[str] = None,
+        spill: Optional[Callable[["Subscription", Any], None]] = None,
+    ):
+        overflow = overflow or settings.EVENT_OVERFLOW
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow}")
+        self.event_type = event_type
+        self.callback = callback
+        self.queue_size = queue_size or settings.EVENT_QUEUE_SIZE
+        self.concurrency = concurrency or settings.EVENT_CONCURRENCY
+        self.overflow = overflow
+        self.spill = spill or spill_to_celery
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.stats = {
+            "published": 0,
+            "processed": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "errors": 0,
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    def count(self, name: str) -> None:
+        """统计计数加一"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """统计计数的一致副本"""
+        with self._lock:
+            return dict(self.stats)
+
+    def failed(self) -> None:
+        """记录处理函数出错"""
+        self.count("errors")
+        logger.exception(
+            f"事件 {self.event_type} 的处理函数 {self.name} 出错"
+        )
+
+    async def handle(self, data: Any) -> None:
+        """调用处理函数，异常只记录不抛出"""
+        try:
+            if inspect.iscoroutinefunction(self.callback):
+                await self.callback(data)
+            else:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.callback, data
+                )
+            self.count("processed")
+        except Exception:
+            self.failed()
+
+    async def complete(self, pending: Awaitable) -> None:
+        """等待处理函数返回的协程，异常只记录不抛出"""
+        try:
+            await pending
+            self.count("processed")
+        except Exception:
+            self.failed()
+
 
 # MARK: 事件总线类
+"""
+事件总线
+- subscribe(queued=False)：发布者线程中同步调用，与之前相同；
+  缓存失效、索引更新等需要在请求结束前生效的处理使用这种方式
+- subscribe(queued=True)：发布时只入队（微秒级），由后台 worker 处理；
+  发送邮件等慢操作使用这种方式
+- 队列满时按 overflow 处理：
+  block 等待队列有空位（最多 EVENT_BLOCK_TIMEOUT 秒，超时丢弃）；
+  drop_oldest 丢弃最早的事件；spill 交给 Celery
+- 在事件循环线程中同步发布时不能阻塞，block 按 drop_oldest 处理；
+  async def 中可以用 await publish_async() 等待队列空位
+- start() 之前（CLI、脚本、测试）排队订阅也在发布者线程中同步调用；
+  协程处理函数在发布者线程没有事件循环时用 asyncio.run() 执行，
+  已有运行中的事件循环时作为任务交给该循环
+"""
 class EventBus:
     def __init__(self):
         self.subscribers: Dict[str, List[Callable]] = {}
-        
-    def subscribe(self, event_type: str, callback: Callable) -> None:
-        """订阅事件"""
-        if event_type not in self.subscribers:
-            self.subscribers[event_type] = []
-        self.subscribers[event_type].append(callback)
-        
+        self.queued: Dict[str, List[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 保存内联调度的协程任务的引用，避免被垃圾回收
+        self._tasks: Set[asyncio.Task] = set()
+
+    def subscribe(
+        self,
+        event_type: str,
+        callback: Callable,
+        queued: bool = False,
+        queue_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        overflow: Optional[str] = None,
+        spill: Optional[Callable[[Subscription, Any], None]] = None,
+    ) -> None:
+        """
+        订阅事件
+
+        参数:
+            event_type: 事件类型
+            callback: 处理函数，排队订阅时可以是协程函数
+            queued: 是否排队异步处理
+            queue_size: 队列长度，默认 EVENT_QUEUE_SIZE
+            concurrency: worker 数，默认 EVENT_CONCURRENCY
+            overflow: 队列满时的处理方式，默认 EVENT_OVERFLOW
+            spill: overflow 为 spill 时调用，默认交给 Celery
+        """
+        if not queued:
+            if event_type not in self.subscribers:
+                self.subscribers[event_type] = []
+            self.subscribers[event_type].append(callback)
+            return
+
+        subscription = Subscription(
+            event_type, callback, queue_size, concurrency, overflow, spill
+        )
+        self.queued.setdefault(event_type, []).append(subscription)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._start_workers, subscription)
+
     def unsubscribe(self, event_type: str, callback: Callable) -> None:
         """取消订阅事件"""
         if event_type in self.subscribers and callback in self.subscribers[event_type]:
             self.subscribers[event_type].remove(callback)
-            
+        for subscription in list(self.queued.get(event_type, [])):
+            if subscription.callback == callback:
+                self.queued[event_type].remove(subscription)
+                for worker in subscription.workers:
+                    worker.get_loop().call_soon_threadsafe(worker.cancel)
+
     def publish(self, event_type: str, data: Optional[Any] = None) -> None:
         """发布事件"""
         if event_type in self.subscribers:
             for callback in self.subscribers[event_type]:
                 callback(data)
+        for subscription in self.queued.get(event_type, []):
+            subscription.count("published")
+            self._dispatch(subscription, data)
+
+    async def publish_async(
+        self, event_type: str, data: Optional[Any] = None
+    ) -> None:
+        """在事件循环中发布，block 策略的队列满时等待空位"""
+        if event_type in self.subscribers:
+            for callback in self.subscribers[event_type]:
+                callback(data)
+        for subscription in self.queued.get(event_type, []):
+            subscription.count("published")
+            if (
+                subscription.overflow == OVERFLOW_BLOCK
+                and subscription.queue is not None
+            ):
+                await subscription.queue.put(data)
+            else:
+                self._dispatch(subscription, data)
+
+    # MARK: 分发
+    def _dispatch(self, subscription: Subscription, data: Any) -> None:
+        loop = self._loop
+        if loop is None or subscription.queue is None:
+            self._call_inline(subscription, data)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._enqueue(subscription, data)
+        elif subscription.overflow == OVERFLOW_BLOCK:
+            # 在其他线程（同步路由的线程池）中发布，可以阻塞等待空位
+            future = asyncio.run_coroutine_threadsafe(
+                subscription.queue.put(data), loop
+            )
+            try:
+                future.result(timeout=settings.EVENT_BLOCK_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                subscription.count("dropped")
+                logger.warning(
+                    f"事件 {subscription.event_type} 的队列已满，"
+                    f"等待超时后丢弃"
+                )
+        else:
+            loop.call_soon_threadsafe(self._enqueue, subscription, data)
+
+    def _enqueue(self, subscription: Subscription, data: Any) -> None:
+        queue = subscription.queue
+        try:
+            queue.put_nowait(data)
+            return
+        except asyncio.QueueFull:
+            pass
+        if subscription.overflow == OVERFLOW_SPILL:
+            try:
+                subscription.spill(subscription, data)
+                subscription.count("spilled")
+            except Exception:
+                subscription.count("dropped")
+                logger.exception(
+                    f"事件 {subscription.event_type} 溢出处理失败，已丢弃"
+                )
+            return
+        queue.get_nowait()
+        queue.task_done()
+        queue.put_nowait(data)
+        subscription.count("dropped")
+
+    def _call_inline(self, subscription: Subscription, data: Any) -> None:
+        try:
+            result = subscription.callback(data)
+            if inspect.isawaitable(result):
+                try:
+                    running = asyncio.get_running_loop()
+                except RuntimeError:
+                    running = None
+                if running is not None:
+                    # 当前线程的事件循环正在运行，不能 asyncio.run()
+                    task = running.create_task(subscription.complete(result))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    return
+                asyncio.run(result)
+            subscription.count("processed")
+        except Exception:
+            subscription.failed()
+
+    # MARK: 启动和停止
+    async def start(self) -> None:
+        """在事件循环中启动排队订阅的 worker"""
+        self._loop = asyncio.get_running_loop()
+        for subscriptions in self.queued.values():
+            for subscription in subscriptions:
+                self._start_workers(subscription)
+
+    def _start_workers(self, subscription: Subscription) -> None:
+        if subscription.workers:
+            return
+        subscription.queue = asyncio.Queue(maxsize=subscription.queue_size)
+        subscription.workers = [
+            asyncio.get_running_loop().create_task(self._work(subscription))
+            for _ in range(subscription.concurrency)
+        ]
+
+    async def _work(self, subscription: Subscription) -> None:
+        queue = subscription.queue
+        while True:
+            data = await queue.get()
+            try:
+                await subscription.handle(data)
+            finally:
+                queue.task_done()
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        停止 worker
+
+        参数:
+            timeout: 等待队列中剩余事件处理完的最长时间（秒）
+        """
+        subscriptions = [
+            subscription
+            for subscriptions in self.queued.values()
+            for subscription in subscriptions
+            if subscription.queue is not None
+        ]
+        if subscriptions:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(s.queue.join() for s in subscriptions)),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("停止事件总线时仍有未处理的事件")
+        for subscription in subscriptions:
+            for worker in subscription.workers:
+                worker.cancel()
+            await asyncio.gather(*subscription.workers, return_exceptions=True)
+            subscription.workers = []
+            subscription.queue = None
+        self._loop = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """各排队订阅的统计和当前队列长度"""
+        return [
+            dict(
+                event_type=subscription.event_type,
+                handler=subscription.name,
+                overflow=subscription.overflow,
+                queued=(
+                    subscription.queue.qsize()
+                    if subscription.queue is not None else 0
+                ),
+                **subscription.snapshot(),
+            )
+            for subscriptions in self.queued.values()
+            for subscription in subscriptions
+        ]
 
 # MARK: 创建单例实例
 event_bus = EventBus()
@@ -35,4 +376,15 @@ class EventTypes:
     USER_DELETED = "user_deleted"
     CONTENT_CREATED = "content_created"
     CONTENT_UPDATED = "content_updated"
-    CONTENT_DELETED = "content_deleted"
\ No newline at end of file
+    CONTENT_DELETED = "content_deleted"
+    POST_CREATED = "post_created"
+    POST_UPDATED = "post_updated"
+    POST_DELETED = "post_deleted"
+    COMMENT_CREATED = "comment_created"
+    LIKE_CREATED = "like_created"
+    LIKE_DELETED = "like_deleted"
+    # 批量导入事件，数据为本分块写入的模型列表
+    POSTS_IMPORTED = "posts_imported"
+    COMMENTS_IMPORTED = "comments_imported"
+    CONTENTS_IMPORTED = "contents_imported"
+    USERS_IMPORTED = "users_imported"
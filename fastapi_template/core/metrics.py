@@ -0,0 +1,302 @@
+# fastapi_template/core/metrics.py
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import (
+    Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+)
+
+# 延迟直方图的桶上限（秒），最后一个桶为 +Inf
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+# 命名空间标签数上限，超出后新的命名空间记为 OTHER_NAMESPACE
+MAX_NAMESPACES = 100
+OTHER_NAMESPACE = "other"
+
+
+def namespace_of(key: str) -> str:
+    """
+    键的命名空间：最多前两段，且不含最后一段（具体条目的键）
+
+    例如 response:blog.get_post:{版本}:post_id=1 → response:blog.get_post，
+    cached:module.func:args → cached:module.func，
+    tag:post:42:version → tag:post，response:a → response
+    """
+    parts = key.split(":", 2)
+    if len(parts) == 1:
+        return "-"
+    return ":".join(parts[:2]) if len(parts) == 3 else parts[0]
+
+
+# MARK: 直方图
+"""
+延迟直方图
+- 固定桶，记录各桶的计数、总次数和总耗时
+- 分位数按桶上限估算，精度取决于桶的划分，足够用于发现慢的键族
+"""
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """估算分位数，落在 +Inf 桶时返回最大的有限桶上限"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus 格式的累计桶"""
+        result, seen = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            result.append((repr(bound), seen))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class NamespaceStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.latency = Histogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        p50 = self.latency.quantile(0.5)
+        p99 = self.latency.quantile(0.99)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "errors": self.errors,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": (
+                self.bytes_read / self.hits if self.hits else 0
+            ),
+            "calls": self.latency.count,
+            "latency_ms_avg": (
+                self.latency.sum / self.latency.count * 1000
+                if self.latency.count else 0.0
+            ),
+            "latency_ms_p50": p50 * 1000 if p50 is not None else None,
+            "latency_ms_p99": p99 * 1000 if p99 is not None else None,
+        }
+
+
+# MARK: 单次调用
+class Measurement:
+    """一次缓存调用的记录，由 CacheMetrics.measure 创建"""
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = keys
+        self.values: Optional[Sequence[Any]] = None
+        self.written: Optional[Sequence[Any]] = None
+        self.deleted = False
+
+    def read(self, values: Sequence[Any]) -> None:
+        """读取的结果，按键的顺序，None 为未命中"""
+        self.values = values
+
+    def write(self, values: Sequence[Any]) -> None:
+        """写入的载荷，按键的顺序"""
+        self.written = values
+
+    def delete(self) -> None:
+        self.deleted = True
+
+
+# MARK: 缓存指标
+"""
+缓存指标
+- 按 (层, 命名空间) 统计命中、未命中、写入、删除、错误、读写字节数和延迟
+- 层：redis 为Redis往返（含 AsyncRedisCache），l1 为 TieredCache 的进程内缓存
+- 命名空间取键的前两段（见 namespace_of），例如响应缓存的路由、
+  @cached 的函数，可以看出具体哪个缓存命中率低
+- 命名空间数超过 MAX_NAMESPACES 后新的命名空间合并为 other，
+  键的设计不当时指标数量不会无限增长
+- 指标保存在当前进程内，多进程部署时每个进程分别统计
+- 通过 /api/v1/metrics（Prometheus）和 fastapi cache-report 查看
+"""
+class CacheMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], NamespaceStats] = defaultdict(
+            NamespaceStats
+        )
+        self._namespaces: Set[str] = set()
+        self.started_at = time.time()
+
+    def _namespace(self, key: str) -> str:
+        # 调用方持有 self._lock
+        namespace = namespace_of(key)
+        if namespace in self._namespaces:
+            return namespace
+        if len(self._namespaces) >= MAX_NAMESPACES:
+            return OTHER_NAMESPACE
+        self._namespaces.add(namespace)
+        return namespace
+
+    @contextmanager
+    def measure(
+        self, tier: str, keys: Sequence[str]
+    ) -> Iterator[Measurement]:
+        """
+        记录一次缓存调用，批量调用按命名空间分组，每组记录一次延迟
+
+        参数:
+            tier: 层，redis 或 l1
+            keys: 本次调用涉及的键
+
+        返回:
+            Measurement: 在调用中记录读写结果
+        """
+        measurement = Measurement(keys)
+        start = time.perf_counter()
+        try:
+            yield measurement
+        except Exception:
+            self._record(tier, measurement, time.perf_counter() - start, True)
+            raise
+        self._record(tier, measurement, time.perf_counter() - start, False)
+
+    def _record(
+        self,
+        tier: str,
+        measurement: Measurement,
+        elapsed: float,
+        error: bool,
+    ) -> None:
+        with self._lock:
+            namespaces = [self._namespace(key) for key in measurement.keys]
+            for namespace in dict.fromkeys(namespaces):
+                stats = self._stats[(tier, namespace)]
+                stats.latency.observe(elapsed)
+                if error:
+                    stats.errors += 1
+            if error:
+                return
+            if measurement.values is not None:
+                for namespace, data in zip(namespaces, measurement.values):
+                    stats = self._stats[(tier, namespace)]
+                    if data is None:
+                        stats.misses += 1
+                    else:
+                        stats.hits += 1
+                        stats.bytes_read += len(data)
+            if measurement.written is not None:
+                for namespace, data in zip(namespaces, measurement.written):
+                    stats = self._stats[(tier, namespace)]
+                    stats.sets += 1
+                    stats.bytes_written += len(data)
+            if measurement.deleted:
+                for namespace in namespaces:
+                    self._stats[(tier, namespace)].deletes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        当前统计
+
+        返回:
+            Dict[str, Any]: 统计开始时间和各 (层, 命名空间) 的统计
+        """
+        with self._lock:
+            namespaces = [
+                dict(tier=tier, namespace=namespace, **stats.snapshot())
+                for (tier, namespace), stats in sorted(self._stats.items())
+            ]
+        return {"since": self.started_at, "namespaces": namespaces}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._namespaces.clear()
+            self.started_at = time.time()
+
+    # MARK: Prometheus
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        counters = (
+            ("hits", "Cache hits"),
+            ("misses", "Cache misses"),
+            ("sets", "Cache writes"),
+            ("deletes", "Cache deletes"),
+            ("errors", "Cache backend errors"),
+            ("bytes_read", "Bytes read from the cache"),
+            ("bytes_written", "Bytes written to the cache"),
+        )
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+            for name, help_text in counters:
+                lines.append(f"# HELP cache_{name}_total {help_text}")
+                lines.append(f"# TYPE cache_{name}_total counter")
+                for (tier, namespace), stats in items:
+                    labels = _labels(tier=tier, namespace=namespace)
+                    lines.append(
+                        f"cache_{name}_total{{{labels}}} "
+                        f"{getattr(stats, name)}"
+                    )
+            lines.append(
+                "# HELP cache_latency_seconds Cache call latency"
+            )
+            lines.append("# TYPE cache_latency_seconds histogram")
+            for (tier, namespace), stats in items:
+                labels = _labels(tier=tier, namespace=namespace)
+                for bound, count in stats.latency.cumulative():
+                    lines.append(
+                        f"cache_latency_seconds_bucket"
+                        f"{{{labels},le=\"{bound}\"}} {count}"
+                    )
+                lines.append(
+                    f"cache_latency_seconds_sum{{{labels}}} "
+                    f"{stats.latency.sum}"
+                )
+                lines.append(
+                    f"cache_latency_seconds_count{{{labels}}} "
+                    f"{stats.latency.count}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return (
+            value.replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n")
+        )
+    return ",".join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    )
+
+
+# MARK: 创建单例实例
+cache_metrics = CacheMetrics()
@@ -0,0 +1,364 @@
+# fastapi_template/core/outbox.py
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, event, update
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventBus
+from fastapi_template.core.logger import get_logger
+from fastapi_template.models.outbox import OutboxEvent
+
+logger = get_logger("outbox")
+
+# session.info 中的标记：本事务写入了发件箱事件，提交后唤醒中继
+PENDING = "outbox_pending"
+
+Message = Dict[str, Any]
+Sink = Callable[[List[Message]], None]
+
+# MARK: 可靠事件总线
+"""
+可靠事件总线
+- 接收中继投递的发件箱事件，数据为 JSON 解码后的字典，不是模型对象
+- 至少一次投递：中继或进程崩溃后会重发，处理函数需要幂等
+- 与 core.events.event_bus 分开：event_bus 的处理函数在写入后同步调用，
+  接收模型对象，用于缓存失效和索引更新等进程内状态
+"""
+outbox_bus = EventBus()
+
+
+# MARK: 投递目标
+def event_bus_sink(messages: List[Message]) -> None:
+    """发布到本进程的 outbox_bus"""
+    for message in messages:
+        outbox_bus.publish(message["event_type"], message["data"])
+
+
+def celery_sink(messages: List[Message]) -> None:
+    """整批交给一个 Celery 任务，在 worker 进程中发布到 outbox_bus"""
+    from fastapi_template.tasks import dispatch_outbox_task
+
+    dispatch_outbox_task.delay(messages)
+
+
+def redis_sink(messages: List[Message]) -> None:
+    """用一次 pipeline 把整批写入 Redis Stream，供其他服务消费"""
+    import redis
+
+    from fastapi_template.core.cache import get_redis_pool
+
+    stream = settings.OUTBOX_STREAM
+    if settings.CACHE_KEY_PREFIX:
+        stream = f"{settings.CACHE_KEY_PREFIX}:{stream}"
+    client = redis.Redis(connection_pool=get_redis_pool())
+    pipeline = client.pipeline(transaction=False)
+    for message in messages:
+        pipeline.xadd(
+            stream,
+            {
+                "id": message["id"],
+                "event_type": message["event_type"],
+                "data": json.dumps(message["data"]),
+                "created_at": message["created_at"],
+            },
+            maxlen=settings.OUTBOX_STREAM_MAXLEN,
+            approximate=True,
+        )
+    pipeline.execute()
+
+
+def message_of(row: OutboxEvent) -> Message:
+    return {
+        "id": row.id,
+        "event_type": row.event_type,
+        "data": json.loads(row.payload),
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+SINKS: Dict[str, Sink] = {
+    "event_bus": event_bus_sink,
+    "celery": celery_sink,
+    "redis": redis_sink,
+}
+
+
+# MARK: 发件箱
+"""
+发件箱
+- add() 在调用方的事务中加入一行 outbox_event，随业务数据一起提交，
+  每次写入只多一条 INSERT；事务回滚时事件一起撤销，不会发出未提交的数据
+- add_many() 为批量写入的每个实体各记录一个事件，一次 flush 批量插入
+- 提交后唤醒中继，由中继在后台分批投递，写请求不等待投递
+"""
+class Outbox:
+    def add(
+        self,
+        session: OrmSession,
+        event_type: str,
+        data: Optional[Any] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> OutboxEvent:
+        """
+        在当前事务中记录事件
+
+        参数:
+            session: 业务数据所在的会话，事件随它一起提交
+            event_type: 事件类型
+            data: 事件数据，模型对象会先 flush 以取得主键
+            exclude: 不写入事件的字段，例如 password
+
+        返回:
+            OutboxEvent: 已加入会话的发件箱行
+        """
+        session.flush()
+        outbox_event = OutboxEvent(
+            event_type=event_type,
+            payload=json.dumps(jsonable_encoder(data, exclude=exclude)),
+        )
+        session.add(outbox_event)
+        session.info[PENDING] = True
+        return outbox_event
+
+    def add_many(
+        self,
+        session: OrmSession,
+        event_type: str,
+        items: List[Any],
+        exclude: Optional[Set[str]] = None,
+    ) -> List[OutboxEvent]:
+        """
+        在当前事务中为每个实体记录一个事件
+
+        参数:
+            session: 业务数据所在的会话，事件随它一起提交
+            event_type: 事件类型
+            items: 事件数据，每项一个事件
+            exclude: 不写入事件的字段，例如 password
+
+        返回:
+            List[OutboxEvent]: 已加入会话的发件箱行
+        """
+        if not items:
+            return []
+        session.flush()
+        outbox_events = [
+            OutboxEvent(
+                event_type=event_type,
+                payload=json.dumps(jsonable_encoder(item, exclude=exclude)),
+            )
+            for item in items
+        ]
+        session.add_all(outbox_events)
+        session.info[PENDING] = True
+        return outbox_events
+
+
+# MARK: 中继
+"""
+中继
+- 按 id 顺序每次读取 batch_size 行 next_attempt_at 已到的事件，
+  整批交给投递目标，成功后一条 DELETE 删除
+- Postgres 上使用 FOR UPDATE SKIP LOCKED，多个进程的中继不会重复投递同一批
+- 整批投递失败时逐条重试，失败的事件单独记录错误并按指数退避推迟，
+  同批的其他事件照常投递；目标整体不可用时所有事件各自退避，
+  重试间隔随失败次数增长，不会在短暂故障中耗尽重试
+- 创建超过 OUTBOX_MAX_AGE 秒的事件不再读取，留在表中待排查
+- 退避中的事件不阻塞后面的事件，同一类型的事件投递顺序不再保证
+- start() 启动后台线程：提交后立即唤醒，空闲时每 OUTBOX_POLL_INTERVAL 秒检查一次
+"""
+class OutboxRelay:
+    def __init__(
+        self,
+        sink: Optional[Sink] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        engine: Any = None,
+    ):
+        self._sink = sink
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.interval = interval or settings.OUTBOX_POLL_INTERVAL
+        self._engine = engine
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def sink(self) -> Sink:
+        if self._sink is not None:
+            return self._sink
+        name = settings.OUTBOX_SINK
+        if name not in SINKS:
+            raise ValueError(f"Unsupported outbox sink: {name}")
+        return SINKS[name]
+
+    @property
+    def engine(self) -> Any:
+        if self._engine is not None:
+            return self._engine
+        from fastapi_template.db import engine
+
+        return engine
+
+    def drain_once(self) -> int:
+        """
+        投递一批事件，失败的事件记录错误并推迟重试
+
+        返回:
+            int: 投递成功的事件数
+        """
+        return self._drain_batch()[1]
+
+    def _drain_batch(self) -> Tuple[int, int]:
+        now = datetime.utcnow()
+        with Session(self.engine) as session:
+            rows = session.exec(
+                select(OutboxEvent)
+                .where(OutboxEvent.next_attempt_at <= now)
+                .where(
+                    OutboxEvent.created_at
+                    >= now - timedelta(seconds=settings.OUTBOX_MAX_AGE)
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return 0, 0
+            delivered, failed = self._deliver(rows)
+            if delivered:
+                session.execute(
+                    delete(OutboxEvent).where(OutboxEvent.id.in_(delivered))
+                )
+            for row, error in failed:
+                self._retry_later(session, row, error, now)
+            session.commit()
+            return len(rows), len(delivered)
+
+    def _deliver(
+        self, rows: List[OutboxEvent]
+    ) -> Tuple[List[int], List[Tuple[OutboxEvent, Exception]]]:
+        """整批投递，失败时逐条投递，返回成功的 id 和失败的行"""
+        pending, failed = [], []
+        for row in rows:
+            try:
+                pending.append((row, message_of(row)))
+            except ValueError as e:
+                failed.append((row, e))
+        if not pending:
+            return [], failed
+        try:
+            self.sink([message for _, message in pending])
+            return [row.id for row, _ in pending], failed
+        except Exception:
+            logger.warning("发件箱整批投递失败，改为逐条投递", exc_info=True)
+        delivered = []
+        for row, message in pending:
+            try:
+                self.sink([message])
+                delivered.append(row.id)
+            except Exception as e:
+                failed.append((row, e))
+        return delivered, failed
+
+    @staticmethod
+    def _retry_later(
+        session: Session, row: OutboxEvent, error: Exception, now: datetime
+    ) -> None:
+        attempts = row.attempts + 1
+        delay = min(
+            settings.OUTBOX_RETRY_BASE * 2 ** (attempts - 1),
+            settings.OUTBOX_RETRY_MAX,
+        )
+        next_attempt_at = now + timedelta(seconds=delay)
+        deadline = row.created_at + timedelta(seconds=settings.OUTBOX_MAX_AGE)
+        if next_attempt_at > deadline:
+            logger.error(
+                f"发件箱事件 {row.id}（{row.event_type}）超过 "
+                f"{settings.OUTBOX_MAX_AGE} 秒仍未投递，不再重试: {error!r}"
+            )
+        else:
+            logger.warning(
+                f"发件箱事件 {row.id}（{row.event_type}）投递失败，"
+                f"{delay:.0f} 秒后重试: {error!r}"
+            )
+        session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == row.id)
+            .values(
+                attempts=attempts,
+                last_error=repr(error)[:500],
+                next_attempt_at=next_attempt_at,
+            )
+        )
+
+    def drain(self) -> int:
+        """
+        投递所有已到重试时间的事件，直到没有可投递的事件
+
+        返回:
+            int: 投递成功的事件数
+        """
+        total = 0
+        while True:
+            try:
+                fetched, delivered = self._drain_batch()
+            except Exception:
+                # 数据库不可用等，下次唤醒时重试
+                logger.exception("读取发件箱失败，稍后重试")
+                return total
+            total += delivered
+            if fetched < self.batch_size:
+                return total
+
+    def notify(self) -> None:
+        """有新事件提交，唤醒后台线程"""
+        self._wake.set()
+
+    # MARK: 后台线程
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="outbox-relay", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.drain()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止后台线程，退出前投递剩余事件"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+# MARK: 创建单例实例
+outbox = Outbox()
+outbox_relay = OutboxRelay()
+
+
+# MARK: 提交后唤醒中继
+@event.listens_for(OrmSession, "after_commit")
+def _notify_relay(session: OrmSession) -> None:
+    if session.info.pop(PENDING, False):
+        outbox_relay.notify()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session: OrmSession) -> None:
+    session.info.pop(PENDING, None)
@@ -0,0 +1,241 @@
+# fastapi_template/core/response_cache.py
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import redis
+
+from fastapi_template.core.cache import MemoryCache, cache
+from fastapi_template.core.cache_namespace import (
+    CacheNamespace, invalidate_tags
+)
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventBus, EventTypes, event_bus
+from fastapi_template.core.logger import get_logger
+
+logger = get_logger("response_cache")
+
+# 路由名称常量，缓存键和失效逻辑共用
+BLOG_POST_ROUTE = "blog.get_post"
+BLOG_POSTS_ROUTE = "blog.get_posts"
+
+
+def post_tag(post_id: int) -> str:
+    """与某篇文章有关的缓存条目的标签"""
+    return f"post:{post_id}"
+
+
+# MARK: 响应缓存类
+"""
+响应缓存
+- 基于RedisCache，Redis不可用时降级到进程内的MemoryCache
+- 每个路由一个 CacheNamespace，缓存键由路由参数生成，参数顺序不影响键
+- 条目可以带标签（例如 post:42），写操作按标签精确失效，不扫描键；
+  列表类路由使命名空间失效，所有参数组合在 O(1) 内一起失效
+- 统计命中、未命中、失效和错误次数
+"""
+class ResponseCache:
+    def __init__(
+        self,
+        backend: Any = None,
+        fallback: Any = None,
+        prefix: str = "response",
+        ttl: Optional[int] = None,
+    ):
+        self.backend = backend if backend is not None else cache
+        self.fallback = fallback if fallback is not None else MemoryCache()
+        self.prefix = prefix
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+        self._lock = threading.Lock()
+        self._namespaces: Dict[
+            str, Tuple[CacheNamespace, CacheNamespace]
+        ] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "invalidations": 0,
+            "errors": 0,
+        }
+
+    # MARK: 后端调用
+    def _namespace(self, route: str) -> Tuple[CacheNamespace, CacheNamespace]:
+        # 主后端和降级后端上各一个同名命名空间
+        with self._lock:
+            if route not in self._namespaces:
+                name = f"{self.prefix}:{route}"
+                self._namespaces[route] = (
+                    CacheNamespace(name, backend=self.backend, ttl=self.ttl),
+                    CacheNamespace(name, backend=self.fallback, ttl=self.ttl),
+                )
+            return self._namespaces[route]
+
+    def _call(self, route: str, method: str, *args, **kwargs) -> Any:
+        # Redis出错时记录并降级到内存缓存，缓存问题不能让请求失败
+        primary, fallback = self._namespace(route)
+        try:
+            return getattr(primary, method)(*args, **kwargs)
+        except redis.RedisError as e:
+            self._degraded(e)
+            return getattr(fallback, method)(*args, **kwargs)
+
+    def _degraded(self, error: redis.RedisError) -> None:
+        self._count("errors")
+        logger.warning(f"缓存后端不可用，使用内存缓存: {str(error)}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    # MARK: 缓存键
+    @staticmethod
+    def _query(params: Optional[Dict[str, Any]]) -> str:
+        query = "&".join(
+            f"{name}={value}" for name, value in sorted((params or {}).items())
+        )
+        if len(query) > 128:
+            query = hashlib.sha1(query.encode()).hexdigest()
+        return query
+
+    def make_key(
+        self,
+        route: str,
+        params: Optional[Dict[str, Any]] = None,
+        generation: Optional[str] = None,
+    ) -> str:
+        """
+        生成缓存键
+
+        参数:
+            route: 路由名称
+            params: 路由参数
+            generation: 路由代际，列表类路由使用
+
+        返回:
+            str: 缓存键
+        """
+        parts = [self.prefix, route]
+        if generation is not None:
+            parts.append(f"g{generation}")
+        parts.append(self._query(params))
+        return ":".join(parts)
+
+    def generation(self, route: str) -> str:
+        """获取路由当前代际，即路由命名空间的版本"""
+        return self._call(route, "version", create=True)
+
+    # MARK: 读取或计算
+    def cached(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        读取缓存，未命中时计算并写入
+
+        参数:
+            route: 路由名称
+            params: 路由参数
+            compute: 未命中时调用，返回值必须可JSON序列化
+            ttl: 过期时间（秒）
+            tags: 标签，invalidate_tags() 按标签失效
+
+        返回:
+            Any: 缓存值或计算结果
+        """
+        key = self._query(params)
+        value = self._call(route, "get", key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        # 计算之前读取版本，计算期间的失效会让写入的旧值立即失效
+        versions = self._call(route, "snapshot", tags)
+        value = compute()
+        if value is not None:
+            self._call(route, "set", key, value, ttl, tags, versions)
+            self._count("sets")
+        return value
+
+    # MARK: 失效
+    def invalidate(self, route: str, params: Dict[str, Any]) -> None:
+        """精确删除某个路由参数组合的缓存"""
+        self._call(route, "delete", self._query(params))
+        self._count("invalidations")
+
+    def invalidate_route(self, route: str) -> None:
+        """更新路由命名空间的版本，使该路由所有参数组合的缓存失效"""
+        self._call(route, "invalidate")
+        self._count("invalidations")
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """使带有这些标签的条目失效，标签在所有路由之间共享"""
+        if not tags:
+            return
+        try:
+            invalidate_tags(*tags, backend=self.backend)
+        except redis.RedisError as e:
+            self._degraded(e)
+            invalidate_tags(*tags, backend=self.fallback)
+        self._count("invalidations")
+
+    # MARK: 统计
+    def stats(self) -> Dict[str, Any]:
+        """返回命中率等统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+    # MARK: 事件订阅
+    def register_event_handlers(self, bus: EventBus = event_bus) -> None:
+        """订阅文章、评论和点赞事件，精确失效相关缓存"""
+        bus.subscribe(EventTypes.POST_CREATED, self._on_post_changed)
+        bus.subscribe(EventTypes.POST_UPDATED, self._on_post_changed)
+        bus.subscribe(EventTypes.POST_DELETED, self._on_post_deleted)
+        bus.subscribe(EventTypes.COMMENT_CREATED, self._on_post_child_changed)
+        bus.subscribe(EventTypes.LIKE_CREATED, self._on_post_child_changed)
+        bus.subscribe(EventTypes.LIKE_DELETED, self._on_post_child_changed)
+        bus.subscribe(EventTypes.POSTS_IMPORTED, self._on_posts_imported)
+        bus.subscribe(EventTypes.COMMENTS_IMPORTED, self._on_comments_imported)
+
+    def _invalidate_post(self, post_id: int) -> None:
+        # 与文章有关的条目按标签失效；评论数、点赞数和热度会影响列表，
+        # 列表整体失效
+        self.invalidate_tags(post_tag(post_id))
+        self.invalidate_route(BLOG_POSTS_ROUTE)
+
+    def _on_post_changed(self, post) -> None:
+        self._invalidate_post(post.id)
+
+    def _on_post_deleted(self, post_id: int) -> None:
+        self._invalidate_post(post_id)
+
+    def _on_post_child_changed(self, child) -> None:
+        # 评论和点赞都带有post_id
+        self._invalidate_post(child.post_id)
+
+    def _on_posts_imported(self, posts) -> None:
+        # 新导入的文章没有详情缓存，只需失效列表
+        self.invalidate_route(BLOG_POSTS_ROUTE)
+
+    def _on_comments_imported(self, comments) -> None:
+        # 所有涉及的文章标签一次写入
+        self.invalidate_tags(*sorted(
+            {post_tag(comment.post_id) for comment in comments}
+        ))
+        self.invalidate_route(BLOG_POSTS_ROUTE)
+
+
+# MARK: 创建单例实例
+response_cache = ResponseCache()
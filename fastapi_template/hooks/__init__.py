@@ -1,5 +1,6 @@
 from fastapi_template.hooks.use_auth import UseAuth, use_auth
+from fastapi_template.hooks.use_loaders import Loaders, use_loaders
 
 __all__ = [
-    "UseAuth", "use_auth"
-] 
\ No newline at end of file
+    "UseAuth", "use_auth", "Loaders", "use_loaders"
+] 
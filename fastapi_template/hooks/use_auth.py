@@ -1,23 +1,40 @@
-from typing import Callable, Optional, Tuple, Union
+from typing import Callable, List, Optional, Tuple, Union
 from fastapi import Depends, HTTPException, Request, status
 from sqlmodel import Session
 
 from fastapi_template.db import get_session
+from fastapi_template.hooks.use_loaders import Loaders, use_loaders
+from fastapi_template.models.blog import Comment, Post
+from fastapi_template.models.content import Content
 from fastapi_template.models.security import User
 from fastapi_template.security import (
     get_current_user, get_current_active_user, get_current_admin_user
 )
 
+# 可按 resource_type 检查所有者的资源
+RESOURCE_MODELS = {
+    "content": Content,
+    "post": Post,
+    "comment": Comment,
+}
+
+
 # MARK: 使用认证
 """
 认证钩子
 - 封装认证相关的逻辑
 - 提供获取当前用户的函数
 - 提供检查权限的函数
+- 资源所有者通过请求级加载器查询，多个资源的检查合并为一次查询
 """
 class UseAuth:
-    def __init__(self, session: Session = Depends(get_session)):
+    def __init__(
+        self,
+        session: Session = Depends(get_session),
+        loaders: Optional[Loaders] = None,
+    ):
         self.session = session
+        self.loaders = loaders or Loaders(session)
         
     def get_current_user(self, request: Request) -> User:
         """
@@ -78,7 +95,8 @@ class UseAuth:
         request: Request, 
         resource_id: Optional[int] = None,
         resource_owner_id: Optional[int] = None,
-        admin_required: bool = False
+        admin_required: bool = False,
+        resource_type: Optional[str] = None
     ) -> Tuple[bool, User]:
         """
         检查权限
@@ -88,6 +106,8 @@ class UseAuth:
             resource_id: 资源ID
             resource_owner_id: 资源所有者ID
             admin_required: 是否需要管理员权限
+            resource_type: 资源类型（content, post, comment），与 resource_id
+                一起使用时查询资源所有者
             
         返回:
             Tuple[bool, User]: (是否有权限, 当前用户)
@@ -111,12 +131,9 @@ class UseAuth:
             if resource_owner_id is not None:
                 return user.id == resource_owner_id, user
                 
-            # 如果提供了资源ID，需要查询资源所有者
-            # 这里需要根据实际情况实现
-            # 例如：
-            # resource = self.session.get(Resource, resource_id)
-            # if resource and resource.user_id == user.id:
-            #     return True, user
+            # 如果提供了资源ID和类型，通过加载器查询资源所有者
+            if resource_type is not None:
+                return self.owns(user, resource_type, [resource_id]), user
                 
             return False, user
             
@@ -133,7 +150,8 @@ class UseAuth:
         request: Request,
         resource_id: Optional[int] = None,
         resource_owner_id: Optional[int] = None,
-        admin_required: bool = False
+        admin_required: bool = False,
+        resource_type: Optional[str] = None
     ) -> User:
         """
         要求权限
@@ -143,6 +161,7 @@ class UseAuth:
             resource_id: 资源ID
             resource_owner_id: 资源所有者ID
             admin_required: 是否需要管理员权限
+            resource_type: 资源类型（content, post, comment）
             
         返回:
             User: 当前用户
@@ -151,7 +170,8 @@ class UseAuth:
             HTTPException: 如果用户没有权限
         """
         has_permission, user = self.check_permission(
-            request, resource_id, resource_owner_id, admin_required
+            request, resource_id, resource_owner_id, admin_required,
+            resource_type
         )
         
         if not has_permission:
@@ -162,7 +182,32 @@ class UseAuth:
             
         return user
 
+    def owns(
+        self, user: User, resource_type: str, resource_ids: List[int]
+    ) -> bool:
+        """
+        检查用户是否拥有全部资源，管理员总是返回True
+        
+        参数:
+            user: 当前用户
+            resource_type: 资源类型（content, post, comment）
+            resource_ids: 资源ID列表，一次批量查询
+            
+        返回:
+            bool: 全部资源存在且属于该用户时返回True
+        """
+        if user.superuser:
+            return True
+        loader = self.loaders.for_model(RESOURCE_MODELS[resource_type])
+        return all(
+            resource is not None and resource.user_id == user.id
+            for resource in loader.get_many(resource_ids)
+        )
+
 
 # 创建一个依赖项
-def use_auth(session: Session = Depends(get_session)) -> UseAuth:
-    return UseAuth(session=session) 
\ No newline at end of file
+def use_auth(
+    session: Session = Depends(get_session),
+    loaders: Loaders = Depends(use_loaders),
+) -> UseAuth:
+    return UseAuth(session=session, loaders=loaders) 
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import Callable, Dict, List, Type
+
+from fastapi import Depends
+from sqlmodel import Session, SQLModel
+
+from fastapi_template.db import get_session
+from fastapi_template.models.blog import Comment, Post
+from fastapi_template.models.content import Content
+from fastapi_template.models.security import User
+from fastapi_template.utils.dataloader import (
+    BatchLoad, DataLoader, by_group, by_key
+)
+
+# MARK: 请求级加载器集合
+"""
+请求级加载器集合
+- 每个请求创建一个实例，使用请求的数据库会话
+- 加载器按需创建
+- 通过 use_loaders 依赖注入获取，与路由共用同一个会话
+"""
+class Loaders:
+    def __init__(self, session: Session):
+        self.session = session
+        self._loaders: Dict[str, DataLoader] = {}
+
+    def _get(self, name: str, factory: Callable[[], BatchLoad]) -> DataLoader:
+        loader = self._loaders.get(name)
+        if loader is None:
+            loader = self._loaders[name] = DataLoader(factory())
+        return loader
+
+    @property
+    def users(self) -> DataLoader[int, User]:
+        return self._get("users", lambda: by_key(self.session, User))
+
+    @property
+    def posts(self) -> DataLoader[int, Post]:
+        return self._get("posts", lambda: by_key(self.session, Post))
+
+    @property
+    def comments(self) -> DataLoader[int, Comment]:
+        return self._get("comments", lambda: by_key(self.session, Comment))
+
+    @property
+    def contents(self) -> DataLoader[int, Content]:
+        return self._get("contents", lambda: by_key(self.session, Content))
+
+    @property
+    def replies(self) -> DataLoader[int, List[Comment]]:
+        """父评论ID → 直接回复，按创建时间升序"""
+        return self._get("replies", lambda: by_group(
+            self.session,
+            Comment,
+            "parent_id",
+            order_by=(Comment.created_at, Comment.id),
+        ))
+
+    def for_model(self, model: Type[SQLModel]) -> DataLoader:
+        """按模型获取主键加载器"""
+        return {
+            User: self.users,
+            Post: self.posts,
+            Comment: self.comments,
+            Content: self.contents,
+        }[model]
+
+
+# 创建一个依赖项
+def use_loaders(session: Session = Depends(get_session)) -> Loaders:
+    return Loaders(session=session)
@@ -1,5 +1,8 @@
 # 从content模块导出模型
-from fastapi_template.models.content import Content, ContentResponse, ContentIncoming
+from fastapi_template.models.content import (
+    Content, ContentResponse, ContentIncoming, ContentListItem, Tag,
+    ContentTag, ContentBatchUpdate, ContentBatchResult, ContentBatchResponse
+)
 
 # 从blog模块导出模型
 from fastapi_template.models.blog import (
@@ -10,13 +13,21 @@ from fastapi_template.models.blog import (
 # 从security模块导出模型
 from fastapi_template.models.security import (
     Token, RefreshToken, TokenData, HashedPassword,
-    User, UserResponse, UserCreate, UserPasswordPatch
+    User, UserResponse, UserCreate, UserPasswordPatch, UserSearchHit
 )
 
+# 从search模块导出模型
+from fastapi_template.models.search import SearchHit
+
+# 从outbox模块导出模型
+from fastapi_template.models.outbox import OutboxEvent
+
 # 导出所有模型，方便从models包直接导入
 __all__ = [
     # content models
-    "Content", "ContentResponse", "ContentIncoming",
+    "Content", "ContentResponse", "ContentIncoming", "ContentListItem",
+    "Tag", "ContentTag", "ContentBatchUpdate", "ContentBatchResult",
+    "ContentBatchResponse",
     
     # blog models
     "PostBase", "Post", "CommentBase", "Comment", "Like", 
@@ -24,5 +35,12 @@ __all__ = [
     
     # security models
     "Token", "RefreshToken", "TokenData", "HashedPassword",
-    "User", "UserResponse", "UserCreate", "UserPasswordPatch"
+    "User", "UserResponse", "UserCreate", "UserPasswordPatch",
+    "UserSearchHit",
+
+    # search models
+    "SearchHit",
+
+    # outbox models
+    "OutboxEvent"
 ]
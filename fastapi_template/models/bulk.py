@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import List, Optional, Union
+
+from pydantic import BaseModel
+
+
+# MARK: 文章导入行
+"""
+文章导入行
+- 用于批量导入时逐行校验
+- id 可选，用于保留历史数据的主键以便评论引用
+- user_id 为空时使用导入操作者
+"""
+class PostImportRow(BaseModel):
+    id: Optional[int] = None
+    title: str
+    content: str
+    published: bool = True
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# MARK: 评论导入行
+"""
+评论导入行
+- 用于批量导入时逐行校验
+- root_id 和 parent_id 引用的评论需要已存在或位于更早的分块中
+"""
+class CommentImportRow(BaseModel):
+    id: Optional[int] = None
+    content: str
+    post_id: int
+    user_id: Optional[int] = None
+    root_id: Optional[int] = None
+    parent_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# MARK: 内容导入行
+"""
+内容导入行
+- 用于批量导入时逐行校验
+- tags 支持列表或逗号分隔的字符串
+- slug 为空时根据标题生成
+"""
+class ContentImportRow(BaseModel):
+    id: Optional[int] = None
+    title: str
+    slug: Optional[str] = None
+    text: str
+    published: bool = False
+    tags: Optional[Union[List[str], str]] = None
+    user_id: Optional[int] = None
+    created_time: Optional[datetime] = None
+
+
+# MARK: 用户导入行
+"""
+用户导入行
+- 用于批量创建用户时逐行校验
+- password 为明文，导入时在进程池中并行哈希
+"""
+class UserImportRow(BaseModel):
+    username: str
+    password: str
+    superuser: bool = False
+    disabled: bool = False
+
+
+# MARK: 导入行错误
+"""
+导入行错误
+- line 为输入文件中的行号（CSV不含表头时从1开始）
+"""
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+# MARK: 分块导入报告
+"""
+分块导入报告
+- 每个分块在独立事务中写入
+- 分块写入失败时整块回滚，errors 中记录原因
+- skipped/updated 只用于用户导入：已存在的用户名被跳过或覆盖
+"""
+class ImportChunkReport(BaseModel):
+    chunk: int
+    first_line: int
+    last_line: int
+    inserted: int
+    failed: int
+    skipped: int = 0
+    updated: int = 0
+    errors: List[ImportRowError] = []
+
+
+# MARK: 导入报告
+"""
+导入报告
+- 汇总导入结果，并包含每个分块的详情
+"""
+class ImportReport(BaseModel):
+    kind: str
+    format: str
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    skipped: int = 0
+    updated: int = 0
+    chunks: List[ImportChunkReport] = []
@@ -1,9 +1,12 @@
-from datetime import datetime
-from typing import TYPE_CHECKING, List, Optional, Union
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
 
 from pydantic import BaseModel, Extra
+from sqlalchemy import DateTime, Index
 from sqlmodel import Field, Relationship, SQLModel
 
+from fastapi_template.utils.slug import next_slug, slugify
+
 if TYPE_CHECKING:
     from fastapi_template.models.security import User
 
@@ -21,21 +24,61 @@ class Content(SQLModel, table=True):
     Replace with the *things* you do in your application.
     """
 
+    # (created_time, id) 用于时间范围查询和键集分页的索引范围扫描
+    __table_args__ = (
+        Index("ix_content_created_time_id", "created_time", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
-    slug: str = Field(default=None)
+    slug: str = Field(default=None, unique=True, index=True)
     text: str
     published: bool = False
-    created_time: str = Field(
-        default_factory=lambda: datetime.now().isoformat()
+    created_time: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
     )
     tags: str = Field(default="")
     user_id: Optional[int] = Field(foreign_key="user.id")
+    # 行版本号，每次更新加一，用于ETag和If-Match
+    version: int = Field(default=1)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # It populates a `.contents` attribute to the `User` model.
     user: Optional["User"] = Relationship(back_populates="contents")
 
 
+# MARK: TAG_MODEL
+"""
+标签数据模型
+- 规范化的标签表，标签名唯一
+- 与内容通过 ContentTag 关联表多对多关联
+"""
+class Tag(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)
+
+
+# MARK: CONTENT_TAG_MODEL
+"""
+内容标签关联模型
+- 主键 (content_id, tag_id) 用于按内容查标签
+- 索引 (tag_id, content_id) 作为倒排索引，用于按标签查内容
+"""
+class ContentTag(SQLModel, table=True):
+    __tablename__ = "content_tag"
+    __table_args__ = (
+        Index("ix_content_tag_tag_id_content_id", "tag_id", "content_id"),
+    )
+
+    content_id: int = Field(
+        foreign_key="content.id", primary_key=True, ondelete="CASCADE"
+    )
+    tag_id: int = Field(
+        foreign_key="tag.id", primary_key=True, ondelete="CASCADE"
+    )
+
+
 # MARK: CONTENT_RESPONSE
 """
 内容响应模型
@@ -50,7 +93,7 @@ class ContentResponse(BaseModel):
     slug: str
     text: str
     published: bool
-    created_time: str
+    created_time: datetime
     tags: List[str]
     user_id: int
 
@@ -62,6 +105,44 @@ class ContentResponse(BaseModel):
         super().__init__(*args, **kwargs)
 
 
+# MARK: CONTENT_LIST_ITEM
+"""
+内容列表项模型
+- 用于列表接口的投影查询，所有字段可选
+- 只包含查询时选择的列，未选择的列不会出现在响应中
+"""
+class ContentListItem(BaseModel):
+    """The serializer for projected rows in content listings"""
+
+    id: int
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    text: Optional[str] = None
+    published: Optional[bool] = None
+    created_time: Optional[datetime] = None
+    tags: Optional[List[str]] = None
+    user_id: Optional[int] = None
+
+    def __init__(self, *args, **kwargs):
+        # tags to model representation
+        tags = kwargs.pop("tags", None)
+        if isinstance(tags, str):
+            kwargs["tags"] = [tag for tag in tags.split(",") if tag]
+        elif tags is not None:
+            kwargs["tags"] = tags
+        super().__init__(*args, **kwargs)
+
+
+# 列表接口可投影的列，默认不包含正文
+CONTENT_LIST_FIELDS = (
+    "id", "title", "slug", "text", "published", "created_time", "tags",
+    "user_id",
+)
+CONTENT_LIST_DEFAULT_FIELDS = tuple(
+    field for field in CONTENT_LIST_FIELDS if field != "text"
+)
+
+
 # MARK: CONTENT_INCOMING
 """
 内容输入模型
@@ -89,7 +170,41 @@ class ContentIncoming(BaseModel):
         super().__init__(*args, **kwargs)
         self.generate_slug()
 
-    def generate_slug(self):
-        """Generate a slug from the title."""
+    def generate_slug(self, taken: Iterable[str] = ()):
+        """Generate a slug from the title, suffixed if already taken."""
         if self.title:
-            self.slug = self.title.lower().replace(" ", "-")
+            self.slug = next_slug(slugify(self.title), taken)
+
+
+# MARK: CONTENT_BATCH_UPDATE
+"""
+批量更新输入模型
+- 在 ContentIncoming 基础上增加内容ID
+- version 为客户端看到的行版本，提供时用于乐观并发控制
+"""
+class ContentBatchUpdate(ContentIncoming):
+    """A single item of a batch PATCH request"""
+
+    id: int
+    version: Optional[int] = None
+
+
+# MARK: CONTENT_BATCH_RESULT
+"""
+批量操作结果模型
+- 每个输入项对应一个结果，index 为输入中的位置
+- status 使用HTTP状态码表示单项结果
+"""
+class ContentBatchResult(BaseModel):
+    index: int
+    status: int
+    id: Optional[int] = None
+    slug: Optional[str] = None
+    version: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ContentBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[ContentBatchResult]
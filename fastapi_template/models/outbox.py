@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Text
+from sqlmodel import Field, SQLModel
+
+
+# MARK: 发件箱事件
+"""
+发件箱事件
+- 与业务数据在同一个事务中写入，提交成功才存在，回滚时一起撤销
+- payload 为 jsonable_encoder 转换后的 JSON 文本
+- 中继按 id 顺序分批投递 next_attempt_at 已到的事件，投递成功后删除
+- 失败时 attempts 加一、记录 last_error，并按指数退避推迟 next_attempt_at；
+  创建超过 OUTBOX_MAX_AGE 秒的事件不再重试，留待排查
+"""
+class OutboxEvent(SQLModel, table=True):
+    __tablename__ = "outbox_event"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_type: str
+    payload: str = Field(sa_type=Text)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    next_attempt_at: datetime = Field(
+        default_factory=datetime.utcnow, index=True
+    )
+    attempts: int = 0
+    last_error: Optional[str] = None
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# MARK: 搜索结果模型
+"""
+搜索结果模型
+- 用于全文搜索API响应的序列化
+- kind 表示文档来源（post 或 content）
+- title 和 snippet 中的命中词使用 <mark> 标签高亮
+- score 越大表示相关度越高
+"""
+class SearchHit(BaseModel):
+    kind: str
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    score: float
@@ -4,7 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 from sqlmodel import Field, Relationship, SQLModel
 
-from fastapi_template.models.content import Content, ContentResponse
+from fastapi_template.models.content import Content, ContentListItem
 
 
 # MARK: 令牌模型
@@ -91,6 +91,9 @@ class User(SQLModel, table=True):
     password: HashedPassword
     superuser: bool = False
     disabled: bool = False
+    # 行版本号，每次更新加一，用于ETag
+    version: int = Field(default=1)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # it populates the .user attribute on the Content Model
     contents: List["Content"] = Relationship(back_populates="user")
@@ -101,7 +104,9 @@ class User(SQLModel, table=True):
 用户响应模型
 - 用于API响应的序列化
 - 不包含密码字段，保证安全性
-- 包含用户ID、用户名、状态和关联内容
+- 包含用户ID、用户名和状态
+- 关联内容需要通过 expand=contents 显式请求，未请求时不出现在响应中；
+  展开的内容为列表项（不含正文），每个用户有数量上限
 """
 class UserResponse(BaseModel):
     """This is the User model to be used as a response_model
@@ -112,7 +117,41 @@ class UserResponse(BaseModel):
     username: str
     disabled: bool
     superuser: bool
-    contents: Optional[List[ContentResponse]] = Field(default_factory=list)
+    contents: Optional[List[ContentListItem]] = None
+
+    @classmethod
+    def from_user(
+        cls, user: "User", contents: Optional[List[ContentListItem]] = None
+    ) -> "UserResponse":
+        """Build the response without touching the contents relationship."""
+        data = dict(
+            id=user.id,
+            username=user.username,
+            disabled=user.disabled,
+            superuser=user.superuser,
+        )
+        if contents is not None:
+            data["contents"] = contents
+        return cls(**data)
+
+
+# 用户响应可展开的关联
+USER_EXPANSIONS = ("contents",)
+
+
+# MARK: 用户搜索结果模型
+"""
+用户搜索结果模型
+- 用于管理后台的用户名搜索
+- 只包含列表需要的字段，不加载用户的内容
+- score 为相关度，范围 0-1000
+"""
+class UserSearchHit(BaseModel):
+    id: int
+    username: str
+    disabled: bool
+    superuser: bool
+    score: int
 
 
 # MARK: 用户创建模型
@@ -5,6 +5,8 @@ from .profile import router as profile_router
 from .security import router as security_router
 from .user import router as user_router
 from .blog import router as blog_router
+from .imports import router as imports_router
+from .exports import router as exports_router
 
 main_router = APIRouter()
 
@@ -13,6 +15,8 @@ main_router.include_router(profile_router, tags=["user"])
 main_router.include_router(security_router, tags=["security"])
 main_router.include_router(user_router, prefix="/user", tags=["user"])
 main_router.include_router(blog_router)
+main_router.include_router(imports_router, prefix="/import", tags=["import"])
+main_router.include_router(exports_router, prefix="/export", tags=["export"])
 
 
 @main_router.get("/")
@@ -1,14 +1,27 @@
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, select, func, desc, asc
-from ..db import get_session
+from ..core.events import EventTypes, event_bus
+from ..core.outbox import outbox
+from ..core.response_cache import (
+    BLOG_POST_ROUTE, BLOG_POSTS_ROUTE, post_tag, response_cache
+)
+from ..core.cached import cached
+from ..db import engine, get_session
+from ..hooks.use_loaders import Loaders, use_loaders
 from ..models.blog import Post, PostBase, Comment, CommentBase, Like, PostResponse, CommentResponse
+from ..utils.http_cache import conditional_response, make_etag
 # 注释掉认证导入，但保留代码以便之后恢复
 # from ..security import get_current_user
 
 router = APIRouter(prefix="/blog", tags=["blog"])
 
+# 文章列表第一页过期后仍可返回旧结果的时间（秒）
+POSTS_STALE_TTL = 30
+
 # MARK: CREATE_POST
 """
 创建新博客文章
@@ -27,8 +40,10 @@ def create_post(
     # 使用固定用户ID进行测试
     db_post.user_id = 1  # 假设ID为1的用户存在
     session.add(db_post)
+    outbox.add(session, EventTypes.POST_CREATED, db_post)
     session.commit()
     session.refresh(db_post)
+    event_bus.publish(EventTypes.POST_CREATED, db_post)
     return db_post
 
 # MARK: GET_POSTS
@@ -38,6 +53,8 @@ def create_post(
 - 支持按创建时间或热度排序
 - 支持升序或降序排列
 - 返回文章列表，包含评论数、点赞数和热度分数
+- 第一页结果使用缓存，文章、评论或点赞变化时失效
+- 第一页缓存过期后先返回旧结果并在后台刷新，并发未命中只查询一次
 """
 @router.get("/posts/", response_model=List[PostResponse])
 def get_posts(
@@ -47,6 +64,35 @@ def get_posts(
     order: str = Query("desc", regex="^(asc|desc)$"),
     session: Session = Depends(get_session)
 ):
+    if skip == 0:
+        return first_page_posts(
+            limit, sort_by, order, response_cache.generation(BLOG_POSTS_ROUTE)
+        )
+    return query_posts(session, skip, limit, sort_by, order)
+
+
+# 第一页文章，代际变化（失效）时键随之变化
+@cached(
+    key=lambda limit, sort_by, order, generation: response_cache.make_key(
+        BLOG_POSTS_ROUTE,
+        {"limit": limit, "sort_by": sort_by, "order": order},
+        generation,
+    ),
+    stale_ttl=POSTS_STALE_TTL,
+)
+def first_page_posts(
+    limit: int, sort_by: str, order: str, generation: str
+) -> List[PostResponse]:
+    # 可能在请求结束后于后台刷新，使用独立的会话
+    with Session(engine) as session:
+        posts = query_posts(session, 0, limit, sort_by, order)
+        return [PostResponse.from_orm(post) for post in posts]
+
+
+# 按排序条件查询一页文章
+def query_posts(
+    session: Session, skip: int, limit: int, sort_by: str, order: str
+) -> List[Post]:
     query = select(Post)
     
     # 排序逻辑
@@ -80,13 +126,65 @@ def get_posts(
 - 通过文章ID查询
 - 返回文章详细信息，包含评论数、点赞数和热度分数
 - 如果文章不存在，返回404错误
+- 结果使用响应缓存，带 post:{id} 标签，文章、评论或点赞变化时按标签失效
+- 带 ETag，与响应体一起缓存，缓存命中时无需查询数据库
+- 支持 If-None-Match，未修改时返回304
+- 不返回 Last-Modified：删除评论或点赞不会产生更新的时间，
+  只带 If-Modified-Since 的客户端会一直拿到304
 """
 @router.get("/posts/{post_id}", response_model=PostResponse)
-def get_post(post_id: int, session: Session = Depends(get_session)):
-    post = session.get(Post, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    return post
+def get_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
+    def load_post():
+        post = session.get(Post, post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        # 评论和点赞各一次计数查询，不加载关联行
+        comment_count = count_of(session, Comment, post_id)
+        like_count = count_of(session, Like, post_id)
+        body = PostResponse(
+            **post.dict(),
+            comment_count=comment_count,
+            like_count=like_count,
+            heat_score=like_count * 0.7 + comment_count * 0.3,
+        )
+        return {
+            "body": jsonable_encoder(body),
+            "etag": make_etag(
+                "post", post.id, post.updated_at, body.comment_count,
+                body.like_count,
+            ),
+        }
+
+    cached = response_cache.cached(
+        BLOG_POST_ROUTE, {"post_id": post_id}, load_post,
+        tags=[post_tag(post_id)],
+    )
+    not_modified = conditional_response(request, response, cached["etag"])
+    if not_modified is not None:
+        return not_modified
+    return cached["body"]
+
+
+# 文章的评论或点赞数量
+def count_of(session: Session, model, post_id: int) -> int:
+    return session.exec(
+        select(func.count()).where(model.post_id == post_id)
+    ).one()
+
+
+# MARK: CACHE_STATS
+"""
+获取响应缓存统计
+- 返回命中、未命中、失效次数和命中率
+"""
+@router.get("/cache/stats")
+def get_cache_stats():
+    return response_cache.stats()
 
 # MARK: CREATE_COMMENT
 """
@@ -103,11 +201,12 @@ def create_comment(
     comment: CommentBase,
     parent_id: Optional[int] = None,
     session: Session = Depends(get_session),
+    loaders: Loaders = Depends(use_loaders),
     # 移除认证依赖，添加默认用户ID
     # current_user: dict = Depends(get_current_user)
 ):
     # 验证帖子是否存在
-    post = session.get(Post, post_id)
+    post = loaders.posts.get(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -118,7 +217,7 @@ def create_comment(
     
     if parent_id:
         # 验证父评论是否存在
-        parent_comment = session.get(Comment, parent_id)
+        parent_comment = loaders.comments.get(parent_id)
         if not parent_comment:
             raise HTTPException(status_code=404, detail="Parent comment not found")
         
@@ -127,8 +226,10 @@ def create_comment(
         db_comment.root_id = parent_comment.root_id or parent_comment.id
     
     session.add(db_comment)
+    outbox.add(session, EventTypes.COMMENT_CREATED, db_comment)
     session.commit()
     session.refresh(db_comment)
+    event_bus.publish(EventTypes.COMMENT_CREATED, db_comment)
     return db_comment
 
 # MARK: GET_COMMENTS
@@ -138,13 +239,15 @@ def create_comment(
 - 支持分页（skip和limit参数）
 - 返回树形结构的评论列表（根评论及其所有子评论）
 - 按创建时间降序排序
+- 回复按层批量加载，每层一次查询，查询数与评论数无关
 """
 @router.get("/posts/{post_id}/comments/", response_model=List[CommentResponse])
 def get_comments(
     post_id: int,
     skip: int = 0,
     limit: int = 10,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    loaders: Loaders = Depends(use_loaders)
 ):
     # 只获取根评论（没有parent_id的评论）
     query = select(Comment).where(
@@ -154,17 +257,14 @@ def get_comments(
     
     comments = session.exec(query.offset(skip).limit(limit)).all()
     
-    # 递归获取所有回复
-    def get_replies(comment_id: int) -> List[Comment]:
-        replies_query = select(Comment).where(Comment.parent_id == comment_id)
-        replies = session.exec(replies_query).all()
-        for reply in replies:
-            reply.replies = get_replies(reply.id)
-        return replies
-    
-    # 为每个根评论获取回复
-    for comment in comments:
-        comment.replies = get_replies(comment.id)
+    # 逐层获取回复，同一层的所有评论一次查询
+    level = list(comments)
+    while level:
+        replies = loaders.replies.get_many([comment.id for comment in level])
+        for comment, children in zip(level, replies):
+            # 直接填充关系，赋值会先懒加载旧集合
+            set_committed_value(comment, "replies", children)
+        level = [reply for children in replies for reply in children]
     
     return comments
 
@@ -203,11 +303,15 @@ def like_post(
     if existing_like:
         # 如果已经点赞，则取消点赞
         session.delete(existing_like)
+        outbox.add(session, EventTypes.LIKE_DELETED, existing_like)
         session.commit()
+        event_bus.publish(EventTypes.LIKE_DELETED, existing_like)
         return {"message": "Like removed"}
     
     # 创建新的点赞
     like = Like(post_id=post_id, user_id=user_id)
     session.add(like)
+    outbox.add(session, EventTypes.LIKE_CREATED, like)
     session.commit()
+    event_bus.publish(EventTypes.LIKE_CREATED, like)
     return {"message": "Post liked"} 
\ No newline at end of file
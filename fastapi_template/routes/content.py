@@ -1,49 +1,295 @@
-from typing import List, Union
+from datetime import datetime, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi.exceptions import HTTPException
-from sqlmodel import Session, or_, select
+from sqlmodel import Session, select
 
+from ..core.config import settings
+from ..core.events import EventTypes, event_bus
+from ..core.outbox import outbox
 from ..db import ActiveSession
-from ..models.content import Content, ContentIncoming, ContentResponse
+from ..models.content import (
+    CONTENT_LIST_DEFAULT_FIELDS,
+    CONTENT_LIST_FIELDS,
+    Content,
+    ContentBatchResponse,
+    ContentBatchUpdate,
+    ContentIncoming,
+    ContentListItem,
+    ContentResponse,
+)
 from ..models.security import User
 from ..security import AuthenticatedUser, get_current_user
+from ..services.content_service import content_service
+from ..utils.http_cache import (
+    conditional_response, make_etag, require_if_match, set_validators
+)
+from ..utils.pagination import (
+    CursorPage, PaginatedResponse, paginate, paginate_keyset, table_count
+)
 
 router = APIRouter()
 
 
+# MARK: 内容过滤条件
+"""
+内容列表过滤条件
+- 作为依赖注入，列表和时间线接口共用
+- 支持按发布状态、作者和标签过滤，多个标签可按 AND（all）或 OR（any）匹配
+- 标签过滤使用标签关联表的倒排索引
+- since/until 按创建时间过滤，走 (created_time, id) 索引范围扫描
+"""
+class ContentFilters:
+    def __init__(
+        self,
+        published: Optional[bool] = Query(None, description="发布状态过滤"),
+        user_id: Optional[int] = Query(None, description="作者过滤"),
+        tags: Optional[List[str]] = Query(None, description="标签过滤"),
+        tag_mode: str = Query(
+            "all", regex="^(all|any)$", description="标签匹配方式：all 或 any"
+        ),
+        since: Optional[datetime] = Query(
+            None, description="创建时间下限（含），无时区时视为UTC"
+        ),
+        until: Optional[datetime] = Query(
+            None, description="创建时间上限（不含），无时区时视为UTC"
+        ),
+    ):
+        self.published = published
+        self.user_id = user_id
+        self.tags = tags
+        self.tag_mode = tag_mode
+        self.since = to_utc(since)
+        self.until = to_utc(until)
+
+    @property
+    def empty(self) -> bool:
+        """是否没有任何过滤条件"""
+        return (
+            self.published is None
+            and self.user_id is None
+            and not self.tags
+            and self.since is None
+            and self.until is None
+        )
+
+    def apply(self, query):
+        """将过滤条件应用到查询"""
+        if self.published is not None:
+            query = query.where(Content.published == self.published)
+        if self.user_id is not None:
+            query = query.where(Content.user_id == self.user_id)
+        if self.tags:
+            query = query.where(content_service.tag_filter(
+                self.tags, match_all=self.tag_mode == "all"
+            ))
+        if self.since is not None:
+            query = query.where(Content.created_time >= self.since)
+        if self.until is not None:
+            query = query.where(Content.created_time < self.until)
+        return query
+
+
+def to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """统一为UTC时间，无时区的时间视为UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 # MARK: 内容列表
 """
-获取所有内容列表
-- 返回所有内容项目
+获取内容列表
+- 分页返回内容项目
+- 过滤条件见 ContentFilters
+- with_total=false 时不计算总数，多取一行判断是否有下一页
+- fields 参数指定返回的列，只在SQL中选择这些列，默认不返回正文
+- 不需要认证
+"""
+@router.get(
+    "/",
+    response_model=PaginatedResponse[ContentListItem],
+    response_model_exclude_unset=True,
+)
+async def list_contents(
+    *,
+    session: Session = ActiveSession,
+    page: int = Query(1, ge=1, description="页码"),
+    size: int = Query(10, ge=1, le=100, description="每页大小"),
+    with_total: bool = Query(True, description="是否返回总数"),
+    filters: ContentFilters = Depends(),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回列"),
+):
+    columns = parse_fields(fields)
+    query = filters.apply(
+        select(*[getattr(Content, name) for name in columns])
+    )
+
+    # 未过滤时使用缓存的表总数（大表为估算值）
+    count = (lambda: table_count(session, Content)) if filters.empty else None
+    result = paginate(
+        session,
+        query.order_by(Content.id),
+        page,
+        size,
+        with_total=with_total,
+        count=count,
+    )
+    result.items = [ContentListItem(**row._mapping) for row in result.items]
+    return result
+
+
+# MARK: 内容时间线
+"""
+按创建时间倒序获取内容
+- 键集分页：按 (created_time, id) 比较定位下一页，翻页深度不影响查询成本
+- 返回 next_cursor，传给 cursor 参数获取下一页
+- 过滤条件和 fields 参数与内容列表相同，返回中总是包含 created_time
 - 不需要认证
 """
-@router.get("/", response_model=List[ContentResponse])
-async def list_contents(*, session: Session = ActiveSession):
-    contents = session.exec(select(Content)).all()
-    return contents
+@router.get(
+    "/timeline/",
+    response_model=CursorPage[ContentListItem],
+    response_model_exclude_unset=True,
+)
+async def content_timeline(
+    *,
+    session: Session = ActiveSession,
+    cursor: Optional[str] = Query(None, description="上一页返回的游标"),
+    size: int = Query(10, ge=1, le=100, description="每页大小"),
+    filters: ContentFilters = Depends(),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回列"),
+):
+    columns = parse_fields(fields)
+    if "created_time" not in columns:
+        columns.append("created_time")
+    query = filters.apply(
+        select(*[getattr(Content, name) for name in columns])
+    )
+
+    try:
+        result = paginate_keyset(
+            session,
+            query,
+            [Content.created_time, Content.id],
+            cursor=cursor,
+            size=size,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result.items = [ContentListItem(**row._mapping) for row in result.items]
+    return result
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """解析 fields 参数，id 总是返回"""
+    if not fields:
+        return list(CONTENT_LIST_DEFAULT_FIELDS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(CONTENT_LIST_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return ["id"] + [
+        name for name in CONTENT_LIST_FIELDS if name in names and name != "id"
+    ]
+
+
+# MARK: 批量创建内容
+"""
+BATCH_CREATE_CONTENT
+- 需要已认证用户权限，整个批次只校验一次
+- 单次最多 CONTENT_BATCH_MAX_ITEMS 条
+- 有效项在一个事务中批量写入，无效项返回各自的错误
+- 返回逐项结果（状态码、ID、slug、版本）
+"""
+@router.post(
+    "/batch/",
+    response_model=ContentBatchResponse,
+    dependencies=[AuthenticatedUser],
+)
+async def batch_create_contents(
+    *,
+    session: Session = ActiveSession,
+    request: Request,
+    items: List[ContentIncoming],
+):
+    check_batch_size(items)
+    user: User = get_current_user(request=request)
+    return content_service.create_many(session, items, user)
+
+
+# MARK: 批量更新内容
+"""
+BATCH_UPDATE_CONTENT
+- 需要已认证用户权限，整个批次只校验一次
+- 单次最多 CONTENT_BATCH_MAX_ITEMS 条
+- 每项需提供内容ID，可提供 version 做乐观并发控制（不匹配时该项返回412）
+- 只能更新自己的内容，管理员不受限制
+- 有效项在一个事务中批量写入，无效项返回各自的错误
+"""
+@router.patch(
+    "/batch/",
+    response_model=ContentBatchResponse,
+    dependencies=[AuthenticatedUser],
+)
+async def batch_update_contents(
+    *,
+    session: Session = ActiveSession,
+    request: Request,
+    items: List[ContentBatchUpdate],
+):
+    check_batch_size(items)
+    user: User = get_current_user(request=request)
+    return content_service.update_many(session, items, user)
+
+
+def check_batch_size(items: List) -> None:
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > settings.CONTENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail="Batch too large, "
+            f"max {settings.CONTENT_BATCH_MAX_ITEMS} items",
+        )
+
+
+def content_etag(content: Content) -> str:
+    """内容的ETag，由ID和行版本计算"""
+    return make_etag("content", content.id, content.version)
 
 
 # MARK: 查询单个内容
 """
 查询单个内容
-- 可以通过ID或slug查询
-- 返回内容详情
+- 可以通过ID或slug查询，数字按主键查询，其他按slug唯一索引查询
+- 返回内容详情，带 ETag 和 Last-Modified
+- 支持 If-None-Match / If-Modified-Since，未修改时返回304
 - 如果内容不存在，返回404错误
 """
 @router.get("/{id_or_slug}/", response_model=ContentResponse)
 async def query_content(
-    *, id_or_slug: Union[str, int], session: Session = ActiveSession
+    *,
+    id_or_slug: str,
+    request: Request,
+    response: Response,
+    session: Session = ActiveSession,
 ):
-    content = session.query(Content).where(
-        or_(
-            Content.id == id_or_slug,
-            Content.slug == id_or_slug,
-        )
-    )
-    if not content:
+    content = content_service.resolve(session, id_or_slug)
+    if content is None:
         raise HTTPException(status_code=404, detail="Content not found")
-    return content.first()
+    not_modified = conditional_response(
+        request, response, content_etag(content), content.updated_at
+    )
+    if not_modified is not None:
+        return not_modified
+    return content
 
 
 # MARK: 创建新内容
@@ -64,12 +310,16 @@ async def create_content(
     content: ContentIncoming,
 ):
     # set the ownsership of the content to the current user
+    content_service.assign_slug(session, content)
     db_content = Content.from_orm(content)
     user: User = get_current_user(request=request)
     db_content.user_id = user.id
-    session.add(db_content)
+    content_service.add_with_unique_slug(session, db_content)
+    content_service.sync_tags(session, db_content.id, db_content.tags)
+    outbox.add(session, EventTypes.CONTENT_CREATED, db_content)
     session.commit()
     session.refresh(db_content)
+    event_bus.publish(EventTypes.CONTENT_CREATED, db_content)
     return db_content
 
 
@@ -79,7 +329,8 @@ UPDATE_CONTENT
 - 需要已认证用户权限
 - 验证内容是否存在
 - 验证当前用户是否有权限更新内容（拥有者或管理员）
-- 更新内容并保存到数据库
+- 请求带 If-Match 时校验ETag，内容已被修改则返回412
+- 更新内容并保存到数据库，行版本加一
 - 返回更新后的内容详情
 """
 @router.patch(
@@ -92,6 +343,7 @@ async def update_content(
     content_id: int,
     session: Session = ActiveSession,
     request: Request,
+    response: Response,
     patch: ContentIncoming,
 ):
     # Query the content
@@ -106,14 +358,30 @@ async def update_content(
             status_code=403, detail="You don't own this content"
         )
 
-    # Update the content
-    patch_data = patch.dict(exclude_unset=True)
-    for key, value in patch_data.items():
-        setattr(content, key, value)
+    # Optimistic concurrency: the client must have seen the current version
+    require_if_match(request, content_etag(content))
 
-    # Commit the session
-    session.commit()
+    # Update the content, a new title gets a new non-colliding slug
+    content_service.assign_slug(session, patch, exclude_id=content_id)
+    # Only the editable fields, never version, user_id or id
+    patch_data = content_service.patch_values(patch)
+    # A concurrent write may take the new slug before we commit: 409
+    with content_service.slug_conflict(
+        session, patch_data.get("slug"), content_id
+    ):
+        for key, value in patch_data.items():
+            setattr(content, key, value)
+        if "tags" in patch_data:
+            content_service.sync_tags(session, content.id, content.tags)
+        content.version += 1
+        content.updated_at = datetime.utcnow()
+        outbox.add(session, EventTypes.CONTENT_UPDATED, content)
+
+        # Commit the session
+        session.commit()
     session.refresh(content)
+    set_validators(response, content_etag(content), content.updated_at)
+    event_bus.publish(EventTypes.CONTENT_UPDATED, content)
     return content
 
 
@@ -140,6 +408,9 @@ def delete_content(
         raise HTTPException(
             status_code=403, detail="You don't own this content"
         )
+    content_service.clear_tags(session, content_id)
     session.delete(content)
+    outbox.add(session, EventTypes.CONTENT_DELETED, content_id)
     session.commit()
+    event_bus.publish(EventTypes.CONTENT_DELETED, content_id)
     return {"ok": True}
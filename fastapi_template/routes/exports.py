@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..db import engine
+from ..hooks.use_auth import UseAuth, use_auth
+from ..services.export_service import (
+    MEDIA_TYPES, ExportService, export_watermark
+)
+
+router = APIRouter()
+
+
+# MARK: 流式导出
+"""
+流式导出文章、评论树或内容
+- 需要管理员权限
+- 使用服务端游标分批读取并边读边写，内存占用不随表大小增长
+- 支持 since 参数做增量导出
+- 响应头 X-Export-Watermark 为本次导出的水位线，下次增量导出时作为 since 传入
+- 水位线比当前时间早 EXPORT_WATERMARK_LAG 秒，最近的变更留给下次导出
+"""
+@router.get("/{kind}")
+def export_data(
+    request: Request,
+    kind: str = Path(..., regex="^(posts|comments|contents)$"),
+    format: str = Query(
+        "ndjson", regex="^(ndjson|csv)$", description="输出格式"
+    ),
+    since: Optional[datetime] = Query(None, description="增量导出起始时间"),
+    auth: UseAuth = Depends(use_auth),
+):
+    auth.require_permission(request, admin_required=True)
+
+    watermark = export_watermark()
+    service = ExportService(engine)
+    return StreamingResponse(
+        service.export(kind, format, since=since, until=watermark),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{kind}.{format}"',
+            "X-Export-Watermark": watermark.isoformat(),
+        },
+    )
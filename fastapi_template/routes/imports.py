@@ -0,0 +1,48 @@
+import codecs
+from typing import Optional
+
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Path, Query, Request, UploadFile
+)
+
+from ..db import engine
+from ..hooks.use_auth import UseAuth, use_auth
+from ..models.bulk import ImportReport
+from ..services.import_service import ImportService, guess_format
+
+router = APIRouter()
+
+
+# MARK: 批量导入
+"""
+批量导入文章、评论或内容
+- 需要管理员权限
+- 上传NDJSON或CSV文件，按行流式读取，内存占用不随文件大小增长
+- 按分块校验并在独立事务中批量写入
+- 返回每个分块的写入数量和错误详情
+"""
+@router.post("/{kind}", response_model=ImportReport)
+def import_data(
+    request: Request,
+    kind: str = Path(..., regex="^(posts|comments|contents)$"),
+    file: UploadFile = File(..., description="NDJSON或CSV文件"),
+    format: Optional[str] = Query(
+        None, regex="^(ndjson|csv)$", description="输入格式，默认按文件名推断"
+    ),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="分块大小"),
+    auth: UseAuth = Depends(use_auth),
+):
+    current_user = auth.require_permission(request, admin_required=True)
+
+    # UploadFile 是按需读取的临时文件，逐行解码即可保持内存恒定
+    stream = codecs.getreader("utf-8")(file.file)
+    service = ImportService(engine, chunk_size=chunk_size)
+    try:
+        return service.import_stream(
+            kind,
+            stream,
+            fmt=format or guess_format(file.filename),
+            user_id=current_user.id,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8")
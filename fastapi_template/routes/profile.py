@@ -1,7 +1,14 @@
-from fastapi import APIRouter
+from typing import Optional
 
+from fastapi import APIRouter, Query, Request, Response
+from sqlmodel import Session, func, select
+
+from ..db import ActiveSession
+from ..models.content import Content
 from ..models.security import User, UserResponse
 from ..security import AuthenticatedUser
+from ..services.user_service import UserService
+from ..utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
@@ -11,7 +18,43 @@ router = APIRouter()
 获取当前用户的个人资料
 - 需要已认证用户权限
 - 返回当前登录用户的详细信息
+- expand=contents 时返回用户的最新内容，默认不加载
+- 带 ETag 和 Last-Modified，由用户行版本计算；展开内容时还包含其内容的
+  数量和最后更新时间
+- 支持 If-None-Match / If-Modified-Since，未修改时返回304
 """
-@router.get("/profile", response_model=UserResponse)
-async def my_profile(current_user: User = AuthenticatedUser):
-    return current_user
+@router.get(
+    "/profile",
+    response_model=UserResponse,
+    response_model_exclude_unset=True,
+)
+async def my_profile(
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, description="展开的关联，如 contents"),
+    current_user: User = AuthenticatedUser,
+    session: Session = ActiveSession,
+):
+    user_service = UserService(session)
+    expansions = user_service.parse_expand(expand)
+
+    last_modified = current_user.updated_at
+    parts = ["profile", current_user.id, current_user.version]
+    if "contents" in expansions:
+        # 展开的内容增删改都要让ETag变化
+        content_count, contents_updated_at = session.exec(
+            select(
+                func.count(Content.id), func.max(Content.updated_at)
+            ).where(Content.user_id == current_user.id)
+        ).one()
+        last_modified = max(
+            filter(None, [current_user.updated_at, contents_updated_at])
+        )
+        parts += ["contents", content_count, contents_updated_at]
+
+    not_modified = conditional_response(
+        request, response, make_etag(*parts), last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+    return user_service.to_response(current_user, expansions)
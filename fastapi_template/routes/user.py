@@ -6,9 +6,11 @@ from sqlmodel import Session
 
 from ..db import ActiveSession
 from ..hooks.use_auth import use_auth, UseAuth
-from ..models.security import User, UserCreate, UserPasswordPatch, UserResponse
+from ..models.security import (
+    User, UserCreate, UserPasswordPatch, UserResponse, UserSearchHit
+)
 from ..services.user_service import UserService
-from ..utils.pagination import PaginatedResponse
+from ..utils.pagination import CursorPage, PaginatedResponse
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
@@ -21,16 +23,25 @@ router = APIRouter()
 获取所有用户列表
 - 需要管理员权限
 - 支持分页和过滤
+- with_total=false 时不计算总数，翻页更便宜
+- expand=contents 时额外用一次查询加载每个用户的最新内容（有数量上限），
+  默认不返回关联内容
 - 返回所有用户的信息
 """
-@router.get("/", response_model=PaginatedResponse[UserResponse])
+@router.get(
+    "/",
+    response_model=PaginatedResponse[UserResponse],
+    response_model_exclude_unset=True,
+)
 async def list_users(
     request: Request,
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(10, ge=1, le=100, description="每页大小"),
-    username: Optional[str] = Query(None, description="用户名过滤"),
+    username: Optional[str] = Query(None, description="用户名前缀过滤"),
     superuser: Optional[bool] = Query(None, description="超级用户过滤"),
     disabled: Optional[bool] = Query(None, description="禁用状态过滤"),
+    with_total: bool = Query(True, description="是否返回总数"),
+    expand: Optional[str] = Query(None, description="展开的关联，如 contents"),
     session: Session = ActiveSession,
     auth: UseAuth = Depends(use_auth)
 ):
@@ -44,10 +55,39 @@ async def list_users(
         size=size,
         username_filter=username,
         superuser_filter=superuser,
-        disabled_filter=disabled
+        disabled_filter=disabled,
+        with_total=with_total,
+        expand=user_service.parse_expand(expand)
     )
 
 
+# MARK: Search Users
+"""
+搜索用户名
+- 需要管理员权限
+- prefix 模式按用户名索引做范围查询，适合输入联想
+- substring 模式使用三元组索引（Postgres 为 pg_trgm，其他数据库为进程内索引）
+- prefix 结果按用户名排序，substring 结果按相关度排序，均使用游标分页
+"""
+@router.get("/search/", response_model=CursorPage[UserSearchHit])
+async def search_users(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=150, description="搜索词"),
+    mode: str = Query(
+        "prefix", regex="^(prefix|substring)$", description="搜索模式"
+    ),
+    cursor: Optional[str] = Query(None, description="上一页返回的游标"),
+    size: int = Query(10, ge=1, le=100, description="每页大小"),
+    session: Session = ActiveSession,
+    auth: UseAuth = Depends(use_auth)
+):
+    # 验证权限
+    auth.require_permission(request, admin_required=True)
+
+    user_service = UserService(session)
+    return user_service.search_users(q, mode=mode, cursor=cursor, size=size)
+
+
 # MARK: Create User
 """
 创建新用户
@@ -55,7 +95,12 @@ async def list_users(
 - 创建新用户并保存到数据库
 - 返回创建的用户信息
 """
-@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=UserResponse,
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_201_CREATED,
+)
 async def create_user(
     request: Request,
     user: UserCreate,
@@ -68,7 +113,7 @@ async def create_user(
     # 使用用户服务创建用户
     user_service = UserService(session)
     try:
-        return user_service.create_user(user)
+        return user_service.to_response(user_service.create_user(user))
     except HTTPException:
         raise
     except Exception as e:
@@ -88,7 +133,11 @@ async def create_user(
 - 验证新密码与确认密码是否匹配
 - 更新密码并保存到数据库
 """
-@router.patch("/{user_id}/password/", response_model=UserResponse)
+@router.patch(
+    "/{user_id}/password/",
+    response_model=UserResponse,
+    response_model_exclude_unset=True,
+)
 async def update_user_password(
     user_id: int,
     patch: UserPasswordPatch,
@@ -117,7 +166,9 @@ async def update_user_password(
         )
     
     # 更新密码
-    return user_service.update_password(user_id, patch.password)
+    return user_service.to_response(
+        user_service.update_password(user_id, patch.password)
+    )
 
 
 # MARK: Query User
@@ -125,12 +176,18 @@ async def update_user_password(
 查询用户信息
 - 需要已认证用户权限
 - 可以通过用户ID或用户名查询
+- expand=contents 时返回用户的最新内容
 - 返回用户详细信息
 """
-@router.get("/{user_id_or_username}/", response_model=UserResponse)
+@router.get(
+    "/{user_id_or_username}/",
+    response_model=UserResponse,
+    response_model_exclude_unset=True,
+)
 async def query_user(
     user_id_or_username: Union[str, int],
     request: Request,
+    expand: Optional[str] = Query(None, description="展开的关联，如 contents"),
     session: Session = ActiveSession,
     auth: UseAuth = Depends(use_auth)
 ):
@@ -144,7 +201,7 @@ async def query_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return user
+    return user_service.to_response(user, user_service.parse_expand(expand))
 
 
 # MARK: Delete User
@@ -1,5 +1,18 @@
 from fastapi_template.services.user_service import UserService
+from fastapi_template.services.user_search_service import (
+    UserSearchService, user_search_service
+)
+from fastapi_template.services.search_service import SearchService, search_service
+from fastapi_template.services.content_service import (
+    ContentService, content_service
+)
 
 __all__ = [
-    "UserService"
+    "UserService",
+    "UserSearchService",
+    "user_search_service",
+    "SearchService",
+    "search_service",
+    "ContentService",
+    "content_service"
 ] 
\ No newline at end of file
@@ -0,0 +1,671 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+)
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlmodel import Session, select
+
+from fastapi_template.core.events import EventBus, EventTypes, event_bus
+from fastapi_template.core.outbox import outbox
+from fastapi_template.models.content import (
+    Content, ContentBatchResponse, ContentBatchResult, ContentBatchUpdate,
+    ContentIncoming, ContentTag, Tag
+)
+from fastapi_template.models.security import User
+from fastapi_template.utils.slug import next_slug, slugify
+
+logger = logging.getLogger(__name__)
+
+# 与内容路由冲突的slug，例如 /content/timeline/
+RESERVED_SLUGS = {"timeline"}
+
+# 按主键查询的ID：只接受ASCII数字，且不超过整数列的范围
+ID_PATTERN = re.compile(r"[0-9]+")
+MAX_ID = 2 ** 31 - 1
+
+# 新内容的slug被并发写入占用时，换后缀重试的次数
+SLUG_RETRIES = 3
+
+# 单个和批量更新允许修改的字段，version、user_id 等只能由服务端设置
+BATCH_UPDATE_FIELDS = {"title", "text", "published", "tags"}
+
+
+def normalize_tags(tags: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    规范化标签
+
+    参数:
+        tags: 逗号拼接的标签字符串或标签列表
+
+    返回:
+        List[str]: 去除空白、转为小写并去重后的标签，保持原有顺序
+    """
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    names = (tag.strip().lower() for tag in tags)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+# MARK: 内容服务
+"""
+内容服务
+- 按ID或slug解析内容：数字走主键查询，未命中或其他走slug唯一索引
+- 进程内维护 slug→id 映射，命中时直接按主键读取
+- 映射通过内容事件失效；其他进程修改slug时，读取后校验slug自动纠正
+- 为新内容分配不冲突的slug
+- 维护规范化的标签表和内容标签关联，按标签过滤时走倒排索引
+- 批量创建和更新：一次授权、一个事务、批量语句，返回逐项结果
+"""
+class ContentService:
+    def __init__(self, max_slugs: int = 10000):
+        self.max_slugs = max_slugs
+        self._lock = threading.Lock()
+        self._slug_ids: "OrderedDict[str, int]" = OrderedDict()
+        self._id_slugs: Dict[int, str] = {}
+
+    # MARK: 解析
+    def resolve(
+        self, session: Session, id_or_slug: Union[str, int]
+    ) -> Optional[Content]:
+        """
+        按ID或slug查询内容
+
+        参数:
+            session: 数据库会话
+            id_or_slug: 内容ID或slug
+
+        返回:
+            Optional[Content]: 内容，不存在时返回None
+        """
+        value = str(id_or_slug)
+        if ID_PATTERN.fullmatch(value) and int(value) <= MAX_ID:
+            content = session.get(Content, int(value))
+            if content is not None:
+                return content
+        # 非数字，或没有该ID的内容（slug本身可能全是数字）
+        return self.get_by_slug(session, value)
+
+    def get_by_slug(self, session: Session, slug: str) -> Optional[Content]:
+        """按slug查询内容，优先使用 slug→id 映射"""
+        content_id = self._lookup(slug)
+        if content_id is not None:
+            content = session.get(Content, content_id)
+            if content is not None and content.slug == slug:
+                return content
+            # 映射已过期（被删除或slug已修改）
+            self.forget(content_id)
+
+        content = session.exec(
+            select(Content).where(Content.slug == slug)
+        ).first()
+        if content is not None:
+            self.remember(content)
+        return content
+
+    # MARK: slug分配
+    def taken_slugs(
+        self, session: Session, base: str, exclude_id: Optional[int] = None
+    ) -> Set[str]:
+        """
+        查询与基础slug冲突的已有slug
+
+        参数:
+            session: 数据库会话
+            base: 基础slug
+            exclude_id: 更新时排除的内容自身ID
+
+        返回:
+            Set[str]: base 本身及 base-* 形式的已有slug
+        """
+        query = select(Content.slug).where(self._slug_conflicts(base))
+        if exclude_id is not None:
+            query = query.where(Content.id != exclude_id)
+        return set(session.exec(query).all()) | RESERVED_SLUGS
+
+    @staticmethod
+    def _slug_conflicts(base: str):
+        # 前缀范围查询可以使用slug唯一索引
+        return or_(
+            Content.slug == base,
+            Content.slug.startswith(f"{base}-", autoescape=True),
+        )
+
+    def unique_slug(
+        self,
+        session: Session,
+        base: str,
+        exclude_id: Optional[int] = None,
+        reserved: Optional[Set[str]] = None,
+    ) -> str:
+        """
+        分配不冲突的slug
+
+        参数:
+            session: 数据库会话
+            base: 基础slug
+            exclude_id: 更新时排除的内容自身ID
+            reserved: 额外视为已占用的slug，例如同一批次中已分配的slug
+
+        返回:
+            str: 可用的slug
+        """
+        taken = self.taken_slugs(session, base, exclude_id)
+        return next_slug(base, taken | (reserved or set()))
+
+    def unique_slugs(
+        self,
+        session: Session,
+        bases: List[str],
+        exclude_ids: Optional[List[Optional[int]]] = None,
+    ) -> List[str]:
+        """
+        一次查询为一批基础slug分配不冲突的slug
+
+        参数:
+            session: 数据库会话
+            bases: 基础slug，按顺序分配
+            exclude_ids: 与 bases 一一对应，更新时排除的内容自身ID
+
+        返回:
+            List[str]: 与 bases 一一对应的slug，同一批次内也互不相同
+        """
+        if not bases:
+            return []
+        # NOTE: 所有基础slug的冲突一次查出，后缀在内存中分配
+        owners = dict(session.exec(
+            select(Content.slug, Content.id).where(
+                or_(*(self._slug_conflicts(base) for base in set(bases)))
+            )
+        ).all())
+        assigned: Set[str] = set()
+        slugs: List[str] = []
+        for base, exclude_id in zip(
+            bases, exclude_ids or [None] * len(bases)
+        ):
+            taken = {
+                slug for slug, owner in owners.items() if owner != exclude_id
+            }
+            slug = next_slug(base, taken | assigned | RESERVED_SLUGS)
+            assigned.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    def assign_slug(
+        self,
+        session: Session,
+        content: ContentIncoming,
+        exclude_id: Optional[int] = None,
+    ) -> None:
+        """根据标题为输入内容生成不冲突的slug，未提供标题时不修改"""
+        if content.title:
+            content.generate_slug(
+                taken=self.taken_slugs(
+                    session, slugify(content.title), exclude_id
+                )
+            )
+
+    @staticmethod
+    def patch_values(patch: ContentIncoming) -> Dict[str, Any]:
+        """
+        取出更新请求中允许修改的字段
+
+        ContentIncoming 允许额外字段，其余键（version、user_id、id 等）
+        一律丢弃，不能由请求体修改；值为 null 的字段视为不修改
+
+        参数:
+            patch: 更新请求，已通过 assign_slug 分配slug
+
+        返回:
+            Dict[str, Any]: 请求中提供的字段；修改标题时包含新的slug
+        """
+        values = {
+            key: value
+            for key, value in patch.dict(
+                exclude_unset=True, include=BATCH_UPDATE_FIELDS
+            ).items()
+            if value is not None
+        }
+        if values.get("title"):
+            values["slug"] = patch.slug
+        return values
+
+    def slug_taken(
+        self, session: Session, slug: str, exclude_id: Optional[int] = None
+    ) -> bool:
+        """slug是否已被其他内容占用"""
+        query = select(Content.id).where(Content.slug == slug)
+        if exclude_id is not None:
+            query = query.where(Content.id != exclude_id)
+        return session.exec(query).first() is not None
+
+    def add_with_unique_slug(self, session: Session, content: Content) -> None:
+        """
+        加入新内容并 flush 以取得主键，不提交事务
+
+        参数:
+            session: 数据库会话
+            content: 已分配slug的新内容
+
+        异常:
+            HTTPException: 重试后slug仍被并发写入占用
+        """
+        for _ in range(SLUG_RETRIES):
+            try:
+                with session.begin_nested():
+                    session.add(content)
+                    session.flush()
+                return
+            except IntegrityError:
+                # 分配slug之后另一个请求写入了相同的slug
+                if not self.slug_taken(session, content.slug):
+                    raise
+                content.slug = self.unique_slug(
+                    session, slugify(content.title)
+                )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Slug is already taken, please retry",
+        )
+
+    @contextmanager
+    def slug_conflict(
+        self, session: Session, slug: Optional[str], exclude_id: int
+    ) -> Iterator[None]:
+        """
+        更新内容时，slug被并发写入占用返回409
+
+        参数:
+            session: 数据库会话
+            slug: 更新后的slug，未修改时为None
+            exclude_id: 被更新的内容ID
+        """
+        try:
+            yield
+        except IntegrityError:
+            session.rollback()
+            if slug is None or not self.slug_taken(session, slug, exclude_id):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Slug is already taken, please retry",
+            )
+
+    # MARK: 标签
+    def ensure_tags(
+        self, session: Session, names: List[str]
+    ) -> Dict[str, int]:
+        """
+        确保标签存在
+
+        参数:
+            session: 数据库会话
+            names: 规范化后的标签名
+
+        返回:
+            Dict[str, int]: 标签名到标签ID的映射
+        """
+        if not names:
+            return {}
+        tag_ids = self._tag_ids(session, names)
+        missing = [name for name in names if name not in tag_ids]
+        if missing:
+            try:
+                with session.begin_nested():
+                    session.execute(
+                        insert(Tag), [{"name": name} for name in missing]
+                    )
+            except IntegrityError:
+                # 并发写入了相同的标签，回滚保存点后重新读取即可
+                pass
+            tag_ids = self._tag_ids(session, names)
+        return tag_ids
+
+    @staticmethod
+    def _tag_ids(session: Session, names: List[str]) -> Dict[str, int]:
+        return dict(session.exec(
+            select(Tag.name, Tag.id).where(Tag.name.in_(names))
+        ).all())
+
+    def sync_tags(
+        self,
+        session: Session,
+        content_id: int,
+        tags: Union[str, Iterable[str], None],
+    ) -> None:
+        """
+        同步单个内容的标签关联，不提交事务
+
+        参数:
+            session: 数据库会话
+            content_id: 内容ID
+            tags: 内容当前的标签
+        """
+        tag_ids = set(self.ensure_tags(session, normalize_tags(tags)).values())
+        current = set(session.exec(
+            select(ContentTag.tag_id).where(
+                ContentTag.content_id == content_id
+            )
+        ).all())
+        if current - tag_ids:
+            session.execute(delete(ContentTag).where(
+                ContentTag.content_id == content_id,
+                ContentTag.tag_id.in_(current - tag_ids),
+            ))
+        if tag_ids - current:
+            session.execute(insert(ContentTag), [
+                {"content_id": content_id, "tag_id": tag_id}
+                for tag_id in tag_ids - current
+            ])
+
+    def add_tags(self, session: Session, rows: List[Dict[str, Any]]) -> None:
+        """为新插入的内容行批量写入标签关联，用于批量导入"""
+        names = {row["id"]: normalize_tags(row.get("tags")) for row in rows}
+        all_names = dict.fromkeys(n for ns in names.values() for n in ns)
+        tag_ids = self.ensure_tags(session, list(all_names))
+        links = [
+            {"content_id": content_id, "tag_id": tag_ids[name]}
+            for content_id, content_names in names.items()
+            for name in content_names
+        ]
+        if links:
+            session.execute(insert(ContentTag), links)
+
+    def clear_tags(self, session: Session, content_id: int) -> None:
+        """删除内容的标签关联，不提交事务"""
+        session.execute(
+            delete(ContentTag).where(ContentTag.content_id == content_id)
+        )
+
+    @staticmethod
+    def tag_filter(tags: Iterable[str], match_all: bool = True):
+        """
+        生成按标签过滤内容的条件
+
+        参数:
+            tags: 标签
+            match_all: True 时需要包含全部标签（AND），否则包含任一标签（OR）
+
+        返回:
+            条件表达式，可直接用于 query.where()
+        """
+        names = normalize_tags(tags)
+        matches = (
+            select(ContentTag.content_id)
+            .join(Tag, Tag.id == ContentTag.tag_id)
+            .where(Tag.name.in_(names))
+        )
+        if match_all and len(names) > 1:
+            matches = matches.group_by(ContentTag.content_id).having(
+                func.count(ContentTag.tag_id) == len(names)
+            )
+        return Content.id.in_(matches)
+
+    # MARK: 批量创建
+    def create_many(
+        self, session: Session, items: List[ContentIncoming], user: User
+    ) -> ContentBatchResponse:
+        """
+        批量创建内容，所有有效项在一个事务中写入
+
+        参数:
+            session: 数据库会话
+            items: 输入内容
+            user: 当前用户，作为所有内容的作者
+
+        返回:
+            ContentBatchResponse: 逐项结果，无效项不影响其他项
+        """
+        results: List[Optional[ContentBatchResult]] = [None] * len(items)
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        for index, item in enumerate(items):
+            if not item.title or not item.text:
+                results[index] = ContentBatchResult(
+                    index=index,
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    error="title and text are required",
+                )
+                continue
+            rows.append((index, {
+                "title": item.title,
+                "slug": slugify(item.title),
+                "text": item.text,
+                "published": bool(item.published),
+                "tags": item.tags or "",
+                "user_id": user.id,
+            }))
+
+        if rows:
+            table = Content.__table__
+            data = [row for _, row in rows]
+            slugs = self.unique_slugs(session, [row["slug"] for row in data])
+            for row, slug in zip(data, slugs):
+                row["slug"] = slug
+            try:
+                ids = session.scalars(
+                    insert(table).returning(
+                        table.c.id, sort_by_parameter_order=True
+                    ),
+                    data,
+                ).all()
+                for row, content_id in zip(data, ids):
+                    row["id"] = content_id
+                self.add_tags(session, data)
+                outbox.add(session, EventTypes.CONTENTS_IMPORTED, data)
+                session.commit()
+            except SQLAlchemyError as e:
+                self._batch_failed(session, e)
+
+            for index, row in rows:
+                results[index] = ContentBatchResult(
+                    index=index,
+                    status=status.HTTP_201_CREATED,
+                    id=row["id"],
+                    slug=row["slug"],
+                    version=1,
+                )
+            event_bus.publish(
+                EventTypes.CONTENTS_IMPORTED, [Content(**row) for row in data]
+            )
+        return self._batch_response(results)
+
+    # MARK: 批量更新
+    def update_many(
+        self, session: Session, items: List[ContentBatchUpdate], user: User
+    ) -> ContentBatchResponse:
+        """
+        批量更新内容，所有有效项在一个事务中写入
+
+        参数:
+            session: 数据库会话
+            items: 更新项，version 提供时必须与当前行版本一致
+            user: 当前用户，只能更新自己的内容，管理员不受限制
+
+        返回:
+            ContentBatchResponse: 逐项结果，无效项不影响其他项
+        """
+        # NOTE: 一次查询加载并锁定所有目标行，避免检查与写入之间被修改
+        contents = {
+            content.id: content
+            for content in session.exec(
+                select(Content)
+                .where(Content.id.in_({item.id for item in items}))
+                .with_for_update()
+            ).all()
+        }
+
+        results: List[Optional[ContentBatchResult]] = [None] * len(items)
+        params: List[Tuple[int, Dict[str, Any]]] = []
+        seen: Set[int] = set()
+        now = datetime.utcnow()
+        for index, item in enumerate(items):
+            content = contents.get(item.id)
+            error = self._update_error(content, item, user, seen)
+            if error is not None:
+                results[index] = ContentBatchResult(
+                    index=index, id=item.id, status=error[0], error=error[1]
+                )
+                continue
+            seen.add(item.id)
+
+            data = item.dict(exclude_unset=True, include=BATCH_UPDATE_FIELDS)
+            data.update(
+                id=content.id, version=content.version + 1, updated_at=now
+            )
+            params.append((index, data))
+
+        # 修改了标题的项重新分配slug，排除各自原有的slug
+        retitled = [data for _, data in params if data.get("title")]
+        slugs = self.unique_slugs(
+            session,
+            [slugify(data["title"]) for data in retitled],
+            [data["id"] for data in retitled],
+        )
+        for data, slug in zip(retitled, slugs):
+            data["slug"] = slug
+
+        if params:
+            try:
+                for group in self._group_by_columns(
+                    [data for _, data in params]
+                ):
+                    session.execute(update(Content), group)
+                for _, data in params:
+                    if "tags" in data:
+                        self.sync_tags(session, data["id"], data["tags"])
+                # 每项一个更新事件，数据为更新后的完整内容
+                outbox.add_many(session, EventTypes.CONTENT_UPDATED, [
+                    {**contents[data["id"]].dict(), **data}
+                    for _, data in params
+                ])
+                session.commit()
+            except SQLAlchemyError as e:
+                self._batch_failed(session, e)
+
+            for index, data in params:
+                results[index] = ContentBatchResult(
+                    index=index,
+                    status=status.HTTP_200_OK,
+                    id=data["id"],
+                    slug=data.get("slug", contents[data["id"]].slug),
+                    version=data["version"],
+                )
+            # 提交后一次查询重新加载，发布更新事件
+            for content in session.exec(
+                select(Content).where(
+                    Content.id.in_([data["id"] for _, data in params])
+                )
+            ).all():
+                event_bus.publish(EventTypes.CONTENT_UPDATED, content)
+        return self._batch_response(results)
+
+    @staticmethod
+    def _update_error(
+        content: Optional[Content],
+        item: ContentBatchUpdate,
+        user: User,
+        seen: Set[int],
+    ) -> Optional[Tuple[int, str]]:
+        if content is None:
+            return status.HTTP_404_NOT_FOUND, "Content not found"
+        if item.id in seen:
+            return status.HTTP_409_CONFLICT, "Duplicate id in batch"
+        if content.user_id != user.id and not user.superuser:
+            return status.HTTP_403_FORBIDDEN, "You don't own this content"
+        if item.version is not None and item.version != content.version:
+            return (
+                status.HTTP_412_PRECONDITION_FAILED,
+                "Resource has been modified",
+            )
+        return None
+
+    @staticmethod
+    def _group_by_columns(
+        rows: List[Dict[str, Any]]
+    ) -> Iterable[List[Dict[str, Any]]]:
+        # executemany 要求每组参数的列相同
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        return groups.values()
+
+    @staticmethod
+    def _batch_failed(session: Session, error: SQLAlchemyError) -> None:
+        # 批量写入是一个事务，数据库错误时整体回滚
+        session.rollback()
+        logger.error(f"批量写入内容失败: {str(error)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch rolled back: "
+            f"{str(getattr(error, 'orig', error))}",
+        )
+
+    @staticmethod
+    def _batch_response(
+        results: List[ContentBatchResult],
+    ) -> ContentBatchResponse:
+        succeeded = sum(1 for result in results if result.status < 400)
+        return ContentBatchResponse(
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results,
+        )
+
+    # MARK: 映射
+    def _lookup(self, slug: str) -> Optional[int]:
+        with self._lock:
+            content_id = self._slug_ids.get(slug)
+            if content_id is not None:
+                self._slug_ids.move_to_end(slug)
+            return content_id
+
+    def remember(self, content: Content) -> None:
+        """记录内容的 slug→id 映射"""
+        if content.id is None or not content.slug:
+            return
+        with self._lock:
+            old_slug = self._id_slugs.get(content.id)
+            if old_slug is not None and old_slug != content.slug:
+                self._slug_ids.pop(old_slug, None)
+            self._slug_ids[content.slug] = content.id
+            self._slug_ids.move_to_end(content.slug)
+            self._id_slugs[content.id] = content.slug
+            while len(self._slug_ids) > self.max_slugs:
+                _, evicted_id = self._slug_ids.popitem(last=False)
+                self._id_slugs.pop(evicted_id, None)
+
+    def forget(self, content_id: int) -> None:
+        """删除内容的 slug→id 映射"""
+        with self._lock:
+            slug = self._id_slugs.pop(content_id, None)
+            if slug is not None:
+                self._slug_ids.pop(slug, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slug_ids.clear()
+            self._id_slugs.clear()
+
+    # MARK: 事件订阅
+    def register_event_handlers(self, bus: EventBus = event_bus) -> None:
+        """订阅内容事件，失效 slug→id 映射"""
+        bus.subscribe(EventTypes.CONTENT_CREATED, self._on_content_changed)
+        bus.subscribe(EventTypes.CONTENT_UPDATED, self._on_content_changed)
+        bus.subscribe(EventTypes.CONTENT_DELETED, self.forget)
+
+    def _on_content_changed(self, content: Content) -> None:
+        # 只移除旧映射，下次查询时再加载，避免在事件中缓存未使用的slug
+        self.forget(content.id)
+
+
+# MARK: 创建单例实例
+content_service = ContentService()
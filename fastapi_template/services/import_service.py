@@ -0,0 +1,323 @@
+import csv
+import json
+import logging
+from datetime import datetime, timezone
+from itertools import groupby, islice
+from typing import (
+    Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple,
+    Type
+)
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, SQLModel
+
+from fastapi_template.core.events import EventTypes, event_bus
+from fastapi_template.core.outbox import outbox
+from fastapi_template.models.blog import Comment, Post
+from fastapi_template.models.bulk import (
+    CommentImportRow, ContentImportRow, ImportChunkReport, ImportReport,
+    ImportRowError, PostImportRow
+)
+from fastapi_template.models.content import Content
+from fastapi_template.services.content_service import content_service
+from fastapi_template.utils.slug import slugify
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+# 每个分块最多记录的行错误数，避免大量坏数据撑大报告
+MAX_ERRORS_PER_CHUNK = 50
+
+# 一条输入记录：(行号, 解析后的字典或None, 解析错误或None)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+# MARK: 读取记录
+"""
+读取记录
+- 逐行读取NDJSON或CSV，生成器方式返回，内存占用与文件大小无关
+- 解析失败的行不会中断读取，而是带着错误信息返回
+- CSV中的空字符串视为未提供该字段
+"""
+def iter_records(stream: IO[str], fmt: str) -> Iterator[Record]:
+    if fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {str(e)}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "each line must be a JSON object"
+                continue
+            yield line_no, record, None
+    elif fmt == "csv":
+        reader = csv.DictReader(stream)
+        for line_no, row in enumerate(reader, start=1):
+            yield line_no, {
+                key: value for key, value in row.items()
+                if key is not None and value != ""
+            }, None
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def guess_format(filename: Optional[str], default: str = "ndjson") -> str:
+    """根据文件扩展名推断格式"""
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """按固定大小切分可迭代对象"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# MARK: 行转换
+"""
+行转换
+- 将校验后的导入行转换为数据库行
+- 补全默认的用户ID、时间和slug
+"""
+def post_row(row: PostImportRow, user_id: int) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    data = row.dict(exclude_none=True)
+    data.setdefault("user_id", user_id)
+    data.setdefault("created_at", now)
+    data.setdefault("updated_at", data["created_at"])
+    return data
+
+
+def comment_row(row: CommentImportRow, user_id: int) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    data = row.dict(exclude_none=True)
+    data.setdefault("user_id", user_id)
+    data.setdefault("created_at", now)
+    data.setdefault("updated_at", data["created_at"])
+    return data
+
+
+def content_row(row: ContentImportRow, user_id: int) -> Dict[str, Any]:
+    data = row.dict(exclude_none=True)
+    data.setdefault("user_id", user_id)
+    data.setdefault("created_time", datetime.now(timezone.utc))
+    if not data.get("slug"):
+        data["slug"] = slugify(row.title)
+    tags = data.get("tags", "")
+    if isinstance(tags, list):
+        tags = ",".join(tags)
+    data["tags"] = tags
+    return data
+
+
+# MARK: 导入类型配置
+"""
+导入类型配置
+- 每种类型对应：数据库模型、导入行模型、行转换函数和导入完成事件
+"""
+IMPORTERS: Dict[str, Tuple[
+    Type[SQLModel], Type[BaseModel], Callable[[Any, int], Dict[str, Any]], str
+]] = {
+    "posts": (Post, PostImportRow, post_row, EventTypes.POSTS_IMPORTED),
+    "comments": (
+        Comment, CommentImportRow, comment_row, EventTypes.COMMENTS_IMPORTED
+    ),
+    "contents": (
+        Content, ContentImportRow, content_row, EventTypes.CONTENTS_IMPORTED
+    ),
+}
+
+
+# MARK: 导入服务
+"""
+导入服务
+- 流式读取NDJSON/CSV，按分块校验并批量写入
+- 每个分块使用一个事务和一条 executemany 的 INSERT
+- 分块写入成功后发布导入事件，用于更新搜索索引和缓存
+"""
+class ImportService:
+    def __init__(self, engine: Engine, chunk_size: int = 1000):
+        self.engine = engine
+        self.chunk_size = chunk_size
+
+    def import_stream(
+        self,
+        kind: str,
+        stream: IO[str],
+        fmt: str = "ndjson",
+        user_id: int = 1,
+    ) -> ImportReport:
+        """
+        从文本流导入数据
+
+        参数:
+            kind: 导入类型（posts, comments, contents）
+            stream: 文本流
+            fmt: 输入格式（ndjson 或 csv）
+            user_id: 行中未提供 user_id 时使用的用户ID
+
+        返回:
+            ImportReport: 导入报告
+        """
+        if kind not in IMPORTERS:
+            raise ValueError(f"Unsupported import kind: {kind}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        model, row_model, to_row, event_type = IMPORTERS[kind]
+        report = ImportReport(kind=kind, format=fmt)
+        records = iter_records(stream, fmt)
+
+        for number, chunk in enumerate(
+            chunked(records, self.chunk_size), start=1
+        ):
+            chunk_report = self._import_chunk(
+                number, chunk, model, row_model, to_row, event_type, user_id
+            )
+            report.total += len(chunk)
+            report.inserted += chunk_report.inserted
+            report.failed += chunk_report.failed
+            report.chunks.append(chunk_report)
+
+        self._sync_sequence(model)
+        return report
+
+    def _import_chunk(
+        self,
+        number: int,
+        chunk: List[Record],
+        model: Type[SQLModel],
+        row_model: Type[BaseModel],
+        to_row: Callable[[Any, int], Dict[str, Any]],
+        event_type: str,
+        user_id: int,
+    ) -> ImportChunkReport:
+        chunk_report = ImportChunkReport(
+            chunk=number,
+            first_line=chunk[0][0],
+            last_line=chunk[-1][0],
+            inserted=0,
+            failed=0,
+        )
+
+        # NOTE: 校验整个分块，坏行单独记录，不影响同一分块中的其他行
+        rows: List[Dict[str, Any]] = []
+        for line_no, record, error in chunk:
+            if error is None:
+                try:
+                    rows.append(to_row(row_model(**record), user_id))
+                    continue
+                except (ValidationError, TypeError, ValueError) as e:
+                    error = str(e)
+            chunk_report.failed += 1
+            self._add_error(chunk_report, line_no, error)
+
+        if not rows:
+            return chunk_report
+
+        # NOTE: 一个分块一个事务，使用 executemany 批量插入
+        table = model.__table__
+        try:
+            with Session(self.engine) as session, session.begin():
+                if model is Comment:
+                    self._resolve_roots(session, rows)
+                elif model is Content:
+                    self._resolve_slugs(session, rows)
+                for group in self._group_by_columns(rows):
+                    ids = session.scalars(
+                        insert(table).returning(
+                            table.c.id, sort_by_parameter_order=True
+                        ),
+                        group,
+                    ).all()
+                    for row, row_id in zip(group, ids):
+                        row["id"] = row_id
+                if model is Content:
+                    content_service.add_tags(session, rows)
+                # 整个分块一个事件，与数据在同一个事务中提交
+                outbox.add(session, event_type, rows)
+        except SQLAlchemyError as e:
+            logger.error(f"导入第 {number} 个分块失败: {str(e)}")
+            chunk_report.failed += len(rows)
+            self._add_error(
+                chunk_report,
+                chunk_report.first_line,
+                f"chunk rolled back: {str(getattr(e, 'orig', e))}",
+            )
+            return chunk_report
+
+        chunk_report.inserted = len(rows)
+        event_bus.publish(event_type, [model(**row) for row in rows])
+        return chunk_report
+
+    @staticmethod
+    def _group_by_columns(
+        rows: List[Dict[str, Any]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        # executemany 要求每组参数的列相同，例如只有部分行显式提供了id；
+        # 按输入顺序切分成列相同的连续段，回复评论不会先于父评论插入
+        for _, run in groupby(rows, key=lambda row: tuple(sorted(row))):
+            yield list(run)
+
+    @staticmethod
+    def _resolve_roots(session: Session, rows: List[Dict[str, Any]]) -> None:
+        # 与创建评论接口一致：root_id 取父评论的 root_id，父评论是根评论时取父评论id
+        if not any(row.get("parent_id") for row in rows):
+            return
+        chunk_ids = {row["id"] for row in rows if row.get("id")}
+        missing = {
+            row["parent_id"] for row in rows
+            if row.get("parent_id") and row["parent_id"] not in chunk_ids
+        }
+        roots: Dict[int, int] = {}
+        if missing:
+            for comment_id, root_id in session.exec(
+                select(Comment.id, Comment.root_id).where(
+                    Comment.id.in_(missing)
+                )
+            ):
+                roots[comment_id] = root_id or comment_id
+        # 按输入顺序处理，同一分块中的父评论需要出现在回复之前
+        for row in rows:
+            if row.get("parent_id") and not row.get("root_id"):
+                row["root_id"] = roots.get(row["parent_id"], row["parent_id"])
+            if row.get("id"):
+                roots[row["id"]] = row.get("root_id") or row["id"]
+
+    @staticmethod
+    def _resolve_slugs(session: Session, rows: List[Dict[str, Any]]) -> None:
+        # slug有唯一索引，与已有数据或同一分块中其他行冲突时追加数字后缀
+        slugs = content_service.unique_slugs(
+            session, [row["slug"] for row in rows]
+        )
+        for row, slug in zip(rows, slugs):
+            row["slug"] = slug
+
+    @staticmethod
+    def _add_error(report: ImportChunkReport, line: int, error: str) -> None:
+        if len(report.errors) < MAX_ERRORS_PER_CHUNK:
+            report.errors.append(ImportRowError(line=line, error=error))
+
+    def _sync_sequence(self, model: Type[SQLModel]) -> None:
+        # 导入时可能显式写入了主键，Postgres需要把序列推进到当前最大值
+        if self.engine.dialect.name != "postgresql":
+            return
+        table = model.__tablename__
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
@@ -0,0 +1,512 @@
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventBus, EventTypes, event_bus
+from fastapi_template.db import engine
+from fastapi_template.models.blog import Post
+from fastapi_template.models.content import Content
+from fastapi_template.models.search import SearchHit
+from fastapi_template.utils.pagination import PaginatedResponse
+
+logger = logging.getLogger(__name__)
+
+# 可被索引的文档类型
+KIND_POST = "post"
+KIND_CONTENT = "content"
+KINDS = (KIND_POST, KIND_CONTENT)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# MARK: 文档构建
+"""
+文档构建
+- 将Post和Content转换为统一的索引文档
+- 未发布的内容不进入索引，避免草稿被搜索到
+"""
+def post_document(post: Post) -> Optional[Dict[str, Any]]:
+    if not post.published:
+        return None
+    return {
+        "kind": KIND_POST,
+        "ref_id": post.id,
+        "title": post.title or "",
+        "body": post.content or "",
+        "tags": "",
+    }
+
+
+def content_document(content: Content) -> Optional[Dict[str, Any]]:
+    if not content.published:
+        return None
+    return {
+        "kind": KIND_CONTENT,
+        "ref_id": content.id,
+        "title": content.title or "",
+        "body": content.text or "",
+        "tags": (content.tags or "").replace(",", " "),
+    }
+
+
+# MARK: 搜索后端基类
+"""
+搜索后端基类
+- 定义索引的创建、写入、删除和查询接口
+- 具体实现根据数据库方言选择（SQLite FTS5 / Postgres tsvector）
+"""
+class SearchBackend:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def create_index(self) -> None:
+        """创建索引结构（幂等）"""
+        raise NotImplementedError
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """写入或覆盖一批文档，返回写入数量"""
+        raise NotImplementedError
+
+    def remove_document(self, kind: str, ref_id: int) -> None:
+        """从索引中删除文档"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """清空索引"""
+        raise NotImplementedError
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        page: int = 1,
+        size: int = 10,
+    ) -> PaginatedResponse[SearchHit]:
+        """按相关度排序的分页搜索"""
+        raise NotImplementedError
+
+    def index_document(self, document: Dict[str, Any]) -> None:
+        self.index_documents([document])
+
+
+# MARK: SQLite FTS5后端
+"""
+SQLite FTS5后端
+- 使用 fts5 虚拟表保存标题、正文和标签
+- rowid 由 (kind, ref_id) 编码得到，增量更新和删除走 rowid 查找而非全表扫描
+- 使用 bm25 排序，标题和标签的权重高于正文
+"""
+class SqliteSearchBackend(SearchBackend):
+    table = "search_index"
+    # bm25 权重，顺序与建表列顺序一致：kind, ref_id, title, body, tags
+    weights = (0.0, 0.0, 10.0, 1.0, 5.0)
+
+    @staticmethod
+    def _rowid(kind: str, ref_id: int) -> int:
+        return int(ref_id) * len(KINDS) + KINDS.index(kind)
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # 将用户输入转换为安全的 FTS5 表达式：每个词加引号，最后一个词做前缀匹配
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            return ""
+        quoted = ['"%s"' % token.replace('"', '""') for token in tokens]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def create_index(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "kind UNINDEXED, ref_id UNINDEXED, title, body, tags, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        rows = [
+            dict(doc, rowid=self._rowid(doc["kind"], doc["ref_id"]))
+            for doc in documents
+        ]
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {self.table} WHERE rowid = :rowid"),
+                [{"rowid": row["rowid"]} for row in rows],
+            )
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.table} "
+                    "(rowid, kind, ref_id, title, body, tags) "
+                    "VALUES (:rowid, :kind, :ref_id, :title, :body, :tags)"
+                ),
+                rows,
+            )
+        return len(rows)
+
+    def remove_document(self, kind: str, ref_id: int) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {self.table} WHERE rowid = :rowid"),
+                {"rowid": self._rowid(kind, ref_id)},
+            )
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table}"))
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        page: int = 1,
+        size: int = 10,
+    ) -> PaginatedResponse[SearchHit]:
+        match = self._match_expression(query)
+        if not match:
+            return _empty_page(page, size)
+
+        where = f"{self.table} MATCH :match"
+        params: Dict[str, Any] = {"match": match}
+        if kind:
+            where += " AND kind = :kind"
+            params["kind"] = kind
+
+        weights = ", ".join(str(w) for w in self.weights)
+        sql = text(
+            f"SELECT kind, ref_id, "
+            f"highlight({self.table}, 2, :hs, :he) AS title, "
+            f"snippet({self.table}, 3, :hs, :he, '…', 24) AS snippet, "
+            f"bm25({self.table}, {weights}) AS rank "
+            f"FROM {self.table} WHERE {where} "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        )
+        count_sql = text(f"SELECT count(*) FROM {self.table} WHERE {where}")
+
+        with self.engine.connect() as conn:
+            total = conn.execute(count_sql, params).scalar_one()
+            rows = conn.execute(sql, dict(
+                params,
+                hs=HIGHLIGHT_START,
+                he=HIGHLIGHT_END,
+                limit=size,
+                offset=(page - 1) * size,
+            )).all()
+
+        # bm25 越小越相关，对外统一为越大越相关
+        items = [
+            SearchHit(
+                kind=row.kind,
+                id=row.ref_id,
+                title=row.title,
+                snippet=row.snippet,
+                score=-row.rank,
+            )
+            for row in rows
+        ]
+        return _page(items, total, page, size)
+
+
+# MARK: Postgres全文搜索后端
+"""
+Postgres全文搜索后端
+- 使用独立的 search_document 表，document 列为生成的 tsvector
+- 在 document 上建立 GIN 索引
+- 使用 ts_rank_cd 排序，仅对当前页结果计算 ts_headline 高亮
+"""
+class PostgresSearchBackend(SearchBackend):
+    table = "search_document"
+
+    def __init__(self, engine: Engine, language: Optional[str] = None):
+        super().__init__(engine)
+        self.language = language or settings.SEARCH_LANGUAGE
+
+    def create_index(self) -> None:
+        lang = self.language
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "kind VARCHAR(16) NOT NULL, "
+                "ref_id INTEGER NOT NULL, "
+                "title TEXT NOT NULL DEFAULT '', "
+                "body TEXT NOT NULL DEFAULT '', "
+                "tags TEXT NOT NULL DEFAULT '', "
+                "document tsvector GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('{lang}', title), 'A') || "
+                f"setweight(to_tsvector('{lang}', tags), 'B') || "
+                f"setweight(to_tsvector('{lang}', body), 'C')"
+                ") STORED, "
+                "PRIMARY KEY (kind, ref_id))"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.table}_document "
+                f"ON {self.table} USING GIN (document)"
+            ))
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        rows = list(documents)
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.table} (kind, ref_id, title, body, tags) "
+                    "VALUES (:kind, :ref_id, :title, :body, :tags) "
+                    "ON CONFLICT (kind, ref_id) DO UPDATE SET "
+                    "title = EXCLUDED.title, body = EXCLUDED.body, "
+                    "tags = EXCLUDED.tags"
+                ),
+                rows,
+            )
+        return len(rows)
+
+    def remove_document(self, kind: str, ref_id: int) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"DELETE FROM {self.table} "
+                    "WHERE kind = :kind AND ref_id = :ref_id"
+                ),
+                {"kind": kind, "ref_id": ref_id},
+            )
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {self.table}"))
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        page: int = 1,
+        size: int = 10,
+    ) -> PaginatedResponse[SearchHit]:
+        if not _TOKEN_RE.search(query):
+            return _empty_page(page, size)
+
+        lang = self.language
+        where = "d.document @@ q.query"
+        params: Dict[str, Any] = {"query": query}
+        if kind:
+            where += " AND d.kind = :kind"
+            params["kind"] = kind
+
+        tsquery = f"websearch_to_tsquery('{lang}', :query)"
+        options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}"
+        sql = text(
+            "SELECT hit.kind, hit.ref_id, hit.rank, "
+            f"ts_headline('{lang}', hit.title, q.query, "
+            "'HighlightAll=true, " + options + "') AS title, "
+            f"ts_headline('{lang}', hit.body, q.query, "
+            "'MaxFragments=1, MaxWords=24, MinWords=8, " + options + "') "
+            "AS snippet "
+            "FROM ("
+            "  SELECT d.kind, d.ref_id, d.title, d.body, "
+            "  ts_rank_cd(d.document, q.query) AS rank "
+            f"  FROM {self.table} d, {tsquery} AS q(query) "
+            f"  WHERE {where} "
+            "  ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+            f") hit, {tsquery} AS q(query) "
+            "ORDER BY hit.rank DESC"
+        )
+        count_sql = text(
+            f"SELECT count(*) FROM {self.table} d, {tsquery} AS q(query) "
+            f"WHERE {where}"
+        )
+
+        with self.engine.connect() as conn:
+            total = conn.execute(count_sql, params).scalar_one()
+            rows = conn.execute(sql, dict(
+                params, limit=size, offset=(page - 1) * size
+            )).all()
+
+        items = [
+            SearchHit(
+                kind=row.kind,
+                id=row.ref_id,
+                title=row.title,
+                snippet=row.snippet,
+                score=row.rank,
+            )
+            for row in rows
+        ]
+        return _page(items, total, page, size)
+
+
+def _page(
+    items: List[SearchHit], total: int, page: int, size: int
+) -> PaginatedResponse[SearchHit]:
+    pages = (total + size - 1) // size
+    return PaginatedResponse(
+        items=items,
+        total=total,
+        page=page,
+        size=size,
+        pages=pages,
+        has_next=page < pages,
+        has_prev=page > 1,
+    )
+
+
+def _empty_page(page: int, size: int) -> PaginatedResponse[SearchHit]:
+    return _page([], 0, page, size)
+
+
+# MARK: 选择搜索后端
+"""
+选择搜索后端
+- 根据数据库方言返回对应的后端实现
+"""
+def get_search_backend(engine: Engine) -> SearchBackend:
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        return SqliteSearchBackend(engine)
+    if dialect == "postgresql":
+        return PostgresSearchBackend(engine)
+    raise ValueError(f"Full-text search is not supported on {dialect}")
+
+
+# MARK: 搜索服务
+"""
+搜索服务
+- 封装搜索后端，提供索引维护和查询
+- 通过事件总线订阅内容/文章的增删改事件，增量更新索引
+- 提供全量重建索引的功能
+"""
+class SearchService:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._backend: Optional[SearchBackend] = None
+
+    @property
+    def backend(self) -> SearchBackend:
+        if self._backend is None:
+            self._backend = get_search_backend(self.engine)
+        return self._backend
+
+    def create_index(self) -> None:
+        self.backend.create_index()
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        page: int = 1,
+        size: int = 10,
+    ) -> PaginatedResponse[SearchHit]:
+        """
+        全文搜索
+
+        参数:
+            query: 搜索关键词
+            kind: 文档类型过滤（post 或 content）
+            page: 页码
+            size: 每页大小
+
+        返回:
+            PaginatedResponse[SearchHit]: 按相关度排序的分页结果
+        """
+        if page < 1:
+            page = 1
+        if size < 1:
+            size = 10
+        return self.backend.search(query, kind=kind, page=page, size=size)
+
+    # MARK: 增量索引
+    def index_post(self, post: Post) -> None:
+        document = post_document(post)
+        if document is None:
+            self.backend.remove_document(KIND_POST, post.id)
+        else:
+            self.backend.index_document(document)
+
+    def index_content(self, content: Content) -> None:
+        document = content_document(content)
+        if document is None:
+            self.backend.remove_document(KIND_CONTENT, content.id)
+        else:
+            self.backend.index_document(document)
+
+    def index_posts(self, posts: List[Post]) -> int:
+        documents = [post_document(post) for post in posts]
+        return self.backend.index_documents(d for d in documents if d)
+
+    def index_contents(self, contents: List[Content]) -> int:
+        documents = [content_document(content) for content in contents]
+        return self.backend.index_documents(d for d in documents if d)
+
+    def remove_post(self, post_id: int) -> None:
+        self.backend.remove_document(KIND_POST, post_id)
+
+    def remove_content(self, content_id: int) -> None:
+        self.backend.remove_document(KIND_CONTENT, content_id)
+
+    # MARK: 全量重建
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        全量重建索引
+
+        参数:
+            batch_size: 每批写入的文档数量
+
+        返回:
+            int: 写入索引的文档数量
+        """
+        self.backend.clear()
+        total = 0
+        with Session(self.engine) as session:
+            for model, to_document in (
+                (Post, post_document),
+                (Content, content_document),
+            ):
+                batch: List[Dict[str, Any]] = []
+                rows = session.exec(
+                    select(model).execution_options(yield_per=batch_size)
+                )
+                for row in rows:
+                    document = to_document(row)
+                    if document is None:
+                        continue
+                    batch.append(document)
+                    if len(batch) >= batch_size:
+                        total += self.backend.index_documents(batch)
+                        batch = []
+                total += self.backend.index_documents(batch)
+        return total
+
+    # MARK: 事件订阅
+    def register_event_handlers(self, bus: EventBus = event_bus) -> None:
+        """订阅内容和文章事件，保持索引与数据库同步"""
+        bus.subscribe(EventTypes.CONTENT_CREATED, self._safe(self.index_content))
+        bus.subscribe(EventTypes.CONTENT_UPDATED, self._safe(self.index_content))
+        bus.subscribe(EventTypes.CONTENT_DELETED, self._safe(self.remove_content))
+        bus.subscribe(EventTypes.POST_CREATED, self._safe(self.index_post))
+        bus.subscribe(EventTypes.POST_UPDATED, self._safe(self.index_post))
+        bus.subscribe(EventTypes.POST_DELETED, self._safe(self.remove_post))
+        bus.subscribe(EventTypes.POSTS_IMPORTED, self._safe(self.index_posts))
+        bus.subscribe(
+            EventTypes.CONTENTS_IMPORTED, self._safe(self.index_contents)
+        )
+
+    @staticmethod
+    def _safe(handler):
+        # 索引失败不应影响已经提交的写请求，记录日志后可通过重建索引修复
+        def wrapper(data):
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"更新搜索索引失败: {str(e)}")
+        return wrapper
+
+
+# MARK: 创建单例实例
+search_service = SearchService(engine)
@@ -0,0 +1,295 @@
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import (
+    Any, Callable, Dict, IO, Iterator, List, Optional, Set, Tuple
+)
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from fastapi_template.core.events import EventTypes, event_bus
+from fastapi_template.core.outbox import outbox
+from fastapi_template.models.bulk import (
+    ImportChunkReport, ImportReport, ImportRowError, UserImportRow
+)
+from fastapi_template.models.security import User
+from fastapi_template.security import get_password_hash
+from fastapi_template.services.import_service import (
+    FORMATS, MAX_ERRORS_PER_CHUNK, Record, chunked, iter_records
+)
+
+logger = logging.getLogger(__name__)
+
+# 用户名已存在时的处理方式
+CONFLICT_SKIP = "skip"
+CONFLICT_UPDATE = "update"
+CONFLICT_MODES = (CONFLICT_SKIP, CONFLICT_UPDATE)
+
+# 每个分块导入完成后的回调，参数为截至当前的导入报告
+Progress = Callable[[ImportReport], None]
+
+
+# MARK: 用户导入服务
+"""
+用户导入服务
+- 流式读取NDJSON/CSV，按分块校验、哈希密码并批量写入
+- bcrypt 哈希是CPU密集型操作，分块内的密码在进程池中并行哈希；
+  下一个分块的哈希与当前分块的写入重叠进行
+- 写入前用一次 IN 查询找出已存在的用户名，按 on_conflict 跳过或覆盖，
+  被跳过的用户不做哈希
+- 每个分块一个事务，使用 executemany 批量写入
+"""
+class UserImportService:
+    def __init__(
+        self,
+        engine: Engine,
+        chunk_size: int = 1000,
+        workers: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        # None 使用CPU核数，0 在当前进程中哈希
+        self.workers = workers
+
+    def import_stream(
+        self,
+        stream: IO[str],
+        fmt: str = "ndjson",
+        on_conflict: str = CONFLICT_SKIP,
+        progress: Optional[Progress] = None,
+    ) -> ImportReport:
+        """
+        从文本流批量创建用户
+
+        参数:
+            stream: 文本流
+            fmt: 输入格式（ndjson 或 csv）
+            on_conflict: 用户名已存在时 skip（跳过）或 update（覆盖密码和状态）
+            progress: 每个分块完成后调用，用于报告进度
+
+        返回:
+            ImportReport: 导入报告
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"Unsupported conflict mode: {on_conflict}")
+
+        report = ImportReport(kind="users", format=fmt)
+        chunks = chunked(iter_records(stream, fmt), self.chunk_size)
+
+        executor = self._executor()
+        try:
+            for size, chunk_report in self._pipeline(
+                chunks, executor, on_conflict
+            ):
+                report.total += size
+                report.inserted += chunk_report.inserted
+                report.updated += chunk_report.updated
+                report.skipped += chunk_report.skipped
+                report.failed += chunk_report.failed
+                report.chunks.append(chunk_report)
+                if progress is not None:
+                    progress(report)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return report
+
+    def _executor(self) -> Optional[Executor]:
+        if self.workers == 0:
+            return None
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    # MARK: 流水线
+    def _pipeline(
+        self,
+        chunks: Iterator[List[Record]],
+        executor: Optional[Executor],
+        on_conflict: str,
+    ) -> Iterator[Tuple[int, ImportChunkReport]]:
+        # 先提交下一个分块的哈希任务，再写入当前分块，CPU和数据库并行工作
+        pending = None
+        for number, chunk in enumerate(chunks, start=1):
+            prepared = (
+                len(chunk),
+                self._prepare(number, chunk, executor, on_conflict),
+            )
+            if pending is not None:
+                yield pending[0], self._write(*pending[1], on_conflict)
+            pending = prepared
+        if pending is not None:
+            yield pending[0], self._write(*pending[1], on_conflict)
+
+    def _prepare(
+        self,
+        number: int,
+        chunk: List[Record],
+        executor: Optional[Executor],
+        on_conflict: str,
+    ) -> Tuple[ImportChunkReport, List[Dict[str, Any]], Any]:
+        chunk_report = ImportChunkReport(
+            chunk=number,
+            first_line=chunk[0][0],
+            last_line=chunk[-1][0],
+            inserted=0,
+            failed=0,
+        )
+
+        # NOTE: 校验整个分块，同一分块中重复的用户名只保留第一条
+        rows: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for line_no, record, error in chunk:
+            if error is None:
+                try:
+                    row = UserImportRow(**record)
+                except (ValidationError, TypeError, ValueError) as e:
+                    error = str(e)
+                else:
+                    if row.username not in seen:
+                        seen.add(row.username)
+                        rows.append(row.dict())
+                        continue
+                    error = f"duplicate username: {row.username}"
+            chunk_report.failed += 1
+            self._add_error(chunk_report, line_no, error)
+
+        if rows and on_conflict == CONFLICT_SKIP:
+            existing = self._existing_usernames(
+                [row["username"] for row in rows]
+            )
+            chunk_report.skipped = sum(
+                1 for row in rows if row["username"] in existing
+            )
+            rows = [row for row in rows if row["username"] not in existing]
+
+        passwords = [row.pop("password") for row in rows]
+        if executor is None:
+            hashes = [get_password_hash(password) for password in passwords]
+        else:
+            # 返回惰性结果，写入时才等待，使哈希与上一个分块的写入重叠
+            hashes = executor.map(
+                get_password_hash,
+                passwords,
+                chunksize=max(1, len(passwords) // 64),
+            )
+        return chunk_report, rows, hashes
+
+    def _existing_usernames(self, usernames: List[str]) -> Set[str]:
+        with self.engine.connect() as conn:
+            return set(conn.scalars(
+                select(User.username).where(User.username.in_(usernames))
+            ))
+
+    # MARK: 写入
+    def _write(
+        self,
+        chunk_report: ImportChunkReport,
+        rows: List[Dict[str, Any]],
+        hashes: Any,
+        on_conflict: str,
+    ) -> ImportChunkReport:
+        if not rows:
+            return chunk_report
+        for row, password in zip(rows, hashes):
+            row["password"] = password
+
+        written = len(rows)
+        try:
+            with Session(self.engine) as session, session.begin():
+                if on_conflict == CONFLICT_UPDATE:
+                    existing = {
+                        username: user_id
+                        for user_id, username in session.exec(
+                            select(User.id, User.username).where(
+                                User.username.in_(
+                                    [row["username"] for row in rows]
+                                )
+                            )
+                        )
+                    }
+                    updates = [
+                        dict(row, user_id=existing[row["username"]])
+                        for row in rows if row["username"] in existing
+                    ]
+                    rows = [
+                        row for row in rows if row["username"] not in existing
+                    ]
+                    self._update_existing(session, updates)
+                    chunk_report.updated = len(updates)
+                inserted = self._insert(session, rows)
+                if inserted:
+                    outbox.add(
+                        session, EventTypes.USERS_IMPORTED, inserted,
+                        exclude={"password"},
+                    )
+        except SQLAlchemyError as e:
+            logger.error(f"导入第 {chunk_report.chunk} 个用户分块失败: {str(e)}")
+            chunk_report.failed += written
+            chunk_report.updated = 0
+            self._add_error(
+                chunk_report,
+                chunk_report.first_line,
+                f"chunk rolled back: {str(getattr(e, 'orig', e))}",
+            )
+            return chunk_report
+
+        # NOTE: 并发写入同名用户时插入会被忽略，计入跳过
+        chunk_report.inserted = len(inserted)
+        chunk_report.skipped += len(rows) - len(inserted)
+        if inserted:
+            event_bus.publish(EventTypes.USERS_IMPORTED, inserted)
+        return chunk_report
+
+    def _insert(
+        self, session: Session, rows: List[Dict[str, Any]]
+    ) -> List[User]:
+        if not rows:
+            return []
+        table = User.__table__
+        dialect = self.engine.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            # 用户名有唯一索引，冲突的行直接忽略，不回滚整个分块
+            dialect_insert = (
+                postgresql.insert if dialect == "postgresql" else sqlite.insert
+            )
+            statement = dialect_insert(table).on_conflict_do_nothing(
+                index_elements=["username"]
+            )
+        else:
+            statement = insert(table)
+        returned = session.execute(
+            statement.returning(table.c.id, table.c.username), rows
+        ).all()
+        by_username = {row["username"]: row for row in rows}
+        return [
+            User(id=user_id, **by_username[username])
+            for user_id, username in returned
+        ]
+
+    @staticmethod
+    def _update_existing(
+        session: Session, updates: List[Dict[str, Any]]
+    ) -> None:
+        if not updates:
+            return
+        # 参数中与列同名的键（password, superuser, disabled）作为SET的值
+        table = User.__table__
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("user_id"))
+            .values(
+                version=table.c.version + 1, updated_at=datetime.utcnow()
+            ),
+            updates,
+        )
+
+    @staticmethod
+    def _add_error(report: ImportChunkReport, line: int, error: str) -> None:
+        if len(report.errors) < MAX_ERRORS_PER_CHUNK:
+            report.errors.append(ImportRowError(line=line, error=error))
@@ -0,0 +1,363 @@
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, and_, cast, func, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventBus, EventTypes, event_bus
+from fastapi_template.db import engine
+from fastapi_template.models.security import User, UserSearchHit
+from fastapi_template.utils.pagination import (
+    CursorPage, decode_cursor, encode_cursor, paginate_keyset
+)
+
+logger = logging.getLogger(__name__)
+
+MODE_PREFIX = "prefix"
+MODE_SUBSTRING = "substring"
+MODES = (MODE_PREFIX, MODE_SUBSTRING)
+
+# 相似度放大为整数后用于排序和游标，避免浮点数比较误差
+SCORE_SCALE = 1000
+
+
+def trigrams(value: str) -> Set[str]:
+    """
+    计算字符串的三元组，规则与 pg_trgm 一致：转为小写，前补两个空格、后补一个空格
+
+    参数:
+        value: 字符串
+
+    返回:
+        Set[str]: 三元组集合
+    """
+    padded = f"  {value.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """三元组相似度（交集/并集），与 pg_trgm 的 similarity() 一致"""
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    计算以 prefix 开头的字符串的上界（不含）
+
+    参数:
+        prefix: 前缀
+
+    返回:
+        Optional[str]: 上界；前缀全部由最大码位组成时没有上界，返回None
+    """
+    # 末尾的最大码位无法再加一，去掉后对前一个字符进位
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    code = ord(stripped[-1]) + 1
+    # 跳过代理区，单独的代理码位无法编码为 UTF-8
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return stripped[:-1] + chr(code)
+
+
+def username_prefix(prefix: str):
+    """
+    用户名前缀条件
+
+    范围条件走用户名索引；LIKE 复核，防止排序规则与字节序不一致
+
+    参数:
+        prefix: 前缀
+
+    返回:
+        用于 where() 的条件表达式
+    """
+    conditions = [
+        User.username >= prefix,
+        User.username.like(f"{_escape_like(prefix)}%", escape="\\"),
+    ]
+    upper = prefix_upper_bound(prefix)
+    if upper is not None:
+        conditions.append(User.username < upper)
+    return and_(*conditions)
+
+
+# MARK: n-gram索引
+"""
+进程内用户名 n-gram 倒排索引
+- SQLite 没有三元组索引，子串搜索使用此索引作为回退
+- 三元组 → 用户ID集合，查询时取各三元组集合的交集作为候选，再校验子串
+- 查询短于3个字符时无法使用三元组，直接扫描内存中的用户名
+"""
+class NgramIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, user_id: int, username: str) -> None:
+        """添加或更新用户名"""
+        with self._lock:
+            self._remove(user_id)
+            self._names[user_id] = username
+            for gram in trigrams(username):
+                self._postings.setdefault(gram, set()).add(user_id)
+
+    def remove(self, user_id: int) -> None:
+        """删除用户"""
+        with self._lock:
+            self._remove(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        username = self._names.pop(user_id, None)
+        if username is None:
+            return
+        for gram in trigrams(username):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def rebuild(self, users: Iterable[Tuple[int, str]]) -> None:
+        """用全部用户重建索引"""
+        with self._lock:
+            self._postings.clear()
+            self._names.clear()
+        for user_id, username in users:
+            self.add(user_id, username)
+
+    def search(self, query: str) -> List[Tuple[int, int]]:
+        """
+        子串搜索
+
+        参数:
+            query: 搜索词，不区分大小写
+
+        返回:
+            List[Tuple[int, int]]: (分数, 用户ID)，按分数和ID降序
+        """
+        needle = query.lower()
+        with self._lock:
+            # 子串的三元组（不含补位）必然出现在用户名的三元组中
+            grams = {needle[i:i + 3] for i in range(len(needle) - 2)}
+            if grams:
+                postings = sorted(
+                    (self._postings.get(gram, set()) for gram in grams),
+                    key=len,
+                )
+                candidates = set(postings[0]).intersection(*postings[1:])
+            else:
+                candidates = set(self._names)
+            names = {
+                user_id: self._names[user_id] for user_id in candidates
+            }
+
+        hits = [
+            (int(similarity(username, query) * SCORE_SCALE), user_id)
+            for user_id, username in names.items()
+            if needle in username.lower()
+        ]
+        hits.sort(reverse=True)
+        return hits
+
+
+# MARK: 用户名搜索服务
+"""
+用户名搜索服务
+- 前缀搜索：按用户名唯一索引做范围查询，短用户名（越接近完全匹配）排在前面
+- 子串搜索：Postgres 使用 pg_trgm 三元组GIN索引并按相似度排序；
+  其他数据库使用进程内 n-gram 索引
+- 结果使用游标分页
+"""
+class UserSearchService:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.ngram_index = NgramIndex()
+        self._built_at: Optional[float] = None
+        self._build_lock = threading.Lock()
+
+    @property
+    def use_trigram(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def create_index(self) -> None:
+        """在 Postgres 上创建 pg_trgm 扩展和三元组索引"""
+        if not self.use_trigram:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_user_username_trgm "
+                    'ON "user" USING gin (username gin_trgm_ops)'
+                ))
+        except Exception as e:
+            logger.error(f"创建用户名三元组索引失败: {str(e)}")
+
+    # MARK: 搜索
+    def search(
+        self,
+        session: Session,
+        query: str,
+        mode: str = MODE_PREFIX,
+        cursor: Optional[str] = None,
+        size: int = 10,
+    ) -> CursorPage[UserSearchHit]:
+        """
+        搜索用户名
+
+        参数:
+            session: 数据库会话
+            query: 搜索词
+            mode: prefix（前缀）或 substring（子串）
+            cursor: 上一页返回的游标
+            size: 每页大小
+
+        返回:
+            CursorPage[UserSearchHit]: 匹配的用户（prefix 按用户名，substring 按相关度排序）
+
+        异常:
+            ValueError: 搜索模式或游标无效
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+        if mode == MODE_PREFIX:
+            return self._prefix_search(session, query, cursor, size)
+        if self.use_trigram:
+            return self._trigram_search(session, query, cursor, size)
+        return self._ngram_search(session, query, cursor, size)
+
+    @staticmethod
+    def _columns():
+        return (User.id, User.username, User.disabled, User.superuser)
+
+    def _prefix_search(
+        self, session: Session, query: str, cursor: Optional[str], size: int
+    ) -> CursorPage[UserSearchHit]:
+        # 只按用户名排序，直接沿索引顺序读取，无需对整个前缀范围排序
+        statement = select(*self._columns()).where(username_prefix(query))
+        page = paginate_keyset(
+            session,
+            statement,
+            [User.username],
+            cursor=cursor,
+            size=size,
+            descending=False,
+        )
+        page.items = [
+            UserSearchHit(
+                id=row.id,
+                username=row.username,
+                disabled=row.disabled,
+                superuser=row.superuser,
+                score=SCORE_SCALE * len(query) // len(row.username),
+            )
+            for row in page.items
+        ]
+        return page
+
+    def _trigram_search(
+        self, session: Session, query: str, cursor: Optional[str], size: int
+    ) -> CursorPage[UserSearchHit]:
+        score = cast(
+            func.similarity(User.username, query) * SCORE_SCALE, Integer
+        ).label("score")
+        # ILIKE '%x%' 可以使用 gin_trgm_ops 索引
+        statement = select(*self._columns(), score).where(
+            User.username.ilike(f"%{_escape_like(query)}%", escape="\\")
+        )
+        page = paginate_keyset(
+            session, statement, [score, User.id], cursor=cursor, size=size
+        )
+        page.items = [
+            UserSearchHit(**row._mapping) for row in page.items
+        ]
+        return page
+
+    def _ngram_search(
+        self, session: Session, query: str, cursor: Optional[str], size: int
+    ) -> CursorPage[UserSearchHit]:
+        self._ensure_ngram_index(session)
+        hits = self.ngram_index.search(query)
+        if cursor:
+            after = tuple(decode_cursor(cursor, ("score", "id")))
+            hits = [hit for hit in hits if hit < after]
+
+        # 多取一行判断是否有下一页；用户信息从数据库读取，忽略已删除的用户
+        window = hits[:size + 1]
+        users = {
+            row.id: row
+            for row in session.exec(
+                select(*self._columns()).where(
+                    User.id.in_([user_id for _, user_id in window])
+                )
+            ).all()
+        }
+        items = [
+            UserSearchHit(**users[user_id]._mapping, score=score)
+            for score, user_id in window[:size]
+            if user_id in users
+        ]
+        has_next = len(window) > size
+        return CursorPage(
+            items=items,
+            size=size,
+            next_cursor=encode_cursor(window[size - 1]) if has_next else None,
+            has_next=has_next,
+        )
+
+    def _ensure_ngram_index(self, session: Session) -> None:
+        # 其他进程的修改不会发布到本进程，索引定期从数据库重建
+        with self._build_lock:
+            expired = (
+                self._built_at is None
+                or time.monotonic() - self._built_at
+                > settings.USER_SEARCH_INDEX_TTL
+            )
+            if not expired:
+                return
+            self.ngram_index.rebuild(
+                session.exec(select(User.id, User.username)).all()
+            )
+            self._built_at = time.monotonic()
+
+    # MARK: 事件订阅
+    def register_event_handlers(self, bus: EventBus = event_bus) -> None:
+        """订阅用户事件，增量更新 n-gram 索引"""
+        bus.subscribe(EventTypes.USER_CREATED, self._on_user_changed)
+        bus.subscribe(EventTypes.USER_UPDATED, self._on_user_changed)
+        bus.subscribe(EventTypes.USER_DELETED, self.ngram_index.remove)
+        bus.subscribe(EventTypes.USERS_IMPORTED, self._on_users_imported)
+
+    def _on_user_changed(self, user: User) -> None:
+        # 索引尚未构建时无需维护，首次搜索时会完整构建
+        if self._built_at is not None:
+            self.ngram_index.add(user.id, user.username)
+
+    def _on_users_imported(self, users: List[User]) -> None:
+        if self._built_at is not None:
+            for user in users:
+                self.ngram_index.add(user.id, user.username)
+
+
+# MARK: 创建单例实例
+user_search_service = UserSearchService(engine)
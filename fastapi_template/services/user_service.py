@@ -1,12 +1,27 @@
 import logging
-from typing import Optional, Union
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Sequence, Union
 
 from fastapi import HTTPException, status
+from sqlalchemy import func
 from sqlmodel import Session, select, or_
 
-from fastapi_template.models.security import User, UserCreate, UserResponse
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventTypes, event_bus
+from fastapi_template.core.outbox import outbox
+from fastapi_template.models.content import (
+    CONTENT_LIST_DEFAULT_FIELDS, Content, ContentListItem
+)
+from fastapi_template.models.security import (
+    USER_EXPANSIONS, User, UserCreate, UserResponse, UserSearchHit
+)
 from fastapi_template.security import get_password_hash
-from fastapi_template.utils.pagination import PaginatedResponse, paginate
+from fastapi_template.services.user_search_service import (
+    user_search_service, username_prefix
+)
+from fastapi_template.utils.pagination import (
+    CursorPage, PaginatedResponse, paginate, table_count
+)
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +93,9 @@ class UserService:
         size: int = 10,
         username_filter: Optional[str] = None,
         superuser_filter: Optional[bool] = None,
-        disabled_filter: Optional[bool] = None
+        disabled_filter: Optional[bool] = None,
+        with_total: bool = True,
+        expand: Collection[str] = ()
     ) -> PaginatedResponse[UserResponse]:
         """
         获取用户列表
@@ -86,9 +103,11 @@ class UserService:
         参数:
             page: 页码
             size: 每页大小
-            username_filter: 用户名过滤
+            username_filter: 用户名前缀过滤
             superuser_filter: 超级用户过滤
             disabled_filter: 禁用状态过滤
+            with_total: 是否计算总数，不计算时只返回是否有下一页
+            expand: 需要展开的关联，目前支持 contents
             
         返回:
             PaginatedResponse[UserResponse]: 分页用户列表
@@ -97,7 +116,8 @@ class UserService:
         
         # MARK: 应用过滤器
         if username_filter:
-            query = query.where(User.username.contains(username_filter))
+            # 前缀匹配走用户名索引，子串搜索请使用 search_users
+            query = query.where(username_prefix(username_filter))
             
         if superuser_filter is not None:
             query = query.where(User.superuser == superuser_filter)
@@ -106,9 +126,163 @@ class UserService:
             query = query.where(User.disabled == disabled_filter)
             
         # MARK: 应用分页
-        return paginate(self.session, query, page, size)
+        # NOTE: 未过滤时使用缓存的表总数（大表为估算值），避免每页都COUNT
+        unfiltered = (
+            not username_filter
+            and superuser_filter is None
+            and disabled_filter is None
+        )
+        count = (
+            (lambda: table_count(self.session, User)) if unfiltered else None
+        )
+        result = paginate(
+            self.session,
+            query.order_by(User.id),
+            page,
+            size,
+            with_total=with_total,
+            count=count,
+        )
+        result.items = self.to_responses(result.items, expand)
+        return result
+
+    # MARK: toResponses
+    # 构建用户响应，按需展开关联
+    def to_responses(
+        self, users: Sequence[User], expand: Collection[str] = ()
+    ) -> List[UserResponse]:
+        """
+        构建用户响应，不访问 User.contents 关系，避免逐个用户懒加载
+        
+        参数:
+            users: 用户列表
+            expand: 需要展开的关联，目前支持 contents
+            
+        返回:
+            List[UserResponse]: 用户响应列表
+        """
+        if "contents" not in expand:
+            return [UserResponse.from_user(user) for user in users]
+        contents = self.load_contents([user.id for user in users])
+        return [
+            UserResponse.from_user(user, contents.get(user.id, []))
+            for user in users
+        ]
+
+    def to_response(
+        self, user: User, expand: Collection[str] = ()
+    ) -> UserResponse:
+        """构建单个用户的响应"""
+        return self.to_responses([user], expand)[0]
+
+    # MARK: loadContents
+    # 批量加载用户的内容
+    def load_contents(
+        self, user_ids: Sequence[int], limit: Optional[int] = None
+    ) -> Dict[int, List[ContentListItem]]:
+        """
+        一次查询加载一批用户的最新内容
+        
+        参数:
+            user_ids: 用户ID列表
+            limit: 每个用户最多加载的内容数，默认 USER_EXPAND_CONTENTS_LIMIT
+            
+        返回:
+            Dict[int, List[ContentListItem]]: 用户ID → 内容列表项（不含正文）
+        """
+        if not user_ids:
+            return {}
+        if limit is None:
+            limit = settings.USER_EXPAND_CONTENTS_LIMIT
+
+        # NOTE: 与 selectinload 一样使用 IN 批量加载，但 selectinload
+        # 无法限制每个父对象的条数，这里用窗口函数按用户截断
+        columns = [
+            getattr(Content, name) for name in CONTENT_LIST_DEFAULT_FIELDS
+        ]
+        rank = func.row_number().over(
+            partition_by=Content.user_id,
+            order_by=(Content.created_time.desc(), Content.id.desc()),
+        ).label("rank")
+        ranked = (
+            select(*columns, rank)
+            .where(Content.user_id.in_(user_ids))
+            .subquery()
+        )
+        rows = self.session.exec(
+            select(*(ranked.c[name] for name in CONTENT_LIST_DEFAULT_FIELDS))
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.user_id, ranked.c.rank)
+        ).all()
+
+        contents: Dict[int, List[ContentListItem]] = {}
+        for row in rows:
+            contents.setdefault(row.user_id, []).append(
+                ContentListItem(**row._mapping)
+            )
+        return contents
+
+    # MARK: parseExpand
+    # 解析 expand 参数
+    @staticmethod
+    def parse_expand(expand: Optional[str]) -> List[str]:
+        """
+        解析 expand 参数
         
+        参数:
+            expand: 逗号分隔的关联名称
+            
+        返回:
+            List[str]: 需要展开的关联
+            
+        异常:
+            HTTPException: 包含不支持的关联
+        """
+        if not expand:
+            return []
+        names = [name.strip() for name in expand.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(USER_EXPANSIONS))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown expansions: {', '.join(unknown)}"
+            )
+        return names
+
 
+    # MARK: searchUsers
+    # 搜索用户名
+    def search_users(
+        self,
+        query: str,
+        mode: str = "prefix",
+        cursor: Optional[str] = None,
+        size: int = 10
+    ) -> CursorPage[UserSearchHit]:
+        """
+        按用户名搜索用户，替代 list_users 的 LIKE '%x%' 过滤
+        
+        参数:
+            query: 搜索词
+            mode: prefix（前缀，走用户名索引）或 substring（子串，走三元组索引）
+            cursor: 上一页返回的游标
+            size: 每页大小
+            
+        返回:
+            CursorPage[UserSearchHit]: 匹配的用户（prefix 按用户名，substring 按相关度排序）
+            
+        异常:
+            HTTPException: 搜索模式或游标无效
+        """
+        try:
+            return user_search_service.search(
+                self.session, query, mode=mode, cursor=cursor, size=size
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
 
     # MARK: createUser
@@ -143,8 +317,13 @@ class UserService:
         )
         
         self.session.add(db_user)
+        outbox.add(
+            self.session, EventTypes.USER_CREATED, db_user,
+            exclude={"password"},
+        )
         self.session.commit()
         self.session.refresh(db_user)
+        event_bus.publish(EventTypes.USER_CREATED, db_user)
         
         return db_user
         
@@ -199,9 +378,18 @@ class UserService:
             
         if disabled is not None:
             user.disabled = disabled
+
+        # NOTE: 更新行版本，使个人资料的ETag失效
+        user.version += 1
+        user.updated_at = datetime.utcnow()
+        outbox.add(
+            self.session, EventTypes.USER_UPDATED, user,
+            exclude={"password"},
+        )
             
         self.session.commit()
         self.session.refresh(user)
+        event_bus.publish(EventTypes.USER_UPDATED, user)
         
         return user
         
@@ -232,6 +420,8 @@ class UserService:
             
         # NOTE: 更新密码
         user.password = get_password_hash(password)
+        user.version += 1
+        user.updated_at = datetime.utcnow()
         
         self.session.commit()
         self.session.refresh(user)
@@ -265,6 +455,8 @@ class UserService:
             
         # NOTE: 删除用户
         self.session.delete(user)
+        outbox.add(self.session, EventTypes.USER_DELETED, user_id)
         self.session.commit()
+        event_bus.publish(EventTypes.USER_DELETED, user_id)
         
         return True 
\ No newline at end of file
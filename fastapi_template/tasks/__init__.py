@@ -18,4 +18,17 @@ def send_email_task(
         subject=subject,
         body=body,
         html=html
-    )
\ No newline at end of file
+    )
+
+@celery_app.task
+def dispatch_event_task(handler: str, data) -> None:
+    """处理事件总线溢出的事件，handler 为 模块:名称"""
+    from fastapi_template.core.events import resolve_handler
+    resolve_handler(handler)(data)
+
+
+@celery_app.task
+def dispatch_outbox_task(messages: list) -> None:
+    """在 worker 进程中把发件箱事件发布到 outbox_bus"""
+    from fastapi_template.core.outbox import event_bus_sink
+    event_bus_sink(messages)
@@ -1,13 +1,29 @@
 from fastapi_template.utils.pagination import (
-    PaginatedResponse, paginate, paginate_list
+    CursorPage, PaginatedResponse, clear_count_cache, paginate,
+    paginate_keyset, paginate_list, table_count
 )
+from fastapi_template.utils.slug import next_slug, slugify
+from fastapi_template.utils.dataloader import DataLoader, by_group, by_key
 
 
 # MARK: 导出
 # 分页
 # 分页列表
+# 游标分页
+# 表总数
+# slug生成
+# 批量加载器
 __all__ = [
     "PaginatedResponse", 
     "paginate", 
-    "paginate_list"
+    "paginate_list",
+    "CursorPage",
+    "paginate_keyset",
+    "table_count",
+    "clear_count_cache",
+    "next_slug",
+    "slugify",
+    "DataLoader",
+    "by_key",
+    "by_group"
 ] 
\ No newline at end of file
@@ -0,0 +1,165 @@
+import asyncio
+from typing import (
+    Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional,
+    Sequence, Type, TypeVar
+)
+
+from sqlmodel import Session, SQLModel, select
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 批量加载函数：接收去重后的键列表，返回 键 → 值，缺失的键视为不存在
+BatchLoad = Callable[[List[K]], Dict[K, V]]
+
+# 单次 IN 查询的最大键数，避免超出数据库参数个数限制
+MAX_BATCH_SIZE = 500
+
+
+# MARK: 批量加载器
+"""
+批量加载器（DataLoader 模式）
+- 同一事件循环轮次中的 load(key) 合并为一次批量查询
+- 结果在加载器内缓存，同一请求中重复加载同一个键不会再查询
+- 不存在的键缓存为 None，避免重复查询
+- 同步代码使用 get / get_many，立即查询缓存中缺失的键
+- 加载器不做失效，只应在一个请求内使用
+"""
+class DataLoader(Generic[K, V]):
+    def __init__(
+        self, batch_load: BatchLoad, max_batch_size: int = MAX_BATCH_SIZE
+    ):
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._values: Dict[K, Optional[V]] = {}
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._scheduled = False
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._values
+
+    # MARK: 异步加载
+    async def load(self, key: K) -> Optional[V]:
+        """
+        加载一个键，与同一轮次中的其他 load 合并查询
+
+        参数:
+            key: 键
+
+        返回:
+            Optional[V]: 值，不存在时返回None
+        """
+        if key in self._values:
+            return self._values[key]
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if not self._scheduled:
+                # 等到当前轮次所有协程都调用了 load 之后再查询
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """加载多个键，按输入顺序返回"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        try:
+            self._fetch(list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(self._values.get(key))
+
+    # MARK: 同步加载
+    def get(self, key: K) -> Optional[V]:
+        """同步加载一个键"""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """
+        同步加载多个键，缓存中缺失的键用一次批量查询加载
+
+        参数:
+            keys: 键
+
+        返回:
+            List[Optional[V]]: 按输入顺序的值，不存在的为None
+        """
+        keys = list(keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in self]
+        if missing:
+            self._fetch(missing)
+            # 同时满足等待中的异步 load
+            for key in missing:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(self._values.get(key))
+        return [self._values.get(key) for key in keys]
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """写入已知的值，例如刚创建或已查询到的实体"""
+        self._values.setdefault(key, value)
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """清除一个键或全部缓存"""
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+    def _fetch(self, keys: List[K]) -> None:
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = keys[start:start + self.max_batch_size]
+            values = self.batch_load(batch)
+            for key in batch:
+                self._values[key] = values.get(key)
+
+
+# MARK: 批量加载函数
+"""
+批量加载函数
+- by_key：按主键或唯一列加载实体，一次 WHERE key IN (...) 查询
+- by_group：按外键加载一对多关联（例如评论的回复），返回列表，
+  没有关联的键返回空列表
+- 查询结果进入会话的标识映射，与 session.get 返回的对象相同
+"""
+def by_key(
+    session: Session, model: Type[SQLModel], column: str = "id"
+) -> BatchLoad:
+    def batch_load(keys: List[Any]) -> Dict[Any, SQLModel]:
+        attribute = getattr(model, column)
+        rows = session.exec(select(model).where(attribute.in_(keys))).all()
+        return {getattr(row, column): row for row in rows}
+
+    return batch_load
+
+
+def by_group(
+    session: Session,
+    model: Type[SQLModel],
+    column: str,
+    order_by: Sequence = (),
+) -> BatchLoad:
+    def batch_load(keys: List[Any]) -> Dict[Any, List[SQLModel]]:
+        attribute = getattr(model, column)
+        rows = session.exec(
+            select(model)
+            .where(attribute.in_(keys))
+            .order_by(*(order_by or (model.id,)))
+        ).all()
+        groups: Dict[Any, List[SQLModel]] = {key: [] for key in keys}
+        for row in rows:
+            groups[getattr(row, column)].append(row)
+        return groups
+
+    return batch_load
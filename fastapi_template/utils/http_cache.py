@@ -0,0 +1,152 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Request, Response
+
+
+# MARK: 校验值
+"""
+校验值生成
+- ETag 由资源类型、ID和行版本等少量字段计算，无需序列化响应体
+- Last-Modified 使用HTTP日期格式，精度为秒
+"""
+def make_etag(*parts: Any) -> str:
+    """
+    根据资源标识和版本生成强ETag
+
+    参数:
+        parts: 资源类型、ID、版本号等
+
+    返回:
+        str: 带引号的ETag
+    """
+    value = ":".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(value.encode()).hexdigest()[:20]}"'
+
+
+def http_date(value: datetime) -> str:
+    """将UTC时间格式化为HTTP日期，naive时间视为UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """解析HTTP日期，格式无效时返回None"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _etag_list(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _opaque(etag: str) -> str:
+    # 弱比较时忽略 W/ 前缀
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+# MARK: 条件请求
+"""
+条件请求
+- If-None-Match 优先于 If-Modified-Since（RFC 9110）
+- 条件满足时返回304，只带校验头，不序列化响应体
+- If-Match 不满足时返回412，用于更新接口的乐观并发控制
+"""
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    判断GET请求的条件是否表明客户端缓存仍然有效
+
+    参数:
+        request: 请求对象
+        etag: 当前ETag
+        last_modified: 当前最后修改时间
+
+    返回:
+        bool: 客户端缓存有效时返回True
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        return "*" in tags or _opaque(etag) in {_opaque(t) for t in tags}
+
+    since = parse_http_date(request.headers.get("if-modified-since"))
+    if since is None or last_modified is None:
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> None:
+    """在响应上设置 ETag 和 Last-Modified"""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    处理条件GET请求
+
+    参数:
+        request: 请求对象
+        response: 路由注入的响应对象，用于设置校验头
+        etag: 当前ETag
+        last_modified: 当前最后修改时间
+
+    返回:
+        Optional[Response]: 条件满足时返回304响应，否则返回None并在
+        response 上设置校验头
+    """
+    set_validators(response, etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        not_modified = Response(status_code=304)
+        set_validators(not_modified, etag, last_modified)
+        return not_modified
+    return None
+
+
+def require_if_match(request: Request, etag: str) -> None:
+    """
+    校验 If-Match 请求头
+
+    参数:
+        request: 请求对象
+        etag: 资源当前ETag
+
+    异常:
+        HTTPException: If-Match 与当前ETag不匹配时返回412
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    # If-Match 使用强比较，弱ETag永远不匹配
+    tags = _etag_list(if_match)
+    if "*" in tags or etag in tags:
+        return
+    raise HTTPException(
+        status_code=412,
+        detail="Resource has been modified",
+        headers={"ETag": etag},
+    )
@@ -1,7 +1,18 @@
-from typing import Generic, List, Optional, TypeVar
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from typing import (
+    Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type,
+    TypeVar
+)
 from pydantic import BaseModel
+from sqlalchemy import func, text, tuple_
 from sqlmodel import Session, SQLModel, select
 
+from fastapi_template.core.config import settings
+
 T = TypeVar('T')
 
 # MARK: 分页响应模型
@@ -12,10 +23,11 @@ T = TypeVar('T')
 """
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    # with_total=False 时不计算总数，total 和 pages 为 None
+    total: Optional[int]
     page: int
     size: int
-    pages: int
+    pages: Optional[int]
     has_next: bool
     has_prev: bool
 
@@ -24,13 +36,18 @@ class PaginatedResponse(BaseModel, Generic[T]):
 """
 分页查询函数
 - 对SQLModel查询结果进行分页
+- 总数基于已应用过滤条件的查询计算
+- with_total=False 时不执行COUNT，多取一行判断是否有下一页
+- 可传入 count 函数替代COUNT，例如未过滤列表使用 table_count
 - 返回分页响应对象
 """
 def paginate(
     session: Session, 
     query, 
     page: int = 1, 
-    size: int = 10
+    size: int = 10,
+    with_total: bool = True,
+    count: Optional[Callable[[], int]] = None,
 ) -> PaginatedResponse:
     """
     对查询结果进行分页
@@ -40,6 +57,8 @@ def paginate(
         query: SQLModel查询对象
         page: 页码，从1开始
         size: 每页大小
+        with_total: 是否计算总数
+        count: 计算总数的函数，默认对查询执行COUNT
         
     返回:
         PaginatedResponse: 分页响应对象
@@ -49,9 +68,29 @@ def paginate(
         page = 1
     if size < 1:
         size = 10
+
+    if not with_total:
+        # 多取一行判断是否有下一页
+        rows = session.exec(
+            query.offset((page - 1) * size).limit(size + 1)
+        ).all()
+        return PaginatedResponse(
+            items=rows[:size],
+            total=None,
+            page=page,
+            size=size,
+            pages=None,
+            has_next=len(rows) > size,
+            has_prev=page > 1
+        )
         
-    # 计算总数
-    total = session.exec(select(query.original._raw_columns[0].count())).one()
+    # 计算总数，基于已应用过滤条件的子查询，去掉排序
+    if count is not None:
+        total = count()
+    else:
+        total = session.exec(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).one()
     
     # 计算总页数
     pages = (total + size - 1) // size
@@ -73,6 +112,71 @@ def paginate(
     )
 
 
+# MARK: 表总数
+"""
+未过滤列表的总数
+- 结果在进程内缓存 PAGINATION_COUNT_TTL 秒，翻页时不重复COUNT
+- Postgres 上行数估算值超过 PAGINATION_ESTIMATE_THRESHOLD 时直接使用
+  pg_class.reltuples（由 VACUUM/ANALYZE 维护），避免全表扫描
+- 只适用于没有过滤条件的列表，过滤后的总数仍需精确计算
+"""
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_count_lock = threading.Lock()
+
+
+def table_count(
+    session: Session, model: Type[SQLModel], ttl: Optional[int] = None
+) -> int:
+    """
+    获取表的总行数（可能为估算值）
+
+    参数:
+        session: 数据库会话
+        model: 数据模型
+        ttl: 缓存时间（秒），默认 PAGINATION_COUNT_TTL
+
+    返回:
+        int: 行数
+    """
+    bind = session.get_bind()
+    table = model.__table__
+    key = (bind.url.render_as_string(hide_password=True), table.name)
+    if ttl is None:
+        ttl = settings.PAGINATION_COUNT_TTL
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+
+    total = _estimated_count(session, table.name)
+    if total is None:
+        total = session.exec(select(func.count()).select_from(table)).one()
+
+    with _count_lock:
+        _count_cache[key] = (now, total)
+    return total
+
+
+def _estimated_count(session: Session, table_name: str) -> Optional[int]:
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    # 从未 ANALYZE 的表 reltuples 为 -1，小表精确计算也足够便宜
+    estimate = session.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    ).scalar()
+    if estimate is None or estimate < settings.PAGINATION_ESTIMATE_THRESHOLD:
+        return None
+    return int(estimate)
+
+
+def clear_count_cache() -> None:
+    """清空表总数缓存"""
+    with _count_lock:
+        _count_cache.clear()
+
+
 # MARK: 简单分页
 """
 简单分页函数
@@ -121,4 +225,128 @@ def paginate_list(
         pages=pages,
         has_next=page < pages,
         has_prev=page > 1
-    ) 
\ No newline at end of file
+    ) 
+
+# MARK: 游标分页响应模型
+"""
+游标分页响应模型
+- 不返回总数和页码，只返回下一页游标
+- 适用于按索引顺序翻页的大表，翻页深度不影响查询成本
+"""
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    size: int
+    next_cursor: Optional[str] = None
+    has_next: bool
+
+
+# MARK: 游标编解码
+"""
+游标编解码
+- 游标为排序键值的JSON，经过URL安全的base64编码
+- 时间类型编码为ISO字符串，解码时按列类型还原
+"""
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将排序键值编码为游标"""
+    data = json.dumps([
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    将游标解码为排序键值
+
+    参数:
+        cursor: 游标
+        columns: 排序列，用于还原值的类型；内存分页时可传入列名
+
+    返回:
+        List[Any]: 排序键值
+
+    异常:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [
+        datetime.fromisoformat(value)
+        if isinstance(value, str) and _is_datetime(column) else value
+        for value, column in zip(values, columns)
+    ]
+
+
+def _is_datetime(column) -> bool:
+    # 内存分页时 columns 只是占位名称，没有类型
+    try:
+        return column.type.python_type is datetime
+    except (AttributeError, NotImplementedError):
+        return False
+
+
+# MARK: 键集分页
+"""
+键集分页函数
+- 按排序列的行值比较定位下一页，配合排序列上的组合索引走索引范围扫描
+- 多取一行判断是否有下一页，不执行COUNT
+"""
+def paginate_keyset(
+    session: Session,
+    query,
+    columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    size: int = 10,
+    descending: bool = True,
+) -> CursorPage:
+    """
+    对查询结果进行键集分页
+
+    参数:
+        session: 数据库会话
+        query: SQLModel查询对象，不需要排序
+        columns: 排序列，最后一列必须唯一（通常为主键）
+        cursor: 上一页返回的游标
+        size: 每页大小
+        descending: 是否降序
+
+    返回:
+        CursorPage: 游标分页响应对象
+
+    异常:
+        ValueError: 游标格式无效
+    """
+    if size < 1:
+        size = 10
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.where(
+            key < tuple_(*values) if descending else key > tuple_(*values)
+        )
+
+    order = [column.desc() if descending else column for column in columns]
+    rows = session.exec(query.order_by(*order).limit(size + 1)).all()
+
+    has_next = len(rows) > size
+    items = rows[:size]
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+
+    return CursorPage(
+        items=items,
+        size=size,
+        next_cursor=next_cursor,
+        has_next=has_next,
+    )
@@ -0,0 +1,32 @@
+from typing import Iterable
+
+
+# MARK: slug生成
+"""
+slug生成函数
+- 根据标题生成slug
+- slug冲突时追加最小可用的数字后缀，例如 hello、hello-2、hello-3
+"""
+def slugify(title: str) -> str:
+    """根据标题生成基础slug"""
+    return title.lower().replace(" ", "-")
+
+
+def next_slug(base: str, taken: Iterable[str]) -> str:
+    """
+    生成不冲突的slug
+
+    参数:
+        base: 基础slug
+        taken: 已被占用的slug
+
+    返回:
+        str: base 未被占用时返回 base，否则追加数字后缀
+    """
+    taken = set(taken)
+    if base not in taken:
+        return base
+    suffix = 2
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    return f"{base}-{suffix}"
@@ -0,0 +1,58 @@
+"""Add full-text search index
+
+Revision ID: 5b2e8c1f4a7d
+Revises: 3d177db82830
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c1f4a7d'
+down_revision: Union[str, None] = '3d177db82830'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, tags, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif dialect == "postgresql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "kind VARCHAR(16) NOT NULL, "
+            "ref_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL DEFAULT '', "
+            "body TEXT NOT NULL DEFAULT '', "
+            "tags TEXT NOT NULL DEFAULT '', "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', tags), 'B') || "
+            "setweight(to_tsvector('simple', body), 'C')"
+            ") STORED, "
+            "PRIMARY KEY (kind, ref_id))"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_search_document_document "
+            "ON search_document USING GIN (document)"
+        )
+    # NOTE: 迁移只创建索引结构，已有数据请执行 `fastapi reindex-search` 回填
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_index")
+    elif dialect == "postgresql":
+        op.execute("DROP TABLE IF EXISTS search_document")
@@ -0,0 +1,60 @@
+"""Add unique index on content slug
+
+Revision ID: 8c4d2a6e9b13
+Revises: 5b2e8c1f4a7d
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from fastapi_template.utils.slug import next_slug, slugify
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2a6e9b13'
+down_revision: Union[str, None] = '5b2e8c1f4a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("content"):
+        return
+    # 新建的表已经由 create_all 带上了索引
+    indexes = {index["name"] for index in inspector.get_indexes("content")}
+    if "ix_content_slug" in indexes:
+        return
+
+    # NOTE: 建唯一索引前先给重复或为空的slug追加数字后缀，保留最早的一条
+    rows = bind.execute(
+        sa.text("SELECT id, slug, title FROM content ORDER BY id")
+    ).all()
+    taken = {slug for _, slug, _ in rows if slug}
+    seen = set()
+    for content_id, slug, title in rows:
+        if slug and slug not in seen:
+            seen.add(slug)
+            continue
+        base = slug or slugify(title)
+        new_slug = next_slug(base, taken)
+        taken.add(new_slug)
+        seen.add(new_slug)
+        bind.execute(
+            sa.text("UPDATE content SET slug = :slug WHERE id = :id"),
+            {"slug": new_slug, "id": content_id},
+        )
+
+    op.create_index("ix_content_slug", "content", ["slug"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("content"):
+        op.drop_index("ix_content_slug", table_name="content")
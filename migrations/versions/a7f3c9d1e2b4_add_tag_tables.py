@@ -0,0 +1,120 @@
+"""Add normalized tag tables
+
+Revision ID: a7f3c9d1e2b4
+Revises: 8c4d2a6e9b13
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f3c9d1e2b4'
+down_revision: Union[str, None] = '8c4d2a6e9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 回填时每批读取的内容行数
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("tag"):
+        op.create_table(
+            "tag",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+        )
+        op.create_index("ix_tag_name", "tag", ["name"], unique=True)
+    if not inspector.has_table("content_tag"):
+        op.create_table(
+            "content_tag",
+            sa.Column(
+                "content_id",
+                sa.Integer(),
+                sa.ForeignKey("content.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column(
+                "tag_id",
+                sa.Integer(),
+                sa.ForeignKey("tag.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+        )
+        op.create_index(
+            "ix_content_tag_tag_id_content_id",
+            "content_tag",
+            ["tag_id", "content_id"],
+        )
+    if inspector.has_table("content"):
+        backfill(bind)
+
+
+def backfill(bind) -> None:
+    """按主键分批把 content.tags 字符串回填到标签表和关联表"""
+    tag_ids = dict(bind.execute(sa.text("SELECT name, id FROM tag")).all())
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, tags FROM content WHERE id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+
+        names = {
+            content_id: list(dict.fromkeys(
+                tag.strip().lower()
+                for tag in (tags or "").split(",")
+                if tag.strip()
+            ))
+            for content_id, tags in rows
+        }
+        for name in {n for ns in names.values() for n in ns} - set(tag_ids):
+            bind.execute(
+                sa.text("INSERT INTO tag (name) VALUES (:name)"),
+                {"name": name},
+            )
+            tag_ids[name] = bind.execute(
+                sa.text("SELECT id FROM tag WHERE name = :name"),
+                {"name": name},
+            ).scalar_one()
+
+        links = [
+            {"content_id": content_id, "tag_id": tag_ids[name]}
+            for content_id, content_names in names.items()
+            for name in content_names
+        ]
+        if links:
+            bind.execute(
+                sa.text(
+                    "DELETE FROM content_tag WHERE content_id "
+                    "BETWEEN :first_id AND :last_id"
+                ),
+                {"first_id": rows[0][0], "last_id": last_id},
+            )
+            bind.execute(
+                sa.text(
+                    "INSERT INTO content_tag (content_id, tag_id) "
+                    "VALUES (:content_id, :tag_id)"
+                ),
+                links,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # NOTE: content.tags 字符串一直保留，降级只需删除标签表
+    op.drop_table("content_tag")
+    op.drop_table("tag")
@@ -0,0 +1,57 @@
+"""Add row version and updated_at to content and user
+
+Revision ID: c1e5b7a3f8d2
+Revises: a7f3c9d1e2b4
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e5b7a3f8d2'
+down_revision: Union[str, None] = 'a7f3c9d1e2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("content", "user")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" in columns:
+            continue
+        # NOTE: SQLite 不支持以非常量默认值添加列，先加可空列再回填
+        op.add_column(
+            table,
+            sa.Column(
+                "version", sa.Integer(), nullable=False, server_default="1"
+            ),
+        )
+        op.add_column(table, sa.Column("updated_at", sa.DateTime()))
+        op.execute(
+            sa.table(table, sa.column("updated_at"))
+            .update()
+            .values(updated_at=sa.func.current_timestamp())
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "updated_at", existing_type=sa.DateTime(), nullable=False
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
+            batch_op.drop_column("version")
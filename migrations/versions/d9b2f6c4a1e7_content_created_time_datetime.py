@@ -0,0 +1,115 @@
+"""Convert content.created_time to an indexed timezone-aware datetime
+
+Revision ID: d9b2f6c4a1e7
+Revises: c1e5b7a3f8d2
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b2f6c4a1e7'
+down_revision: Union[str, None] = 'c1e5b7a3f8d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 回填时每批转换的行数
+BATCH_SIZE = 1000
+
+
+def parse_created_time(value) -> datetime:
+    """解析旧的ISO字符串；原值由 datetime.now() 生成，无时区时按本机时区处理"""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.astimezone(timezone.utc)
+
+
+def backfill_created_time(bind) -> None:
+    """按主键分批把旧字符串转换到 created_time_new"""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, created_time FROM content "
+                "WHERE id > :last_id AND created_time_new IS NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        bind.execute(
+            sa.text(
+                "UPDATE content SET created_time_new = :created_time "
+                "WHERE id = :id"
+            ).bindparams(
+                sa.bindparam("created_time", type_=sa.DateTime(timezone=True))
+            ),
+            [
+                {"id": row_id, "created_time": parse_created_time(value)}
+                for row_id, value in rows
+            ],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("content"):
+        return
+    columns = {
+        column["name"]: column for column in inspector.get_columns("content")
+    }
+    if isinstance(columns["created_time"]["type"], sa.DateTime):
+        return
+
+    # 中断后重跑时新列已存在，只回填剩余的行
+    if "created_time_new" not in columns:
+        op.add_column(
+            "content",
+            sa.Column("created_time_new", sa.DateTime(timezone=True)),
+        )
+
+    # NOTE: 回填在 autocommit_block 中执行，先提交已完成的DDL，
+    # 每条UPDATE单独提交，不会与整个迁移共用一个长事务锁住整张表
+    with op.get_context().autocommit_block():
+        backfill_created_time(bind)
+
+    with op.batch_alter_table("content") as batch_op:
+        batch_op.drop_column("created_time")
+        batch_op.alter_column(
+            "created_time_new",
+            new_column_name="created_time",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+        )
+    op.create_index(
+        "ix_content_created_time_id", "content", ["created_time", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_content_created_time_id", table_name="content")
+    with op.batch_alter_table("content") as batch_op:
+        batch_op.alter_column(
+            "created_time",
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.String(),
+            postgresql_using="to_char(created_time, "
+            "'YYYY-MM-DD\"T\"HH24:MI:SS.US')",
+        )
@@ -0,0 +1,36 @@
+"""Add trigram index on user.username
+
+Revision ID: e4a8c2d6f0b9
+Revises: d9b2f6c4a1e7
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8c2d6f0b9'
+down_revision: Union[str, None] = 'd9b2f6c4a1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: 只有 Postgres 支持三元组索引，其他数据库使用进程内 n-gram 索引
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_user_username_trgm "
+        'ON "user" USING gin (username gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_user_username_trgm")
@@ -0,0 +1,46 @@
+"""Add outbox_event table
+
+Revision ID: f2c7a9e4b6d1
+Revises: e4a8c2d6f0b9
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7a9e4b6d1'
+down_revision: Union[str, None] = 'e4a8c2d6f0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("outbox_event"):
+        return
+    # NOTE: 中继读取 next_attempt_at 已到的事件，按主键顺序投递后删除
+    op.create_table(
+        "outbox_event",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "attempts", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.Column("last_error", sa.String(), nullable=True),
+    )
+    op.create_index(
+        "ix_outbox_event_next_attempt_at", "outbox_event", ["next_attempt_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_event_next_attempt_at", "outbox_event")
+    op.drop_table("outbox_event")
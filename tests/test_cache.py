@@ -0,0 +1,268 @@
+import asyncio
+import json
+import time
+
+from fastapi_template.core.cache import (
+    AsyncRedisCache, MemoryCache, RedisCache, TieredCache
+)
+
+
+class FakeRedis:
+    """Shared L2 with a publish log, standing in for a Redis client."""
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+
+class FakeRedisCache(MemoryCache):
+    def __init__(self):
+        super().__init__()
+        self.client = FakeRedis()
+        self.reads = 0
+        self.bulk_reads = 0
+
+    def get_raw(self, key):
+        self.reads += 1
+        return super().get_raw(key)
+
+    def get_raw_many(self, keys):
+        self.bulk_reads += 1
+        return super().get_raw_many(keys)
+
+
+def test_memory_cache_lru_bounds():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    # b 最久未使用，被淘汰
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    sized = MemoryCache(max_bytes=10)
+    sized.set("a", "xxxx")
+    sized.set("b", "yyyy")
+    # 每个值6个字符（含引号），两个超过上限，淘汰 a
+    assert sized.get("a") is None
+    assert sized.get("b") == "yyyy"
+    assert sized.size == 6
+    # 超过上限的单个值不缓存
+    assert sized.set("big", "z" * 20) is False
+    assert sized.get("big") is None
+
+
+def test_memory_cache_returns_copies():
+    cache = MemoryCache()
+    cache.set("k", {"items": [1]})
+    cache.get("k")["items"].append(2)
+    assert cache.get("k") == {"items": [1]}
+
+
+def test_tiered_cache_serves_hot_keys_from_l1():
+    l2 = FakeRedisCache()
+    tiered = TieredCache(l2, l1=MemoryCache(), l1_ttl=60)
+    l2.set("k", {"v": 1})
+
+    assert tiered.get("k") == {"v": 1}
+    assert tiered.get("k") == {"v": 1}
+    assert l2.reads == 1
+
+    tiered.set("k", {"v": 2})
+    assert tiered.get("k") == {"v": 2}
+    assert l2.reads == 1
+
+
+def test_tiered_cache_invalidation_between_workers():
+    l2 = FakeRedisCache()
+    worker_a = TieredCache(l2, l1=MemoryCache(), l1_ttl=60)
+    worker_b = TieredCache(l2, l1=MemoryCache(), l1_ttl=60)
+
+    worker_a.set("k", 1)
+    assert worker_b.get("k") == 1
+
+    worker_a.set("k", 2)
+    # 消息投递前 worker_b 仍读到L1中的旧值
+    assert worker_b.get("k") == 1
+    for _, message in l2.client.messages:
+        worker_a.handle_message(message)
+        worker_b.handle_message(message)
+    assert worker_b.get("k") == 2
+    # 自己发布的消息被忽略，L1保留
+    assert worker_a.l1.get("k") == 2
+
+    worker_b.handle_message(json.dumps({"origin": "x", "keys": None}))
+    assert len(worker_b.l1) == 0
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    async def setex(self, key, expire, value):
+        self.expires[key] = expire
+        return await self.set(key, value)
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+
+def test_async_redis_cache():
+    client = FakeAsyncRedis()
+    cache = AsyncRedisCache(client=client)
+
+    async def run():
+        await cache.set("k", {"v": [1, 2]}, expire=30)
+        assert await cache.get("k") == {"v": [1, 2]}
+        assert await cache.exists("k")
+        assert await cache.delete("k")
+        assert not await cache.delete("k")
+        assert await cache.get("k") is None
+
+    asyncio.run(run())
+    assert client.expires == {cache.key("k"): 30}
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        self.client.round_trips += 1
+        results = []
+        for name, args in self.commands:
+            if name == "mget":
+                results.append([self.client.data.get(k) for k in args[0]])
+            elif name == "setex":
+                key, ttl, value = args
+                self.client.data[key] = value
+                self.client.expires[key] = ttl
+                results.append(True)
+            elif name == "set":
+                self.client.data[args[0]] = args[1]
+                results.append(True)
+            elif name == "delete":
+                results.append(sum(
+                    self.client.data.pop(k, None) is not None for k in args
+                ))
+        return results
+
+
+class FakeBulkRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def test_redis_cache_bulk_operations_use_one_round_trip(monkeypatch):
+    monkeypatch.setattr("fastapi_template.core.cache.BULK_CHUNK_SIZE", 2)
+    cache = RedisCache()
+    cache.client = FakeBulkRedis()
+
+    values = {f"k{i}": {"i": i} for i in range(5)}
+    assert cache.set_many(values, expire={"k0": 30})
+    assert cache.client.expires == {cache.key("k0"): 30}
+    assert cache.get_many(["k4", "missing", "k0", "k4"]) == {
+        "k4": {"i": 4}, "k0": {"i": 0}
+    }
+    assert cache.delete_many(["k0", "k1", "k2", "missing"]) == 3
+    # 每个批量操作一次往返，MGET/DEL 按 BULK_CHUNK_SIZE 拆分
+    assert cache.client.round_trips == 3
+    assert sorted(cache.client.data) == [cache.key("k3"), cache.key("k4")]
+
+
+def test_memory_cache_bulk_per_key_ttl():
+    cache = MemoryCache()
+    cache.set_many({"short": 1, "long": 2}, expire={"short": 0.01})
+    time.sleep(0.02)
+    assert cache.get_many(["short", "long"]) == {"long": 2}
+    assert cache.delete_many(["long", "short"]) == 1
+    assert len(cache) == 0
+
+
+def test_tiered_cache_bulk_reads_hit_l2_once():
+    l2 = FakeRedisCache()
+    tiered = TieredCache(l2, l1=MemoryCache(), l1_ttl=60)
+    l2.set_many({f"k{i}": i for i in range(3)})
+    tiered.get("k0")
+    reads = l2.reads
+
+    assert tiered.get_many(["k0", "k1", "k2", "k3"]) == {
+        "k0": 0, "k1": 1, "k2": 2
+    }
+    # k0 来自L1，其余一次批量读取L2
+    assert l2.bulk_reads == 1 and l2.reads == reads
+    assert tiered.get_many(["k1", "k2"]) == {"k1": 1, "k2": 2}
+    assert l2.bulk_reads == 1
+
+    tiered.set_many({"k1": 10, "k5": 5}, expire=30)
+    tiered.delete_many(["k2"])
+    assert tiered.get_many(["k1", "k2", "k5"]) == {"k1": 10, "k5": 5}
+    # 批量写入和删除各发布一条失效消息
+    published = [json.loads(m)["keys"] for _, m in l2.client.messages]
+    assert published == [["k1", "k5"], ["k2"]]
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+
+def test_async_redis_cache_bulk_operations():
+    client = FakeBulkRedis()
+    client.pipeline = lambda transaction=True: FakeAsyncPipeline(client)
+    cache = AsyncRedisCache(client=client)
+
+    async def run():
+        assert await cache.set_many({"a": 1, "b": [2]}, expire=10)
+        assert await cache.get_many(["a", "b", "c"]) == {"a": 1, "b": [2]}
+        assert await cache.delete_many(["a", "c"]) == 1
+
+    asyncio.run(run())
+    assert client.round_trips == 3
+    assert client.expires == {cache.key("a"): 10, cache.key("b"): 10}
+
+
+def test_memory_delete_if_equal():
+    cache = MemoryCache()
+    cache.add_raw("lock", "mine", 10)
+    assert not cache.delete_if_equal("lock", "other")
+    assert cache.get_raw("lock") == "mine"
+    assert cache.delete_if_equal("lock", "mine")
+    assert cache.get_raw("lock") is None
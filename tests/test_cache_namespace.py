@@ -0,0 +1,98 @@
+from fastapi_template.core.cache import MemoryCache, RedisCache, TieredCache
+from fastapi_template.core.cache_namespace import (
+    CacheNamespace, invalidate_tags, tag_key
+)
+
+
+def test_namespace_invalidation_is_isolated():
+    backend = MemoryCache()
+    posts = CacheNamespace("posts", backend=backend, ttl=60)
+    users = CacheNamespace("users", backend=backend, ttl=60)
+    posts.set("1", {"title": "a"})
+    users.set("1", {"name": "b"})
+    assert posts.get("1") == {"title": "a"}
+
+    posts.invalidate()
+    assert posts.get("1") is None
+    assert users.get("1") == {"name": "b"}
+
+    posts.set("1", {"title": "c"})
+    assert posts.get("1") == {"title": "c"}
+
+
+def test_tag_invalidation_spans_namespaces():
+    backend = MemoryCache()
+    details = CacheNamespace("details", backend=backend, ttl=60)
+    pages = CacheNamespace("pages", backend=backend, ttl=60)
+    details.set("42", "post 42", tags=["post:42"])
+    details.set("7", "post 7", tags=["post:7"])
+    pages.set_many({"p1": [42, 7], "p2": [8]}, tags=["post:42", "posts"])
+
+    invalidate_tags("post:42", backend=backend)
+
+    assert details.get_many(["42", "7"]) == {"7": "post 7"}
+    assert pages.get_many(["p1", "p2"]) == {}
+
+
+def test_invalidation_after_snapshot_drops_entry():
+    backend = MemoryCache()
+    namespace = CacheNamespace("ns", backend=backend, ttl=60)
+    versions = namespace.snapshot(["t"])
+    # 计算值期间整个命名空间失效
+    namespace.invalidate()
+    namespace.set("k", "stale", tags=["t"], versions=versions)
+    assert namespace.get("k") is None
+
+
+def test_missing_tag_version_invalidates_entries():
+    backend = MemoryCache()
+    namespace = CacheNamespace("ns", backend=backend, ttl=60)
+    namespace.set("k", 1, tags=["t"])
+    # 版本键被淘汰或过期后不能回到旧版本
+    backend.delete(tag_key("t"))
+    assert namespace.get("k") is None
+
+
+def test_namespace_on_tiered_cache():
+    l2 = MemoryCache()
+    worker_a = CacheNamespace("ns", backend=TieredCache(l2, l1=MemoryCache()))
+    worker_b = CacheNamespace("ns", backend=TieredCache(l2, l1=MemoryCache()))
+    worker_a.set("k", 1, tags=["t"])
+    assert worker_b.get("k") == 1
+    # 版本键写入L2，本进程的L1同时更新；其他进程通过 pub/sub 删除L1
+    worker_b.invalidate_tags("t")
+    assert worker_b.get("k") is None
+    assert l2.get_raw(tag_key("t")) is not None
+
+
+class FakeScanRedis:
+    def __init__(self, keys):
+        self.keys = set(keys)
+        self.unlinked = []
+
+    def scan_iter(self, match, count):
+        prefix = match.rstrip("*")
+        return iter(sorted(k for k in self.keys if k.startswith(prefix)))
+
+    def unlink(self, *keys):
+        self.unlinked.append(keys)
+        self.keys.difference_update(keys)
+
+
+def test_redis_flush_only_removes_prefixed_keys(monkeypatch):
+    monkeypatch.setattr("fastapi_template.core.cache.BULK_CHUNK_SIZE", 2)
+    cache = RedisCache(prefix="app")
+    cache.client = FakeScanRedis(["app:a", "app:b", "app:c", "other:a"])
+
+    assert cache.flush()
+    assert cache.client.keys == {"other:a"}
+    assert [len(batch) for batch in cache.client.unlinked] == [2, 1]
+
+
+def test_redis_unlink_matching_ignores_prefix():
+    cache = RedisCache(prefix="app")
+    cache.client = FakeScanRedis(["response:a", "cached:b", "app:response:c"])
+
+    # 加前缀之前写入的旧键，不影响本应用当前的键
+    assert cache.unlink_matching("response:*") == 1
+    assert cache.client.keys == {"cached:b", "app:response:c"}
@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import redis
+
+from fastapi_template.core import cached as cached_module
+from fastapi_template.core.cache import MemoryCache
+from fastapi_template.core.cached import cached
+
+
+class BrokenCache:
+    def __getattr__(self, name):
+        def fail(*args):
+            raise redis.ConnectionError("redis is down")
+        return fail
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    @cached(key="slow:{x}", ttl=60, backend=MemoryCache())
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return {"x": x}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(slow(1)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{"x": 1}] * 10
+    assert slow.cache_key(1) == "cached:slow:1"
+
+
+def test_stale_value_is_served_while_refreshing():
+    values = iter(["old", "new"])
+    refreshed = threading.Event()
+
+    @cached(ttl=0.05, stale_ttl=60, backend=MemoryCache())
+    def current():
+        try:
+            return next(values)
+        finally:
+            refreshed.set()
+
+    assert current() == "old"
+    refreshed.clear()
+    time.sleep(0.1)
+    # 过期后先返回旧值，后台刷新
+    assert current() == "old"
+    assert refreshed.wait(1)
+    time.sleep(0.05)
+    assert current() == "new"
+
+
+def test_concurrent_stale_reads_refresh_once(monkeypatch):
+    started = []
+
+    class CountingThread(threading.Thread):
+        def start(self):
+            started.append(self)
+            super().start()
+
+    monkeypatch.setattr(
+        cached_module,
+        "threading",
+        SimpleNamespace(
+            Event=threading.Event, Lock=threading.Lock, Thread=CountingThread
+        ),
+    )
+    values = iter(["old", "new"])
+
+    @cached(ttl=0.05, stale_ttl=60, backend=MemoryCache())
+    def current():
+        value = next(values)
+        if value == "new":
+            time.sleep(0.2)
+        return value
+
+    class SlowSet(set):
+        # 放大检查和登记之间的窗口
+        def __contains__(self, key):
+            found = super().__contains__(key)
+            time.sleep(0.01)
+            return found
+
+    current.invalidate.__self__.refreshing = SlowSet()
+    assert current() == "old"
+    time.sleep(0.1)
+    barrier = threading.Barrier(20)
+
+    def read():
+        barrier.wait()
+        current()
+
+    readers = [threading.Thread(target=read) for _ in range(20)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    # 同时读到过期条目的线程只会启动一个后台刷新
+    assert len(started) == 1
+    started[0].join()
+
+
+def test_waits_for_other_worker_holding_the_lock():
+    backend = MemoryCache()
+    calls = []
+
+    @cached(key="shared", ttl=60, backend=backend, lock_timeout=2)
+    def compute():
+        calls.append(1)
+        return "mine"
+
+    # 另一个进程持有锁，稍后写入结果
+    backend.add_raw("cached:shared:lock", "other", 2)
+
+    def other_worker():
+        time.sleep(0.1)
+        backend.set_raw(
+            "cached:shared",
+            '{"value": "theirs", "fresh_until": %f}' % (time.time() + 60),
+        )
+
+    threading.Thread(target=other_worker).start()
+    assert compute() == "theirs"
+    assert calls == []
+
+
+def test_release_keeps_lock_taken_by_another_worker():
+    backend = MemoryCache()
+
+    @cached(key="slow", ttl=60, backend=backend, lock_timeout=2)
+    def compute():
+        # 计算超过 lock_timeout，锁过期后被另一个进程拿到
+        backend.delete("cached:slow:lock")
+        backend.add_raw("cached:slow:lock", "other", 2)
+        return "value"
+
+    assert compute() == "value"
+    assert backend.get_raw("cached:slow:lock") == "other"
+
+
+def test_async_concurrent_misses_compute_once():
+    calls = []
+
+    @cached(ttl=60, backend=MemoryCache())
+    async def fetch(x):
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return [x]
+
+    async def run():
+        return await asyncio.gather(*(fetch(2) for _ in range(10)))
+
+    assert asyncio.run(run()) == [[2]] * 10
+    assert calls == [2]
+
+
+def test_backend_errors_fall_back_to_computing():
+    calls = []
+
+    @cached(ttl=60, backend=BrokenCache())
+    def compute():
+        calls.append(1)
+        return 1
+
+    assert compute() == 1
+    assert compute() == 1
+    assert len(calls) == 2
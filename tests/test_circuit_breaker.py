@@ -0,0 +1,112 @@
+import time
+
+import pytest
+import redis
+
+from fastapi_template.core.cache import RedisCache
+from fastapi_template.core.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+)
+from fastapi_template.core.response_cache import ResponseCache
+
+
+def fail(breaker, exc=redis.TimeoutError):
+    with pytest.raises(exc):
+        with breaker:
+            raise exc("boom")
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    fail(breaker)
+    with breaker:
+        pass
+    fail(breaker)
+    # 成功会清零，需要连续失败
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker:
+            pass
+
+
+def test_breaker_half_opens_with_a_single_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    fail(breaker)
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+
+    assert breaker.allow()
+    # 探测进行中，其他调用仍被拒绝
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    with breaker:
+        pass
+    assert breaker.state == CLOSED
+
+
+def test_unrelated_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    fail(breaker, ValueError)
+    assert breaker.state == CLOSED
+
+
+class SlowRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise redis.TimeoutError("Timeout reading from socket")
+
+    def setex(self, key, expire, value):
+        return self.get(key)
+
+    def pipeline(self, transaction=True):
+        return SlowPipeline(self)
+
+
+class SlowPipeline:
+    def __init__(self, client):
+        self.client = client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def mget(self, keys):
+        pass
+
+    def execute(self):
+        return self.client.get(None)
+
+
+def test_cache_fails_open_to_compute_when_redis_is_slow():
+    client = SlowRedis()
+    backend = RedisCache(
+        breaker=CircuitBreaker("redis", failure_threshold=2, reset_timeout=60)
+    )
+    backend.client = client
+    response_cache = ResponseCache(backend=backend)
+
+    values = [
+        response_cache.cached("route", {"id": 1}, lambda: {"v": 1})
+        for _ in range(5)
+    ]
+
+    assert values == [{"v": 1}] * 5
+    # 熔断后不再访问Redis
+    assert client.calls == 2
+    assert backend.breaker.state == OPEN
+
+
+def test_redis_cache_connects_lazily():
+    backend = RedisCache()
+    assert backend._client is None
+    assert backend.key("k").endswith(":k")
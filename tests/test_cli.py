@@ -14,6 +14,12 @@ def test_help(cli_client, cli):
     [
         ("run", ["--help"], "--port"),
         ("create-user", ["--help"], "create-user"),
+        ("import-data", ["--help"], "--chunk-size"),
+        ("import-users", ["--help"], "--workers"),
+        ("export-data", ["--help"], "--since"),
+        ("cache-report", ["--help"], "--cold-ratio"),
+        ("outbox-relay", ["--help"], "--once"),
+        ("cache-purge-legacy", ["--help"], "CACHE_KEY_PREFIX"),
     ],
 )
 def test_cmds_help(cli_client, cli, cmd, args, msg):
@@ -0,0 +1,103 @@
+import uuid
+import zlib
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pytest
+
+from fastapi_template.core import codecs
+from fastapi_template.core.cache import MemoryCache
+from fastapi_template.core.codecs import Compression, Serializer
+
+VALUE = {"title": "缓存", "tags": ["a", "b"], "count": 3, "score": 1.5}
+
+
+def test_json_without_header_matches_legacy_format():
+    data = Serializer("json").dumps(VALUE)
+    assert not data.startswith(codecs.MAGIC)
+    # 旧版本用 json.dumps 写入的字符串仍然可读
+    assert Serializer("orjson").loads('{"v": [1, 2]}') == {"v": [1, 2]}
+
+
+def test_tagged_payloads_decode_regardless_of_config():
+    data = Serializer("orjson").dumps(VALUE)
+    assert data[:3] == codecs.MAGIC + b"on"
+    assert Serializer("json").loads(data) == VALUE
+
+
+@pytest.mark.skipif(codecs.msgpack is None, reason="msgpack not installed")
+def test_msgpack_round_trip_with_bytes():
+    serializer = Serializer("msgpack")
+    value = dict(VALUE, raw=b"\x00\xff")
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+TYPED = {
+    "at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "day": date(2024, 1, 2),
+    "clock": time(3, 4, 5, 6),
+    "price": Decimal("0.10000000000000000001"),
+    "ids": {1, 2},
+    "raw": b"\x00\xff",
+    "nested": [{"at": datetime(2024, 1, 2)}],
+}
+
+
+@pytest.mark.parametrize("codec", [
+    "json",
+    pytest.param("orjson", marks=pytest.mark.skipif(
+        codecs.orjson is None, reason="orjson not installed"
+    )),
+    pytest.param("msgpack", marks=pytest.mark.skipif(
+        codecs.msgpack is None, reason="msgpack not installed"
+    )),
+])
+def test_types_round_trip(codec):
+    serializer = Serializer(codec)
+    value = serializer.loads(serializer.dumps(TYPED))
+    assert value == TYPED
+    assert type(value["at"]) is datetime and type(value["day"]) is date
+    # 其他编码写入的载荷按载荷头解码，类型同样还原
+    assert Serializer("json").loads(serializer.dumps(TYPED)) == TYPED
+
+
+def test_uuid_is_encoded_as_string():
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    serializer = Serializer("json")
+    assert serializer.loads(serializer.dumps({"id": value})) == {
+        "id": str(value)
+    }
+
+
+def test_compression_above_threshold(monkeypatch):
+    monkeypatch.setitem(
+        codecs.COMPRESSIONS,
+        "zlib",
+        Compression("zlib", b"x", zlib, zlib.compress, zlib.decompress),
+    )
+    serializer = Serializer("json", "zlib", threshold=100)
+
+    small = serializer.dumps({"v": 1})
+    assert not small.startswith(codecs.MAGIC)
+
+    large = {"body": "repeat " * 1000}
+    data = serializer.dumps(large)
+    assert data[:3] == codecs.MAGIC + b"jx"
+    assert len(data) < len(Serializer("json").dumps(large))
+    assert Serializer("json").loads(data) == large
+
+
+def test_undecodable_payload_is_a_miss():
+    cache = MemoryCache()
+    cache.set_raw("unknown", codecs.MAGIC + b"?n{}")
+    cache.set_raw("broken", b"{not json")
+    assert cache.get("unknown") is None
+    assert cache.get("broken") is None
+
+
+def test_unavailable_codec_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        Serializer("pickle")
+    monkeypatch.setitem(codecs.CODEC_MODULES, "orjson", None)
+    with pytest.raises(RuntimeError):
+        Serializer("orjson")
@@ -17,4 +17,29 @@ def test_content_list(api_client_authenticated):
     response = api_client_authenticated.get("/content/")
     assert response.status_code == 200
     result = response.json()
-    assert result[0]["slug"] == "hello-test"
+    assert result["items"][0]["slug"] == "hello-test"
+    assert "text" not in result["items"][0]
+
+
+def test_content_list_projection(api_client_authenticated):
+    response = api_client_authenticated.get(
+        "/content/", params={"fields": "title,tags", "tags": "hello"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["total"] == 1
+    assert result["items"][0] == {
+        "id": result["items"][0]["id"],
+        "title": "hello test",
+        "tags": ["test", "hello"],
+    }
+
+    response = api_client_authenticated.get(
+        "/content/", params={"tags": "missing"}
+    )
+    assert response.json()["total"] == 0
+
+    response = api_client_authenticated.get(
+        "/content/", params={"fields": "password"}
+    )
+    assert response.status_code == 400
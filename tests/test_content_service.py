@@ -0,0 +1,222 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from fastapi_template.core.events import EventBus, EventTypes
+from fastapi_template.models.content import (
+    Content, ContentBatchUpdate, ContentIncoming
+)
+from fastapi_template.models.security import User
+from fastapi_template.services.content_service import (
+    ContentService, normalize_tags
+)
+from fastapi_template.utils.slug import next_slug
+
+
+@pytest.fixture(scope="function")
+def content_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_next_slug():
+    assert next_slug("hello", []) == "hello"
+    assert next_slug("hello", ["hello"]) == "hello-2"
+    assert next_slug("hello", ["hello", "hello-2"]) == "hello-3"
+
+
+def test_resolve_by_id_and_slug(content_session):
+    service = ContentService()
+    content = Content(title="Hello", slug="hello", text="x", user_id=1)
+    content_session.add(content)
+    content_session.commit()
+
+    assert service.resolve(content_session, content.id).id == content.id
+    assert service.resolve(content_session, str(content.id)).id == content.id
+    assert service.resolve(content_session, "hello").id == content.id
+    assert service.resolve(content_session, "missing") is None
+
+    # 其他进程修改slug后，过期的映射会被校验并纠正
+    content.slug = "renamed"
+    content_session.commit()
+    assert service.resolve(content_session, "hello") is None
+    assert service.resolve(content_session, "renamed").id == content.id
+
+
+def test_slug_map_invalidated_by_events(content_session):
+    service = ContentService()
+    bus = EventBus()
+    service.register_event_handlers(bus)
+    content = Content(title="Hello", slug="hello", text="x", user_id=1)
+    content_session.add(content)
+    content_session.commit()
+
+    service.resolve(content_session, "hello")
+    assert service._lookup("hello") == content.id
+    bus.publish(EventTypes.CONTENT_DELETED, content.id)
+    assert service._lookup("hello") is None
+
+
+def test_assign_slug_handles_collisions(content_session):
+    service = ContentService()
+    for slug in ("hello-world", "hello-world-2"):
+        content_session.add(
+            Content(title="Hello World", slug=slug, text="x", user_id=1)
+        )
+    content_session.commit()
+
+    incoming = ContentIncoming(title="Hello World", text="x", tags=["a"])
+    service.assign_slug(content_session, incoming)
+    assert incoming.slug == "hello-world-3"
+
+    # 更新时排除自身，标题不变则slug不变
+    service.assign_slug(content_session, incoming, exclude_id=1)
+    assert incoming.slug == "hello-world"
+
+
+def test_normalize_tags():
+    assert normalize_tags(" Python, web,,python ") == ["python", "web"]
+    assert normalize_tags(["A", "b"]) == ["a", "b"]
+    assert normalize_tags(None) == []
+
+
+def test_tag_filter_all_and_any(content_session):
+    service = ContentService()
+    for slug, tags in (("a", "python,web"), ("b", "python"), ("c", "go")):
+        content = Content(title=slug, slug=slug, text="x", tags=tags)
+        content_session.add(content)
+        content_session.flush()
+        service.sync_tags(content_session, content.id, content.tags)
+    content_session.commit()
+
+    def slugs(tags, match_all):
+        return content_session.exec(
+            select(Content.slug)
+            .where(service.tag_filter(tags, match_all=match_all))
+            .order_by(Content.slug)
+        ).all()
+
+    assert slugs(["python", "web"], True) == ["a"]
+    assert slugs(["Python"], True) == ["a", "b"]
+    assert slugs(["web", "go"], False) == ["a", "c"]
+
+    # 修改标签后关联同步更新
+    service.sync_tags(content_session, 1, "go")
+    content_session.commit()
+    assert slugs(["go"], True) == ["a", "c"]
+    assert slugs(["web"], True) == []
+
+
+def test_create_many(content_session):
+    service = ContentService()
+    user = User(id=1, username="writer", password="secret")
+    response = service.create_many(content_session, [
+        ContentIncoming(title="Hello", text="a", tags=["x", "y"]),
+        ContentIncoming(title="Hello", text="b", tags=["x"]),
+        ContentIncoming(title=None, text="c", tags=["x"]),
+    ], user)
+
+    assert (response.succeeded, response.failed) == (2, 1)
+    assert [result.status for result in response.results] == [201, 201, 422]
+    assert [result.slug for result in response.results[:2]] == [
+        "hello", "hello-2"
+    ]
+    rows = content_session.exec(
+        select(Content.slug).where(service.tag_filter(["x"]))
+    ).all()
+    assert sorted(rows) == ["hello", "hello-2"]
+
+
+def test_unique_slugs_single_query(content_session):
+    service = ContentService()
+    for slug in ("hello", "hello-2", "world"):
+        content_session.add(Content(title=slug, slug=slug, text="x"))
+    content_session.commit()
+
+    statements = []
+    event.listen(
+        content_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    # 同一批次内不重复；更新时排除自身原有的slug
+    assert service.unique_slugs(
+        content_session,
+        ["hello", "hello", "world", "new"],
+        [None, None, 3, None],
+    ) == ["hello-3", "hello-4", "world", "new"]
+    assert len(statements) == 1
+
+
+def test_patch_values_drops_server_fields():
+    patch = ContentIncoming(
+        title="New Title", text="hi", tags=["a"], version=0, user_id=5, id=9
+    )
+    assert ContentService.patch_values(patch) == {
+        "title": "New Title", "text": "hi", "tags": "a", "slug": "new-title"
+    }
+    # 标题为null时不修改标题和slug
+    patch = ContentIncoming(title=None, text="hi", tags=["a"], version=0)
+    assert ContentService.patch_values(patch) == {"text": "hi", "tags": "a"}
+
+
+def test_update_many(content_session):
+    service = ContentService()
+    owner = User(id=1, username="owner", password="secret")
+    other = User(id=2, username="other", password="secret")
+    for slug in ("a", "b"):
+        content_session.add(
+            Content(title=slug, slug=slug, text="x", user_id=1)
+        )
+    content_session.commit()
+
+    response = service.update_many(content_session, [
+        ContentBatchUpdate(id=1, title="A", text="new", tags=["z"], version=1),
+        ContentBatchUpdate(id=2, title="B", text="new", tags=["z"], version=7),
+        ContentBatchUpdate(id=9, title="C", text="new", tags=["z"]),
+    ], owner)
+    assert [result.status for result in response.results] == [200, 412, 404]
+    assert response.results[0].version == 2
+
+    contents = content_session.exec(select(Content).order_by(Content.id)).all()
+    assert [(c.text, c.version) for c in contents] == [("new", 2), ("x", 1)]
+
+    response = service.update_many(content_session, [
+        ContentBatchUpdate(id=1, title="A", text="mine", tags=["z"]),
+    ], other)
+    assert response.results[0].status == 403
+
+
+def test_resolve_numeric_edge_cases(content_session):
+    service = ContentService()
+    content = Content(title="2024", slug="2024", text="x", user_id=1)
+    content_session.add(content)
+    content_session.commit()
+
+    # 全是数字的slug在没有该ID时按slug查询
+    assert service.resolve(content_session, "2024").id == content.id
+    # Unicode数字和超出整数范围的值不按ID查询
+    assert service.resolve(content_session, "²") is None
+    assert service.resolve(content_session, "9" * 30) is None
+
+
+def test_add_with_unique_slug_retries_on_conflict(content_session):
+    service = ContentService()
+    content_session.add(
+        Content(title="Hello", slug="hello", text="x", user_id=1)
+    )
+    content_session.commit()
+
+    # slug在分配之后被另一个请求占用
+    content = Content(title="Hello", slug="hello", text="y", user_id=1)
+    service.add_with_unique_slug(content_session, content)
+    content_session.commit()
+    assert content.id is not None
+    assert content.slug == "hello-2"
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from fastapi_template.hooks.use_auth import UseAuth
+from fastapi_template.hooks.use_loaders import Loaders
+from fastapi_template.models.blog import Comment, Post
+from fastapi_template.models.security import User
+from fastapi_template.utils.dataloader import DataLoader
+
+
+@pytest.fixture(scope="function")
+def loader_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username="alice", password="secret"))
+        session.add(User(username="bob", password="secret"))
+        session.add(Post(title="p", content="c", user_id=1))
+        session.flush()
+        root = Comment(content="root", post_id=1, user_id=1)
+        session.add(root)
+        session.flush()
+        for i in range(3):
+            reply = Comment(
+                content=f"reply {i}", post_id=1, user_id=2,
+                parent_id=root.id, root_id=root.id,
+            )
+            session.add(reply)
+            session.flush()
+            session.add(Comment(
+                content=f"nested {i}", post_id=1, user_id=1,
+                parent_id=reply.id, root_id=root.id,
+            ))
+        session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    with Session(engine) as session:
+        yield session, statements
+
+
+def test_load_coalesces_and_deduplicates():
+    calls = []
+
+    def batch_load(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = DataLoader(batch_load)
+
+    async def run():
+        first = await asyncio.gather(
+            loader.load(1), loader.load(2), loader.load(1), loader.load(3)
+        )
+        second = await loader.load_many([2, 3, 4])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == [10, 20, 10, None]
+    assert second == [20, None, 40]
+    # 缺失的键也会缓存，第二轮只查询新键
+    assert calls == [[1, 2, 3], [4]]
+
+    assert loader.get_many([4, 5, 5]) == [40, 50, 50]
+    assert calls[-1] == [5]
+
+
+def test_load_propagates_errors():
+    def batch_load(keys):
+        raise RuntimeError("boom")
+
+    loader = DataLoader(batch_load)
+
+    async def run():
+        return await asyncio.gather(
+            loader.load(1), loader.load(2), return_exceptions=True
+        )
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+def test_replies_load_one_query_per_level(loader_session):
+    session, statements = loader_session
+    loaders = Loaders(session)
+    level = [loaders.comments.get(1)]
+    depth = 0
+    while level:
+        replies = loaders.replies.get_many([c.id for c in level])
+        level = [reply for children in replies for reply in children]
+        depth += 1
+    # 根评论一次，三层回复各一次（最后一层为空）
+    assert len(statements) == 1 + depth
+    assert depth == 3
+
+
+def test_owner_check_batches(loader_session):
+    session, statements = loader_session
+    auth = UseAuth(session=session, loaders=Loaders(session))
+    alice, bob = session.get(User, 1), session.get(User, 2)
+    statements.clear()
+
+    assert auth.owns(bob, "comment", [2, 4, 6])
+    assert not auth.owns(bob, "comment", [2, 3])
+    assert not auth.owns(alice, "comment", [99])
+    assert len(statements) == 3
+    # 同一请求中已加载的资源不再查询
+    assert auth.owns(bob, "comment", [2, 4])
+    assert len(statements) == 3
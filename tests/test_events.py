@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+
+from fastapi_template.core.events import EventBus
+
+
+def test_inline_before_start():
+    bus = EventBus()
+    received = []
+    bus.subscribe("created", received.append, queued=True)
+    bus.publish("created", 1)
+    assert received == [1]
+
+
+def test_inline_coroutine_inside_running_loop():
+    bus = EventBus()
+    received = []
+
+    async def handler(data):
+        received.append(data)
+
+    async def failing(data):
+        raise ValueError("boom")
+
+    async def run():
+        bus.subscribe("created", handler, queued=True)
+        bus.subscribe("created", failing, queued=True)
+        # 未 start()，发布者线程已有运行中的事件循环
+        bus.publish("created", 1)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert received == [1]
+    assert [(s["processed"], s["errors"]) for s in bus.stats()] == [
+        (1, 0), (0, 1)
+    ]
+
+
+def test_inline_stats_from_many_threads():
+    bus = EventBus()
+    bus.subscribe("created", lambda data: None, queued=True)
+
+    def publish():
+        for i in range(1000):
+            bus.publish("created", i)
+
+    threads = [threading.Thread(target=publish) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    [stats] = bus.stats()
+    assert stats["published"] == stats["processed"] == 8000
+
+
+def test_queued_publish_does_not_wait_for_handler():
+    bus = EventBus()
+    received = []
+
+    async def slow(data):
+        await asyncio.sleep(0.05)
+        received.append(data)
+
+    async def run():
+        bus.subscribe("created", slow, queued=True, concurrency=2)
+        await bus.start()
+        start = time.perf_counter()
+        for i in range(4):
+            bus.publish("created", i)
+        elapsed = time.perf_counter() - start
+        await bus.stop(timeout=1)
+        return elapsed
+
+    assert asyncio.run(run()) < 0.05
+    assert sorted(received) == [0, 1, 2, 3]
+
+
+def test_drop_oldest_and_error_isolation():
+    bus = EventBus()
+    received = []
+
+    def handler(data):
+        if data == 3:
+            raise ValueError("boom")
+        received.append(data)
+
+    async def run():
+        bus.subscribe(
+            "created", handler, queued=True, queue_size=2,
+            overflow="drop_oldest",
+        )
+        await bus.start()
+        # worker 还没运行，队列只保留最后两个事件
+        for i in range(4):
+            bus.publish("created", i)
+        await bus.stop(timeout=1)
+
+    asyncio.run(run())
+    assert received == [2]
+    [stats] = bus.stats()
+    assert stats["dropped"] == 2
+    assert stats["errors"] == 1
+    assert stats["processed"] == 1
+
+
+def test_spill_when_full():
+    bus = EventBus()
+    spilled = []
+
+    async def run():
+        bus.subscribe(
+            "created", lambda data: None, queued=True, queue_size=1,
+            overflow="spill",
+            spill=lambda subscription, data: spilled.append(data),
+        )
+        await bus.start()
+        for i in range(3):
+            bus.publish("created", i)
+        await bus.stop(timeout=1)
+
+    asyncio.run(run())
+    assert spilled == [1, 2]
+    assert bus.stats()[0]["spilled"] == 2
+
+
+def test_block_from_thread_waits_for_room():
+    bus = EventBus()
+    received = []
+    release = threading.Event()
+
+    def handler(data):
+        release.wait(1)
+        received.append(data)
+
+    async def run():
+        bus.subscribe(
+            "created", handler, queued=True, queue_size=1, overflow="block"
+        )
+        await bus.start()
+
+        def publisher():
+            for i in range(3):
+                bus.publish("created", i)
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        await bus.stop(timeout=1)
+
+    asyncio.run(run())
+    assert received == [0, 1, 2]
+    assert bus.stats()[0]["dropped"] == 0
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from fastapi_template.utils.http_cache import (
+    conditional_response, http_date, make_etag, require_if_match
+)
+
+MODIFIED = datetime(2024, 1, 2, 3, 4, 5, 600000)
+ETAG = make_etag("content", 1, 3)
+
+app = FastAPI()
+
+
+@app.get("/item")
+def get_item(request: Request, response: Response):
+    not_modified = conditional_response(request, response, ETAG, MODIFIED)
+    if not_modified is not None:
+        return not_modified
+    return {"ok": True}
+
+
+@app.patch("/item")
+def patch_item(request: Request):
+    require_if_match(request, ETAG)
+    return {"ok": True}
+
+
+client = TestClient(app)
+
+
+def test_make_etag():
+    assert make_etag("content", 1, 3) == ETAG
+    assert make_etag("content", 1, 4) != ETAG
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+
+
+def test_validators_and_if_none_match():
+    response = client.get("/item")
+    assert response.status_code == 200
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == "Tue, 02 Jan 2024 03:04:05 GMT"
+
+    response = client.get("/item", headers={"If-None-Match": f'"x", {ETAG}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+
+    response = client.get("/item", headers={"If-None-Match": f"W/{ETAG}"})
+    assert response.status_code == 304
+
+    # If-None-Match 优先于 If-Modified-Since
+    response = client.get("/item", headers={
+        "If-None-Match": '"other"', "If-Modified-Since": http_date(MODIFIED)
+    })
+    assert response.status_code == 200
+
+
+def test_if_modified_since():
+    response = client.get(
+        "/item", headers={"If-Modified-Since": http_date(MODIFIED)}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "/item", headers={"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/item", headers={"If-Modified-Since": "garbage"})
+    assert response.status_code == 200
+
+
+def test_if_match():
+    assert client.patch("/item").status_code == 200
+    assert client.patch("/item", headers={"If-Match": ETAG}).status_code == 200
+    assert client.patch("/item", headers={"If-Match": "*"}).status_code == 200
+
+    response = client.patch("/item", headers={"If-Match": '"stale"'})
+    assert response.status_code == 412
+    assert response.headers["etag"] == ETAG
+
+    # If-Match 使用强比较
+    response = client.patch("/item", headers={"If-Match": f"W/{ETAG}"})
+    assert response.status_code == 412
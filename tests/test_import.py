@@ -0,0 +1,189 @@
+import io
+import json
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from fastapi_template.core.events import EventTypes
+from fastapi_template.models.blog import Comment, Post
+from fastapi_template.models.content import Content
+from fastapi_template.models.outbox import OutboxEvent
+from fastapi_template.models.security import User
+from fastapi_template.security import verify_password
+from fastapi_template.services.import_service import ImportService
+from fastapi_template.services.user_import_service import UserImportService
+
+
+@pytest.fixture(scope="function")
+def import_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def ndjson(*rows):
+    return io.StringIO("\n".join(
+        row if isinstance(row, str) else json.dumps(row) for row in rows
+    ))
+
+
+def test_import_posts_in_chunks(import_engine):
+    service = ImportService(import_engine, chunk_size=2)
+    report = service.import_stream("posts", ndjson(
+        {"title": "one", "content": "a"},
+        {"title": "two", "content": "b", "published": False},
+        {"content": "missing title"},
+        "{not json",
+        {"title": "five", "content": "e", "user_id": 7},
+    ))
+
+    assert report.total == 5
+    assert report.inserted == 3
+    assert report.failed == 2
+    assert [chunk.inserted for chunk in report.chunks] == [2, 0, 1]
+    assert [error.line for error in report.chunks[1].errors] == [3, 4]
+
+    with Session(import_engine) as session:
+        posts = session.exec(select(Post).order_by(Post.id)).all()
+    assert [post.title for post in posts] == ["one", "two", "five"]
+    assert [post.user_id for post in posts] == [1, 1, 7]
+
+
+def test_import_comments_resolves_roots(import_engine):
+    service = ImportService(import_engine)
+    service.import_stream("posts", ndjson(
+        {"id": 10, "title": "post", "content": "body"}
+    ))
+    report = service.import_stream("comments", ndjson(
+        {"id": 1, "post_id": 10, "content": "root"},
+        {"id": 2, "post_id": 10, "content": "reply", "parent_id": 1},
+        {"id": 3, "post_id": 10, "content": "nested", "parent_id": 2},
+    ))
+    assert report.inserted == 3
+
+    with Session(import_engine) as session:
+        comments = session.exec(select(Comment).order_by(Comment.id)).all()
+    assert [c.root_id for c in comments] == [None, 1, 1]
+
+
+def test_import_keeps_parent_before_reply(import_engine):
+    # StaticPool 只有一个连接，在它上面打开外键检查
+    with import_engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    with Session(import_engine) as session:
+        session.add(User(id=1, username="author", password="pw"))
+        session.commit()
+    service = ImportService(import_engine)
+    service.import_stream("posts", ndjson(
+        {"id": 10, "title": "post", "content": "body"}
+    ))
+    service.import_stream("comments", ndjson(
+        {"id": 1, "post_id": 10, "content": "existing"}
+    ))
+    # 列不同的行交错出现：回复评论不能先于同一分块中的父评论插入
+    report = service.import_stream("comments", ndjson(
+        {"post_id": 10, "content": "reply to existing", "parent_id": 1},
+        {"id": 5, "post_id": 10, "content": "parent"},
+        {"post_id": 10, "content": "reply", "parent_id": 5},
+    ))
+    assert report.inserted == 3
+
+    with Session(import_engine) as session:
+        reply = session.exec(
+            select(Comment).where(Comment.content == "reply")
+        ).one()
+    assert reply.parent_id == 5
+
+
+def test_import_contents_csv(import_engine):
+    service = ImportService(import_engine)
+    report = service.import_stream("contents", io.StringIO(
+        "title,text,published,tags\n"
+        "Hello World,body,true,\"a,b\"\n"
+        "Second,body,,\n"
+    ), fmt="csv", user_id=3)
+    assert report.inserted == 2
+
+    with Session(import_engine) as session:
+        contents = session.exec(select(Content).order_by(Content.id)).all()
+    assert contents[0].slug == "hello-world"
+    assert contents[0].published is True
+    assert contents[0].tags == "a,b"
+    assert contents[1].published is False
+    assert contents[1].user_id == 3
+
+
+def test_import_chunk_rolls_back_on_database_error(import_engine):
+    service = ImportService(import_engine, chunk_size=2)
+    report = service.import_stream("posts", ndjson(
+        {"id": 1, "title": "one", "content": "a"},
+        {"id": 1, "title": "duplicate", "content": "b"},
+        {"id": 2, "title": "two", "content": "c"},
+    ))
+    assert report.inserted == 1
+    assert report.chunks[0].failed == 2
+    assert "rolled back" in report.chunks[0].errors[0].error
+
+    with Session(import_engine) as session:
+        assert [p.id for p in session.exec(select(Post)).all()] == [2]
+
+
+def test_import_users(import_engine):
+    with Session(import_engine) as session:
+        session.add(User(username="taken", password="old"))
+        session.commit()
+
+    service = UserImportService(import_engine, chunk_size=2, workers=0)
+    progress = []
+    report = service.import_stream(
+        ndjson(
+            {"username": "ann", "password": "pw1"},
+            {"username": "ann", "password": "again"},
+            {"username": "taken", "password": "pw2"},
+            {"password": "missing username"},
+            {"username": "ben", "password": "pw3", "superuser": True},
+        ),
+        progress=lambda r: progress.append(r.total),
+    )
+
+    assert (report.total, report.inserted, report.skipped, report.failed) == (
+        5, 2, 1, 2
+    )
+    assert progress == [2, 4, 5]
+    with Session(import_engine) as session:
+        users = {u.username: u for u in session.exec(select(User)).all()}
+    assert users["taken"].password == "old"
+    assert users["ben"].superuser is True
+    assert verify_password("pw1", users["ann"].password)
+
+    # 每个分块一个发件箱事件，不包含密码哈希
+    with Session(import_engine) as session:
+        events = session.exec(select(OutboxEvent)).all()
+    assert [e.event_type for e in events] == [EventTypes.USERS_IMPORTED] * 2
+    assert all("password" not in e.payload for e in events)
+
+
+def test_import_users_update_with_process_pool(import_engine):
+    with Session(import_engine) as session:
+        session.add(User(username="taken", password="old"))
+        session.commit()
+
+    service = UserImportService(import_engine, workers=2)
+    report = service.import_stream(
+        io.StringIO("username,password\ntaken,new\nnew,pw\n"),
+        "csv",
+        on_conflict="update",
+    )
+
+    assert (report.inserted, report.updated) == (1, 1)
+    with Session(import_engine) as session:
+        taken = session.exec(
+            select(User).where(User.username == "taken")
+        ).one()
+    assert verify_password("new", taken.password)
+    assert taken.version == 2
@@ -0,0 +1,141 @@
+import io
+import json
+
+import pytest
+import redis
+
+from fastapi_template.core.cache import MemoryCache, RedisCache, TieredCache
+from fastapi_template.core.metrics import (
+    CacheMetrics, cache_metrics, namespace_of
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        if key.endswith(":down"):
+            raise redis.TimeoutError("timeout")
+        return self.data.get(key)
+
+    def setex(self, key, expire, value):
+        self.data[key] = value
+        return True
+
+
+def stats_by(metrics, tier, namespace):
+    for row in metrics.snapshot()["namespaces"]:
+        if (row["tier"], row["namespace"]) == (tier, namespace):
+            return row
+    raise AssertionError(f"no stats for {tier} {namespace}")
+
+
+def test_redis_calls_are_counted_per_namespace():
+    metrics = CacheMetrics()
+    backend = RedisCache(prefix="app", metrics=metrics)
+    backend.client = FakeRedis()
+
+    backend.set("response:a", {"v": 1}, expire=10)
+    backend.get("response:a")
+    backend.get("response:b")
+    backend.get("cached:x")
+    with pytest.raises(redis.TimeoutError):
+        backend.get("cached:down")
+
+    response = stats_by(metrics, "redis", "response")
+    assert (response["hits"], response["misses"], response["sets"]) == (
+        1, 1, 1
+    )
+    assert response["hit_ratio"] == 0.5
+    assert response["bytes_read"] == response["bytes_written"] == len(
+        b'{"v":1}'
+    )
+    assert response["calls"] == 3
+    assert response["latency_ms_p99"] is not None
+
+    cached = stats_by(metrics, "redis", "cached")
+    assert (cached["misses"], cached["errors"]) == (1, 1)
+
+
+def test_namespace_labels():
+    assert namespace_of("response:blog.get_post:v1:post_id=1") == (
+        "response:blog.get_post"
+    )
+    assert namespace_of("cached:app.func:1") == "cached:app.func"
+    assert namespace_of("tag:post:42:version") == "tag:post"
+    assert namespace_of("response:a") == "response"
+    assert namespace_of("plain") == "-"
+
+
+def test_namespace_cardinality_is_capped(monkeypatch):
+    monkeypatch.setattr("fastapi_template.core.metrics.MAX_NAMESPACES", 2)
+    metrics = CacheMetrics()
+    for key in ("a:1", "b:1", "c:1", "d:1", "a:2"):
+        with metrics.measure("redis", [key]) as measurement:
+            measurement.read([None])
+
+    rows = metrics.snapshot()["namespaces"]
+    assert {row["namespace"]: row["misses"] for row in rows} == {
+        "a": 2, "b": 1, "other": 2
+    }
+
+
+def test_tiered_cache_reports_l1_separately():
+    metrics = CacheMetrics()
+    tiered = TieredCache(MemoryCache(), l1=MemoryCache(), metrics=metrics)
+    tiered.set("ns:k", 1)
+    tiered.get("ns:k")
+    tiered.get_many(["ns:k", "ns:missing"])
+
+    l1 = stats_by(metrics, "l1", "ns")
+    assert (l1["hits"], l1["misses"]) == (2, 1)
+
+
+def test_prometheus_export():
+    metrics = CacheMetrics()
+    with metrics.measure("redis", ["response:a"]) as measurement:
+        measurement.read([b"12345"])
+
+    text = metrics.to_prometheus()
+    labels = 'tier="redis",namespace="response"'
+    assert f"cache_hits_total{{{labels}}} 1" in text
+    assert f"cache_bytes_read_total{{{labels}}} 5" in text
+    assert f'cache_latency_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+
+
+def test_metrics_endpoint(api_client):
+    cache_metrics.reset()
+    with cache_metrics.measure("l1", ["response:a"]) as measurement:
+        measurement.read([None])
+
+    response = api_client.get("/api/v1/metrics/")
+    assert response.status_code == 200
+    assert "cache_misses_total" in response.text
+    assert "cache_breaker_open" in response.text
+
+    stats = api_client.get("/api/v1/metrics/cache").json()
+    assert stats["namespaces"][0]["misses"] == 1
+    assert "hit_ratio" in stats["response_cache"]
+
+
+def test_cache_report(cli_client, cli, monkeypatch):
+    stats = {
+        "since": 0,
+        "breaker": "closed",
+        "namespaces": [
+            dict(
+                tier="redis", namespace="response", hits=1, misses=9,
+                hit_ratio=0.1, avg_value_bytes=120, latency_ms_p50=0.5,
+                latency_ms_p99=2.5, errors=0,
+            )
+        ],
+    }
+    monkeypatch.setattr(
+        "urllib.request.urlopen",
+        lambda url, timeout: io.BytesIO(json.dumps(stats).encode()),
+    )
+    result = cli_client.invoke(cli, ["cache-report"])
+    assert result.exit_code == 0
+    assert "response" in result.stdout
+    assert "10.0%" in result.stdout and "cold" in result.stdout
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+
+import io
+import json
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from fastapi_template.core.config import settings
+from fastapi_template.core.events import EventTypes
+from fastapi_template.core.outbox import Outbox, OutboxRelay
+from fastapi_template.models.blog import Post
+from fastapi_template.models.content import (
+    ContentBatchUpdate, ContentIncoming
+)
+from fastapi_template.models.outbox import OutboxEvent
+from fastapi_template.models.security import User
+from fastapi_template.services.content_service import ContentService
+from fastapi_template.services.import_service import ImportService
+
+
+@pytest.fixture(scope="function")
+def outbox_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def pending(engine):
+    with Session(engine) as session:
+        return session.exec(select(OutboxEvent)).all()
+
+
+def due(engine):
+    with Session(engine) as session:
+        session.exec(
+            update(OutboxEvent).values(next_attempt_at=datetime.utcnow())
+        )
+        session.commit()
+
+
+def test_event_committed_with_write(outbox_engine):
+    outbox = Outbox()
+    with Session(outbox_engine) as session:
+        post = Post(title="Hello", content="x", user_id=1)
+        session.add(post)
+        outbox.add(session, EventTypes.POST_CREATED, post)
+        session.commit()
+        post_id = post.id
+
+    with Session(outbox_engine) as session:
+        session.add(Post(title="Rolled back", content="x", user_id=1))
+        outbox.add(session, EventTypes.POST_CREATED, 2)
+        session.rollback()
+
+    [row] = pending(outbox_engine)
+    assert row.event_type == EventTypes.POST_CREATED
+    assert f'"id": {post_id}' in row.payload
+
+
+def test_exclude_fields(outbox_engine):
+    with Session(outbox_engine) as session:
+        user = User(username="alice", password="secret")
+        session.add(user)
+        Outbox().add(
+            session, EventTypes.USER_CREATED, user, exclude={"password"}
+        )
+        session.commit()
+
+    [row] = pending(outbox_engine)
+    assert "alice" in row.payload
+    assert "password" not in row.payload
+
+
+def test_batch_writes_record_events(outbox_engine):
+    service = ContentService()
+    user = User(id=1, username="writer", password="secret")
+    with Session(outbox_engine) as session:
+        service.create_many(session, [
+            ContentIncoming(title="One", text="a", tags=["x"]),
+            ContentIncoming(title="Two", text="b", tags=["x"]),
+        ], user)
+        service.update_many(session, [
+            ContentBatchUpdate(id=1, title="One", text="new", tags=["y"]),
+            ContentBatchUpdate(
+                id=2, title="Two", text="new", tags=["y"], version=9
+            ),
+        ], user)
+    ImportService(outbox_engine).import_stream("posts", io.StringIO(
+        json.dumps({"title": "imported", "content": "c"})
+    ))
+
+    rows = pending(outbox_engine)
+    assert [row.event_type for row in rows] == [
+        EventTypes.CONTENTS_IMPORTED,
+        EventTypes.CONTENT_UPDATED,
+        EventTypes.POSTS_IMPORTED,
+    ]
+    created, updated, imported = (json.loads(row.payload) for row in rows)
+    assert [item["slug"] for item in created] == ["one", "two"]
+    # 更新事件是更新后的完整内容，版本冲突的项不记录
+    assert (updated["id"], updated["text"], updated["version"]) == (
+        1, "new", 2
+    )
+    assert updated["user_id"] == 1
+    assert imported[0]["title"] == "imported"
+
+
+def test_relay_delivers_in_batches(outbox_engine):
+    with Session(outbox_engine) as session:
+        for i in range(5):
+            Outbox().add(session, EventTypes.USER_DELETED, i)
+        session.commit()
+
+    batches = []
+    relay = OutboxRelay(
+        sink=batches.append, batch_size=2, engine=outbox_engine
+    )
+    assert relay.drain() == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [m["data"] for batch in batches for m in batch] == [0, 1, 2, 3, 4]
+    assert pending(outbox_engine) == []
+
+
+def test_failed_delivery_backs_off(outbox_engine):
+    with Session(outbox_engine) as session:
+        Outbox().add(session, EventTypes.USER_DELETED, 1)
+        session.commit()
+
+    def broken(messages):
+        raise ConnectionError("down")
+
+    relay = OutboxRelay(sink=broken, engine=outbox_engine)
+    assert relay.drain() == 0
+    [row] = pending(outbox_engine)
+    assert row.attempts == 1
+    assert "down" in row.last_error
+    assert row.next_attempt_at > datetime.utcnow()
+
+    # 退避期间不会再次投递，不会在短暂故障中耗尽重试
+    assert relay.drain() == 0
+    assert pending(outbox_engine)[0].attempts == 1
+
+    due(outbox_engine)
+    delivered = []
+    relay = OutboxRelay(sink=delivered.extend, engine=outbox_engine)
+    assert relay.drain() == 1
+    assert delivered[0]["data"] == 1
+
+
+def test_bad_message_does_not_block_batch(outbox_engine):
+    with Session(outbox_engine) as session:
+        for i in range(3):
+            Outbox().add(session, EventTypes.USER_DELETED, i)
+        session.commit()
+
+    delivered = []
+
+    def sink(messages):
+        if any(message["data"] == 1 for message in messages):
+            raise ValueError("rejected")
+        delivered.extend(message["data"] for message in messages)
+
+    relay = OutboxRelay(sink=sink, engine=outbox_engine)
+    assert relay.drain() == 2
+    assert delivered == [0, 2]
+    [row] = pending(outbox_engine)
+    assert row.attempts == 1
+    assert "rejected" in row.last_error
+
+
+def test_expired_events_are_not_retried(outbox_engine):
+    with Session(outbox_engine) as session:
+        event = Outbox().add(session, EventTypes.USER_DELETED, 1)
+        event.created_at = datetime.utcnow() - timedelta(
+            seconds=settings.OUTBOX_MAX_AGE + 1
+        )
+        session.commit()
+
+    delivered = []
+    relay = OutboxRelay(sink=delivered.extend, engine=outbox_engine)
+    assert relay.drain() == 0
+    assert delivered == []
+    assert len(pending(outbox_engine)) == 1
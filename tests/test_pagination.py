@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from fastapi_template.models.content import Content
+from fastapi_template.utils.pagination import (
+    clear_count_cache, decode_cursor, encode_cursor, paginate,
+    paginate_keyset, table_count
+)
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="function")
+def content_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        # 每两条内容共用一个创建时间，验证 id 作为排序的第二键
+        for i in range(7):
+            session.add(Content(
+                title=f"t{i}",
+                slug=f"t{i}",
+                text="x",
+                published=i % 2 == 0,
+                created_time=BASE + timedelta(hours=i // 2),
+            ))
+        session.commit()
+        yield session
+
+
+def test_paginate_counts_filtered_rows(content_session):
+    query = select(Content).where(Content.published == True)  # noqa: E712
+    result = paginate(content_session, query.order_by(Content.id), 1, 3)
+    assert result.total == 4
+    assert result.pages == 2
+    assert [content.title for content in result.items] == ["t0", "t2", "t4"]
+
+
+def test_paginate_without_total(content_session):
+    query = select(Content).order_by(Content.id)
+    result = paginate(content_session, query, 2, 3, with_total=False)
+    assert result.total is None and result.pages is None
+    assert [content.title for content in result.items] == ["t3", "t4", "t5"]
+    assert result.has_next and result.has_prev
+
+    result = paginate(content_session, query, 3, 3, with_total=False)
+    assert [content.title for content in result.items] == ["t6"]
+    assert not result.has_next
+
+
+def test_table_count_is_cached(content_session):
+    clear_count_cache()
+    assert table_count(content_session, Content) == 7
+
+    content_session.add(Content(title="t7", slug="t7", text="x"))
+    content_session.commit()
+    assert table_count(content_session, Content) == 7
+    assert table_count(content_session, Content, ttl=0) == 8
+
+    query = select(Content).order_by(Content.id)
+    result = paginate(
+        content_session, query, 1, 3,
+        count=lambda: table_count(content_session, Content),
+    )
+    assert result.total == 8
+    clear_count_cache()
+
+
+def test_cursor_round_trip():
+    columns = [Content.created_time, Content.id]
+    cursor = encode_cursor([BASE, 5])
+    assert decode_cursor(cursor, columns) == [BASE, 5]
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", columns)
+
+
+def test_paginate_keyset(content_session):
+    columns = [Content.created_time, Content.id]
+    titles, cursor = [], None
+    while True:
+        page = paginate_keyset(
+            content_session, select(Content), columns, cursor=cursor, size=3
+        )
+        titles += [content.title for content in page.items]
+        cursor = page.next_cursor
+        if not page.has_next:
+            break
+    assert titles == ["t6", "t5", "t4", "t3", "t2", "t1", "t0"]
+
+    page = paginate_keyset(
+        content_session,
+        select(Content).where(Content.created_time >= BASE + timedelta(hours=2)),
+        columns,
+        size=10,
+        descending=False,
+    )
+    assert [content.title for content in page.items] == ["t4", "t5", "t6"]
+    assert page.next_cursor is None
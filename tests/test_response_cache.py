@@ -0,0 +1,113 @@
+import redis
+
+from fastapi_template.core.cache import MemoryCache
+from fastapi_template.core.events import EventBus, EventTypes
+from fastapi_template.core.response_cache import (
+    BLOG_POST_ROUTE, BLOG_POSTS_ROUTE, ResponseCache
+)
+from fastapi_template.models.blog import Comment, Like, Post
+
+
+class BrokenCache:
+    def __getattr__(self, name):
+        def fail(*args):
+            raise redis.ConnectionError("redis is down")
+        return fail
+
+
+def counter():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+    return calls, compute
+
+
+def test_response_cache_hits_and_stats():
+    cache = ResponseCache(backend=MemoryCache())
+    calls, compute = counter()
+
+    assert cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, compute) == {
+        "value": 1
+    }
+    assert cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, compute) == {
+        "value": 1
+    }
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_response_cache_key_ignores_param_order():
+    cache = ResponseCache(backend=MemoryCache())
+    assert cache.make_key("r", {"a": 1, "b": 2}) == cache.make_key(
+        "r", {"b": 2, "a": 1}
+    )
+
+
+def test_response_cache_event_invalidation():
+    cache = ResponseCache(backend=MemoryCache())
+    bus = EventBus()
+    cache.register_event_handlers(bus)
+
+    detail_calls, detail = counter()
+    other_calls, other = counter()
+    list_calls, listing = counter()
+    params = {"limit": 10, "sort_by": "created_at", "order": "desc"}
+
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, detail, tags=["post:1"])
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 2}, other, tags=["post:2"])
+    cache.cached(BLOG_POSTS_ROUTE, params, listing)
+
+    # a like on post 1 only drops post 1 and the listing
+    bus.publish(EventTypes.LIKE_CREATED, Like(post_id=1, user_id=1))
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, detail, tags=["post:1"])
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 2}, other, tags=["post:2"])
+    cache.cached(BLOG_POSTS_ROUTE, params, listing)
+    assert len(detail_calls) == 2
+    assert len(other_calls) == 1
+    assert len(list_calls) == 2
+
+    bus.publish(EventTypes.COMMENT_CREATED, Comment(
+        content="hi", post_id=2, user_id=1
+    ))
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 2}, other, tags=["post:2"])
+    assert len(other_calls) == 2
+
+    bus.publish(EventTypes.POST_CREATED, Post(
+        id=3, title="new", content="post", user_id=1
+    ))
+    cache.cached(BLOG_POSTS_ROUTE, params, listing)
+    assert len(list_calls) == 3
+
+
+def test_invalidation_during_compute_is_not_lost():
+    cache = ResponseCache(backend=MemoryCache())
+    versions = iter(["old", "new"])
+
+    def compute():
+        value = {"value": next(versions)}
+        # 读取数据库之后、写入缓存之前发生了失效
+        cache.invalidate_tags("post:1")
+        return value
+
+    assert cache.cached(
+        BLOG_POST_ROUTE, {"post_id": 1}, compute, tags=["post:1"]
+    ) == {"value": "old"}
+    assert cache.cached(
+        BLOG_POST_ROUTE, {"post_id": 1}, compute, tags=["post:1"]
+    ) == {"value": "new"}
+
+
+def test_response_cache_falls_back_to_memory():
+    cache = ResponseCache(backend=BrokenCache())
+    calls, compute = counter()
+
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, compute)
+    cache.cached(BLOG_POST_ROUTE, {"post_id": 1}, compute)
+    assert len(calls) == 1
+    assert cache.stats()["errors"] > 0
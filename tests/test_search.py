@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from fastapi_template.core.events import EventBus, EventTypes
+from fastapi_template.models.blog import Post
+from fastapi_template.models.content import Content
+from fastapi_template.services.search_service import SearchService
+
+
+@pytest.fixture(scope="function")
+def search_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="function")
+def search(search_engine):
+    service = SearchService(search_engine)
+    service.create_index()
+    return service
+
+
+def test_search_ranks_and_highlights(search):
+    search.index_content(Content(
+        id=1, title="fastapi caching", text="redis in front of sqlite",
+        published=True, tags="cache,redis", user_id=1,
+    ))
+    search.index_content(Content(
+        id=2, title="something else", text="mentions caching once",
+        published=True, tags="", user_id=1,
+    ))
+    search.index_post(Post(
+        id=1, title="unrelated", content="nothing here", user_id=1,
+    ))
+
+    result = search.search("caching")
+    assert result.total == 2
+    # title matches outrank body matches
+    assert [hit.id for hit in result.items] == [1, 2]
+    assert "<mark>caching</mark>" in result.items[0].title
+    assert "<mark>caching</mark>" in result.items[1].snippet
+
+
+def test_search_kind_filter_and_pagination(search):
+    for i in range(1, 6):
+        search.index_post(Post(
+            id=i, title=f"post {i}", content="shared words", user_id=1,
+        ))
+    search.index_content(Content(
+        id=1, title="content", text="shared words", published=True,
+        user_id=1,
+    ))
+
+    result = search.search("shared", kind="post", page=2, size=2)
+    assert result.total == 5
+    assert len(result.items) == 2
+    assert all(hit.kind == "post" for hit in result.items)
+    assert result.has_next and result.has_prev
+
+
+def test_search_unpublished_and_removed(search):
+    content = Content(
+        id=1, title="draft", text="secret", published=True, user_id=1
+    )
+    search.index_content(content)
+    assert search.search("secret").total == 1
+
+    content.published = False
+    search.index_content(content)
+    assert search.search("secret").total == 0
+
+    content.published = True
+    search.index_content(content)
+    search.remove_content(1)
+    assert search.search("secret").total == 0
+
+
+def test_search_event_handlers(search):
+    bus = EventBus()
+    search.register_event_handlers(bus)
+
+    content = Content(
+        id=7, title="events", text="incremental", published=True, user_id=1
+    )
+    bus.publish(EventTypes.CONTENT_CREATED, content)
+    assert search.search("incremental").total == 1
+
+    bus.publish(EventTypes.CONTENT_DELETED, 7)
+    assert search.search("incremental").total == 0
+
+
+def test_search_rebuild(search, search_engine):
+    with Session(search_engine) as session:
+        session.add(Post(title="rebuilt post", content="body", user_id=1))
+        session.add(Content(
+            title="rebuilt content", slug="rebuilt-content", text="body",
+            published=True, user_id=1,
+        ))
+        session.add(Content(
+            title="rebuilt draft", slug="rebuilt-draft", text="body",
+            published=False, user_id=1,
+        ))
+        session.commit()
+
+    assert search.rebuild(batch_size=1) == 2
+    assert search.search("rebuilt").total == 2
+
+
+def test_search_ignores_operators(search):
+    # FTS5 syntax in user input must not raise
+    assert search.search('"AND OR NEAR(').total == 0
+    assert search.search("   ").total == 0
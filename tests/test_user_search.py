@@ -0,0 +1,108 @@
+import sys
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from fastapi_template.core.events import EventBus, EventTypes
+from fastapi_template.models.security import User
+from fastapi_template.services.user_search_service import (
+    NgramIndex, UserSearchService, prefix_upper_bound, similarity
+)
+
+USERNAMES = ["alice", "alicia", "al", "malice", "bob", "al_bert", "Alice2"]
+
+
+@pytest.fixture(scope="function")
+def search_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for username in USERNAMES:
+            session.add(User(username=username, password="secret"))
+        session.commit()
+    return engine
+
+
+def test_similarity():
+    assert similarity("alice", "alice") == 1.0
+    assert similarity("alice", "bob") == 0.0
+    assert similarity("alice", "alicia") > similarity("alice", "malice2")
+
+
+def test_ngram_index():
+    index = NgramIndex()
+    index.rebuild([(1, "alice"), (2, "malice"), (3, "bob")])
+    assert [user_id for _, user_id in index.search("lic")] == [1, 2]
+    assert [user_id for _, user_id in index.search("ALICE")] == [1, 2]
+    assert [user_id for _, user_id in index.search("b")] == [3]
+
+    index.add(2, "bobby")
+    assert [user_id for _, user_id in index.search("lic")] == [1]
+    index.remove(1)
+    assert index.search("lic") == []
+
+
+def test_prefix_search_ranks_and_pages(search_engine):
+    service = UserSearchService(search_engine)
+    with Session(search_engine) as session:
+        names, cursor = [], None
+        while True:
+            page = service.search(session, "al", cursor=cursor, size=2)
+            names += [hit.username for hit in page.items]
+            cursor = page.next_cursor
+            if not page.has_next:
+                break
+        # 按用户名排序，完全匹配得分最高；LIKE 通配符被转义
+        assert names == ["al", "al_bert", "alice", "alicia"]
+        assert page.items[-1].score < 1000
+
+        page = service.search(session, "al_", size=10)
+        assert [hit.username for hit in page.items] == ["al_bert"]
+
+
+def test_prefix_upper_bound():
+    top = chr(sys.maxunicode)
+    assert prefix_upper_bound("al") == "am"
+    assert prefix_upper_bound("a" + top) == "b"
+    assert prefix_upper_bound(top + top) is None
+    assert prefix_upper_bound("\ud7ff") == "\ue000"
+
+
+def test_prefix_search_handles_max_code_point(search_engine):
+    service = UserSearchService(search_engine)
+    top = chr(sys.maxunicode)
+    with Session(search_engine) as session:
+        session.add(User(username="a" + top, password="secret"))
+        session.commit()
+        page = service.search(session, "a" + top, size=10)
+        assert [hit.username for hit in page.items] == ["a" + top]
+        assert service.search(session, top, size=10).items == []
+
+
+def test_substring_search_uses_ngram_index(search_engine):
+    service = UserSearchService(search_engine)
+    bus = EventBus()
+    service.register_event_handlers(bus)
+    with Session(search_engine) as session:
+        page = service.search(session, "lic", mode="substring", size=2)
+        assert [hit.username for hit in page.items] == ["alice", "Alice2"]
+        page = service.search(
+            session, "lic", mode="substring", cursor=page.next_cursor
+        )
+        assert [hit.username for hit in page.items] == ["malice", "alicia"]
+        assert not page.has_next
+
+        user = User(username="slick", password="secret")
+        session.add(user)
+        session.commit()
+        bus.publish(EventTypes.USER_CREATED, user)
+        page = service.search(session, "lick", mode="substring")
+        assert [hit.username for hit in page.items] == ["slick"]
+
+    with pytest.raises(ValueError):
+        service.search(None, "x", mode="fuzzy")
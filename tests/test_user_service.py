@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from fastapi_template.models.content import Content
+from fastapi_template.models.security import User
+from fastapi_template.services.user_service import UserService
+
+
+@pytest.fixture(scope="function")
+def user_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        for username, count in [("alice", 3), ("bob", 1), ("carol", 0)]:
+            user = User(username=username, password="secret")
+            session.add(user)
+            session.flush()
+            for i in range(count):
+                session.add(Content(
+                    title=f"{username} {i}",
+                    slug=f"{username}-{i}",
+                    text="body",
+                    tags="",
+                    user_id=user.id,
+                    created_time=start + timedelta(days=i),
+                ))
+        session.commit()
+        yield session
+
+
+def test_list_users_skips_contents_by_default(user_session):
+    result = UserService(user_session).list_users()
+    assert [user.username for user in result.items] == [
+        "alice", "bob", "carol"
+    ]
+    assert all(
+        "contents" not in user.dict(exclude_unset=True)
+        for user in result.items
+    )
+
+
+def test_username_filter_matches_prefix(user_session):
+    service = UserService(user_session)
+    result = service.list_users(username_filter="ca")
+    assert [user.username for user in result.items] == ["carol"]
+    # 只匹配前缀，不再做 LIKE '%x%' 全表扫描
+    assert service.list_users(username_filter="ob").items == []
+
+
+def test_expand_contents_is_capped_per_user(user_session):
+    service = UserService(user_session)
+    contents = service.load_contents([1, 2, 3], limit=2)
+    # 每个用户最多两条，按创建时间倒序，不含正文
+    assert [c.title for c in contents[1]] == ["alice 2", "alice 1"]
+    assert [c.title for c in contents[2]] == ["bob 0"]
+    assert 3 not in contents
+    assert contents[1][0].text is None
+
+    result = service.list_users(expand=["contents"])
+    assert [len(user.contents) for user in result.items] == [3, 1, 0]
+
+
+def test_parse_expand():
+    assert UserService.parse_expand(None) == []
+    assert UserService.parse_expand("contents") == ["contents"]
+    with pytest.raises(HTTPException) as exc:
+        UserService.parse_expand("contents,posts")
+    assert exc.value.status_code == 400